@@ -7,6 +7,21 @@ class Settings(BaseSettings):
     # API Configuration
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "RAG Lab Backend"
+    # Load the model in the background and report readiness separately
+    FAST_START: bool = True
+
+    # Vector Store Configuration
+    VECTOR_STORE_BACKEND: str = "milvus"  # or "local"
+    LOCAL_VECTOR_STORE_DIR: str = "./api_data/vector_store"
+    LOCAL_INDEX_MODE: str = "exact"  # or "ivf"
+    LOCAL_IVF_MIN_ROWS: int = 4096
+    LOCAL_IVF_NPROBE: int = 8
+    LOCAL_MAX_SEGMENTS: int = 8
+    # Compact codes scanned by the first search pass: "none", "int8" or
+    # "binary"; candidates are rescored on the float32 vectors if kept
+    LOCAL_QUANTIZATION: str = "none"
+    LOCAL_KEEP_FLOAT: bool = True
+    LOCAL_RESCORE_FACTOR: int = 4  # first-pass candidates per top_k hit
 
     # Milvus Configuration
     MILVUS_URI: str
@@ -14,20 +29,94 @@ class Settings(BaseSettings):
     MILVUS_DB_NAME: str
     MILVUS_COLLECTION_NAME: str
     MILVUS_VECTOR_DIM: int
+    MILVUS_POOL_SIZE: int = 4
+    MILVUS_INSERT_BATCH_SIZE: int = 512
+    # Seconds between forced flushes; 0 leaves sealing to auto-flush
+    MILVUS_FLUSH_INTERVAL: float = 60.0
+    MILVUS_INDEX_TYPE: str = "HNSW"
+    MILVUS_METRIC_TYPE: str = "COSINE"
+    MILVUS_INDEX_PARAMS: dict = {"M": 16, "efConstruction": 200}
+    MILVUS_SEARCH_PARAMS: dict = {"ef": 64}
 
     # Embedding Model Configuration
     MODEL_NAME: str = "sentence-transformers/all-mpnet-base-v2"
+    # "torch", "torch-int8", "onnx" or "onnx-int8"
+    EMBEDDING_BACKEND: str = "torch"
+    # Local copy of the model, e.g. the output of export_onnx
+    EMBEDDING_MODEL_PATH: str = ""
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx512_vnni"  # or avx2, arm64
+    EMBEDDING_THREADS: int = 0  # intra-op threads; 0 = library default
+    EMBEDDING_PARITY_CHECK: bool = False
+    # Unix socket of the shared embedding server (python -m
+    # app.services.embedding_server); empty loads the model in-process
+    EMBEDDING_SERVER_SOCKET: str = ""
+    EMBEDDING_SERVER_CONNECTIONS: int = 4  # pooled per HTTP worker
+    EMBEDDING_SERVER_TIMEOUT: float = 120.0
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_DTYPE: str = "float32"  # or "float16" to halve memory
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_SCHEDULER_WINDOW: int = 4
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 50_000
+    EMBEDDING_CACHE_DIR: str = "./api_data/embedding_cache"
+
+    # Search Configuration
+    QUERY_CACHE_SIZE: int = 10_000
+    SEARCH_LATENCY_WINDOW: int = 1000
+    # Deepest result a paginated search may skip to; each page fetches
+    # offset + top_k candidates from every retriever
+    SEARCH_MAX_OFFSET: int = 1000
+    SEARCH_MODE: str = "hybrid"  # or "dense" for vector search only
+    LEXICAL_INDEX_PATH: str = "./api_data/lexical.db"
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    RRF_K: int = 60
+    HYBRID_CANDIDATES: int = 50  # hits taken from each retriever to fuse
+    # Answer single-identifier and quoted queries from BM25 alone
+    KEYWORD_FAST_PATH: bool = True
+
+    # Document Extraction Configuration
+    EXTRACTION_WORKERS: int = 0  # 0 means one process per CPU core
+    EXTRACTION_IO_WORKERS: int = 4
+    EXTRACTION_TIMEOUT: float = 300.0
+    PDF_PAGES_PER_TASK: int = 50
+    TXT_BLOCK_CHARS: int = 1_048_576
+    INGEST_STREAMING: bool = True
+
+    # Upload Configuration
+    MAX_UPLOAD_BYTES: int = 512 * 1024 * 1024
+    MAX_UPLOAD_REQUEST_BYTES: int = 2 * 1024 * 1024 * 1024
+    MAX_UPLOAD_FILES: int = 64
+
+    # Ingestion Job Configuration
+    JOBS_DB_PATH: str = "./api_data/jobs.db"
+    REGISTRY_DB_PATH: str = "./api_data/registry.db"
+    INGEST_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0
+    JOB_POLL_INTERVAL: float = 1.0
 
     # CORS Configuration
     BACKEND_CORS_ORIGINS: list = ["http://localhost:8501"]
 
     # OPENAI API Configuration
     OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+
+    # Chat Configuration
+    LLM_BACKEND: str = "openai"  # or "stub" for offline development
+    LLM_TIMEOUT: float = 60.0
+    CHAT_TOP_K: int = 5
+    CHAT_HISTORY_TURNS: int = 3
 
     # Logging Configuration
     LOG_LEVEL: str = "DEBUG"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE: str = "logs/app.log"
+    LOG_JSON: bool = False  # one JSON object per line instead of LOG_FORMAT
+    # Minimum seconds between repeats of a rate-limited hot-path message
+    LOG_SAMPLE_INTERVAL: float = 5.0
 
     class Config:
         case_sensitive = True
@@ -1,17 +1,160 @@
+import atexit
+import fcntl
+import json
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, Optional
 
-from app.core.config import Settings
+from .config import settings
 
-settings = Settings()
+# Fields such as the job id and filename, attached to every record logged
+# inside ``log_context``. Tasks and ``asyncio.to_thread`` calls inherit
+# them from the code that started them.
+_context: ContextVar[Dict[str, str]] = ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach ``fields`` to every record logged inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current ``log_context`` fields onto the record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _context.get()
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """``LOG_FORMAT`` followed by the context fields, if any."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            fields = " ".join(f"{k}={v}" for k, v in context.items())
+            message = f"{message} [{fields}]"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the context fields at top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Hands records to the listener thread unformatted.
+
+    The stock ``prepare`` formats the message in the caller; here the
+    listener does it, so callers only pay for building the record. Log
+    arguments must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def attach_queue(
+    logger: logging.Logger, *handlers: logging.Handler
+) -> QueueListener:
+    """
+    Route ``logger`` to ``handlers`` through a queue and a listener thread.
+
+    Callers only enqueue records; the listener formats and writes them,
+    so logging never blocks on disk or stdout.
+
+    Args:
+        logger: Logger to attach the queue handler to
+        *handlers: Handlers the listener writes records to
+
+    Returns:
+        QueueListener: The started listener; stop it to flush the queue
+    """
+    queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter())
+    listener = QueueListener(queue_handler.queue, *handlers)
+    listener.start()
+    logger.addHandler(queue_handler)
+    return listener
+
+
+class RateLimitedLogger:
+    """Logs each message template at most once per interval.
+
+    Meant for hot paths, such as per-batch progress during ingestion,
+    where every occurrence would flood the log. Messages are keyed by
+    their unformatted template, so use %-style arguments; occurrences
+    dropped meanwhile are counted on the next one that is logged.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = None):
+        self.logger = logger
+        self.interval = (
+            settings.LOG_SAMPLE_INTERVAL if interval is None else interval
+        )
+        self._lock = threading.Lock()
+        self._last: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+
+    def log(self, level: int, msg: str, *args):
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(msg)
+            if last is not None and now - last < self.interval:
+                self._suppressed[msg] = self._suppressed.get(msg, 0) + 1
+                return
+            self._last[msg] = now
+            suppressed = self._suppressed.pop(msg, 0)
+        if suppressed:
+            msg += " (%d similar messages suppressed)"
+            args = (*args, suppressed)
+        self.logger.log(level, msg, *args, stacklevel=2)
+
+    def debug(self, msg: str, *args):
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args):
+        self.log(logging.INFO, msg, *args)
+
+    def __repr__(self):
+        return f"RateLimitedLogger(interval={self.interval})"
 
 
 # core/logging.py
 class SingletonLogger:
     _instance = None
     _initialized = False
+    _listener: QueueListener = None
+    _file_lock = None
 
     @classmethod
     def get_logger(cls):
@@ -29,18 +172,52 @@ class SingletonLogger:
             return  # Prevent duplicate handlers
 
         logger.setLevel(settings.LOG_LEVEL)
-        formatter = logging.Formatter(settings.LOG_FORMAT)
-
-        # File handler
-        Path("logs").mkdir(exist_ok=True)
-        file_handler = RotatingFileHandler(
-            settings.LOG_FILE, maxBytes=10485760, backupCount=5
-        )
-        file_handler.setFormatter(formatter)
+        if settings.LOG_JSON:
+            formatter = JsonFormatter()
+        else:
+            formatter = TextFormatter(settings.LOG_FORMAT)
 
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
+        handlers = [console_handler]
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # File handler
+        file_handler = cls._file_handler()
+        if file_handler is not None:
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        cls._listener = attach_queue(logger, *handlers)
+        atexit.register(cls.shutdown)
+
+    @classmethod
+    def _file_handler(cls) -> Optional[RotatingFileHandler]:
+        """
+        Rotating handler for LOG_FILE, if this process is its only writer.
+
+        Several processes rotating one file lose lines, so the first
+        process to lock the file writes it. The others, such as further
+        uvicorn workers and extraction processes, log to stdout only.
+
+        Returns:
+            Optional[RotatingFileHandler]: The handler, or None
+        """
+        Path(settings.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(f"{settings.LOG_FILE}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        cls._file_lock = lock_file
+        return RotatingFileHandler(
+            settings.LOG_FILE, maxBytes=10485760, backupCount=5
+        )
+
+    @classmethod
+    def shutdown(cls):
+        """Write out queued records and stop the listener thread."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
@@ -0,0 +1,235 @@
+import glob
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Prometheus metrics. Everything is observed per request, per batch or
+# per document, never per chunk, so the cost stays far below the work
+# measured.
+#
+# With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to a directory
+# shared by them and emptied before they start; /metrics then aggregates
+# every worker. Live gauges of workers that exited are dropped on each
+# scrape, since uvicorn offers no hook when a worker exits.
+
+_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_LONG_SECONDS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 1800)
+_SIZES = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+HTTP_REQUESTS = Counter(
+    "raglab_http_requests_total",
+    "HTTP requests by route and status",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "raglab_http_request_seconds",
+    "HTTP request latency until the response is complete",
+    ["method", "route"],
+    buckets=_SECONDS,
+)
+
+INGEST_STAGE_SECONDS = Histogram(
+    "raglab_ingest_stage_seconds",
+    "Time per document spent in each ingestion stage",
+    ["stage"],
+    buckets=_LONG_SECONDS,
+)
+DOCUMENT_CHUNKS = Histogram(
+    "raglab_document_chunks",
+    "Chunks per ingested document",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10_000, 50_000, 100_000),
+)
+CHUNKS_EMBEDDED = Counter(
+    "raglab_chunks_embedded_total", "Chunks embedded during ingestion"
+)
+INGEST_JOBS = Counter(
+    "raglab_ingest_jobs_total", "Finished ingestion job attempts", ["status"]
+)
+JOBS_QUEUED = Gauge(
+    "raglab_ingest_jobs_queued",
+    "Ingestion jobs waiting to run",
+    multiprocess_mode="max",
+)
+JOBS_IN_FLIGHT = Gauge(
+    "raglab_ingest_jobs_in_flight",
+    "Ingestion jobs running",
+    multiprocess_mode="livesum",
+)
+
+EMBEDDING_SECONDS = Histogram(
+    "raglab_embedding_seconds",
+    "EmbeddingService encode latency, cache misses only",
+    buckets=_SECONDS,
+)
+EMBEDDING_REQUEST_TEXTS = Histogram(
+    "raglab_embedding_request_texts",
+    "Texts per EmbeddingService call",
+    buckets=_SIZES,
+)
+EMBEDDING_CACHE = Counter(
+    "raglab_embedding_cache_total", "Embedding cache lookups", ["result"]
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "raglab_embedding_batch_size",
+    "Texts per forward pass of the embedding scheduler",
+    buckets=_SIZES,
+)
+EMBEDDING_QUEUE_DEPTH = Gauge(
+    "raglab_embedding_queue_depth",
+    "Texts waiting in the embedding scheduler",
+    multiprocess_mode="livesum",
+)
+
+SEARCH_STAGE_SECONDS = Histogram(
+    "raglab_search_stage_seconds",
+    "Search latency per stage",
+    ["stage"],
+    buckets=_SECONDS,
+)
+CHAT_STAGE_SECONDS = Histogram(
+    "raglab_chat_stage_seconds",
+    "Chat latency per stage",
+    ["stage"],
+    buckets=_LONG_SECONDS,
+)
+
+
+class StageTimer:
+    """Accumulates the time one document spends in each ingestion stage.
+
+    Sequential stages are timed with ``measure``. Time that cannot be
+    wrapped, such as chunking interleaved with extraction inside a
+    generator, is taken with ``lap``: everything since the previous lap
+    except what ``measure`` recorded meanwhile. ``skip`` starts a new lap
+    without attributing the time before it. Totals are observed once per
+    document by ``observe``.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self._mark = time.perf_counter()
+        self._measured = 0.0
+
+    def add(self, stage: str, seconds: float):
+        """Add time that overlaps other stages, such as background
+        inserts; it is not subtracted from laps."""
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(stage, elapsed)
+            self._measured += elapsed
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.add(stage, max(now - self._mark - self._measured, 0.0))
+        self._mark = now
+        self._measured = 0.0
+
+    def skip(self):
+        self._mark = time.perf_counter()
+        self._measured = 0.0
+
+    def observe(self):
+        for stage, seconds in self.seconds.items():
+            INGEST_STAGE_SECONDS.labels(stage).observe(seconds)
+
+    def __repr__(self):
+        return f"StageTimer(seconds={self.seconds})"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request count and latency per route.
+
+    Routes are labelled by their path template, not the concrete path,
+    so the number of series stays bounded. Streaming responses are timed
+    until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, path).observe(
+                time.perf_counter() - start
+            )
+
+
+_LIVE_GAUGE_FILE = re.compile(r"gauge_live\w+_(\d+)\.db$")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def mark_dead_workers(path: str):
+    """Drop the live gauge values of worker processes that have exited."""
+    pids = set()
+    for file in glob.glob(os.path.join(path, "gauge_live*.db")):
+        match = _LIVE_GAUGE_FILE.search(file)
+        if match:
+            pids.add(int(match.group(1)))
+    for pid in pids:
+        if pid != os.getpid() and not _alive(pid):
+            multiprocess.mark_process_dead(pid, path)
+
+
+def mark_worker_exit():
+    """Drop this process's live gauge values; call on shutdown."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        multiprocess.mark_process_dead(os.getpid(), path)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, and its type."""
+    registry = REGISTRY
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        mark_dead_workers(path)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
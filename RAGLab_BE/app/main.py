@@ -1,32 +1,190 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sentence_transformers import SentenceTransformer
+from fastapi.responses import JSONResponse
 
+from .routers.chat import router as chat_router
 from .routers.files import router as files_router
-from .core.config import Settings
+from .routers.search import router as search_router
+from .core.config import settings
 from .core.logging import SingletonLogger
+from .core.metrics import (
+    RequestMetricsMiddleware,
+    mark_worker_exit,
+    render_metrics,
+)
+from .repository.factory import create_vector_store
+from .services.chat import ChatService
+from .services.doc_processing.chunkers import TextChunker
+from .services.doc_processing.executors import ExtractionExecutor
+from .services.doc_processing.pipeline import DocumentProcessingPipeline
+from .services.embedding import EmbeddingService
+from .services.embedding_backends import (
+    load_embedding_model,
+    model_cache_name,
+    reference_parity,
+    warm_up,
+)
+from .services.embedding_cache import EmbeddingCache
+from .services.embedding_scheduler import EmbeddingScheduler
+from .services.embedding_server import RemoteEmbeddingModel
+from .services.jobs import JobQueue, JobStore
+from .services.lexical import LexicalIndex
+from .services.llm import create_llm_client
+from .services.registry import DocumentRegistry
+from .services.search import SearchService
 
-settings = Settings()
 logger = SingletonLogger.get_logger()
 
 
+def _load_model(app: FastAPI):
+    """Load and warm up the embedding model; runs in a worker thread."""
+    if settings.EMBEDDING_SERVER_SOCKET:
+        # The server holds the only copy of the model for all workers.
+        model = RemoteEmbeddingModel()
+        model.connect()
+        app.state.embedding_model = model
+        return
+    logger.info("Loading embedding model...")
+    model = load_embedding_model()
+    warm_up(model)
+    logger.info("Model loaded successfully")
+    if (
+        settings.EMBEDDING_PARITY_CHECK
+        and settings.EMBEDDING_BACKEND != "torch"
+    ):
+        # None in the stats when the check could not run.
+        app.state.embedding_parity = reference_parity(model)
+        if app.state.embedding_parity is not None:
+            logger.info(f"Embedding parity: {app.state.embedding_parity}")
+    app.state.embedding_model = model
+
+
+async def _start_services(app: FastAPI):
+    """
+    Start everything that needs the embedding model or the vector store.
+
+    Services appear on ``app.state`` as they are created; until then their
+    dependencies answer 503. ``app.state.ready`` is set once all of them,
+    including the job queue, are running.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_load_model, app)
+        app.state.embedding_scheduler = EmbeddingScheduler(
+            app.state.embedding_model
+        )
+        await app.state.embedding_scheduler.start()
+
+        app.state.vector_store = create_vector_store()
+        await app.state.vector_store.initialize()
+        logger.info(f"Connected {app.state.vector_store}")
+        app.state.lexical_index = LexicalIndex()
+        await asyncio.to_thread(app.state.lexical_index.load)
+
+        pipeline = DocumentProcessingPipeline(
+            embedding_service=EmbeddingService(
+                app.state.embedding_model,
+                scheduler=app.state.embedding_scheduler,
+                cache=getattr(app.state, "embedding_cache", None),
+            ),
+            vector_store=app.state.vector_store,
+            chunker=TextChunker.for_model(
+                app.state.embedding_model, chunk_overlap=32
+            ),
+            executor=app.state.extraction_executor,
+            registry=app.state.document_registry,
+            lexical_index=app.state.lexical_index,
+        )
+        # Queries get their own memory-only cache so they never pollute the
+        # persistent chunk cache; with an embedding server they also skip
+        # its cache, and are batched there instead of here.
+        query_model = app.state.embedding_model
+        query_scheduler = app.state.embedding_scheduler
+        if isinstance(query_model, RemoteEmbeddingModel):
+            query_model = query_model.uncached()
+            query_scheduler = None
+        app.state.search_service = SearchService(
+            EmbeddingService(
+                query_model,
+                scheduler=query_scheduler,
+                cache=EmbeddingCache(
+                    model_cache_name(),
+                    max_memory_items=settings.QUERY_CACHE_SIZE,
+                    cache_dir="",
+                ),
+            ),
+            app.state.vector_store,
+            registry=app.state.document_registry,
+            lexical_index=app.state.lexical_index,
+        )
+        app.state.chat_service = ChatService(
+            app.state.search_service, app.state.llm
+        )
+        job_queue = JobQueue(JobStore(), pipeline)
+        await job_queue.start()
+        app.state.job_queue = job_queue
+    except Exception as e:
+        logger.error(f"Error starting services: {str(e)}")
+        app.state.startup_error = str(e)
+        return
+    app.state.startup_seconds = round(time.perf_counter() - started, 3)
+    app.state.ready = True
+    logger.info(f"Ready to serve after {app.state.startup_seconds}s")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Performing startup tasks...")
     # startup logic here
-    try:
-        logger.info("Loading embedding model...")
-        app.state.embedding_model = SentenceTransformer(settings.MODEL_NAME)
-        logger.info("Model loaded successfully")
-    except Exception as e:
-        logger.error(f"Error loading embedding model: {str(e)}")
-        raise
+    app.state.ready = False
+    app.state.startup_error = None
+    # With an embedding server, chunk embeddings are cached there.
+    if (
+        settings.EMBEDDING_CACHE_ENABLED
+        and not settings.EMBEDDING_SERVER_SOCKET
+    ):
+        app.state.embedding_cache = EmbeddingCache(model_cache_name())
+    app.state.extraction_executor = ExtractionExecutor()
+    logger.info(f"Started {app.state.extraction_executor}")
+    app.state.document_registry = DocumentRegistry()
+    app.state.llm = create_llm_client()
+
+    startup = asyncio.create_task(_start_services(app))
+    if not settings.FAST_START:
+        await startup
+        if app.state.startup_error:
+            raise RuntimeError(app.state.startup_error)
     yield
 
     logger.info("Performing shutdown tasks...")
     # shutdown logic here
+    if not startup.done():
+        startup.cancel()
+        await asyncio.gather(startup, return_exceptions=True)
+    state = app.state
+    if hasattr(state, "job_queue"):
+        await state.job_queue.stop()
+        state.job_queue.store.close()
+    await state.llm.close()
+    state.document_registry.close()
+    if hasattr(state, "embedding_scheduler"):
+        await state.embedding_scheduler.stop()
+    if isinstance(
+        getattr(state, "embedding_model", None), RemoteEmbeddingModel
+    ):
+        state.embedding_model.close()
+    if hasattr(state, "embedding_cache"):
+        state.embedding_cache.close()
+    state.extraction_executor.shutdown()
+    if hasattr(state, "vector_store"):
+        await state.vector_store.close()
+    if hasattr(state, "lexical_index"):
+        state.lexical_index.close()
+    mark_worker_exit()
 
 
 app = FastAPI(
@@ -41,6 +199,8 @@ app = FastAPI(
 app.include_router(
     files_router, prefix=settings.API_V1_STR, tags=["Documents"]
 )
+app.include_router(search_router, prefix=settings.API_V1_STR, tags=["Search"])
+app.include_router(chat_router, prefix=settings.API_V1_STR, tags=["Chat"])
 
 origins = [
     "http://localhost:8501",
@@ -55,6 +215,7 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 
 @app.get("/", tags=["Health Check"])
@@ -62,5 +223,53 @@ async def root() -> Response:
     return {"status": "ok", "message": "Server is Runnings!"}
 
 
+@app.get("/health/live", tags=["Health Check"])
+async def live() -> Response:
+    """Liveness: the process serves requests and startup has not failed."""
+    if getattr(app.state, "startup_error", None):
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed", "error": app.state.startup_error},
+        )
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["Health Check"])
+async def ready() -> Response:
+    """Readiness: the model is loaded and every service is running."""
+    if not getattr(app.state, "ready", False):
+        failed = getattr(app.state, "startup_error", None)
+        status = "failed" if failed else "starting"
+        return JSONResponse(status_code=503, content={"status": status})
+    return {"status": "ready", "startup_seconds": app.state.startup_seconds}
+
+
+@app.get("/metrics", tags=["Health Check"], include_in_schema=False)
+async def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/stats/embedding", tags=["Health Check"])
+async def embedding_stats() -> Response:
+    if not hasattr(app.state, "embedding_scheduler"):
+        raise HTTPException(
+            status_code=503, detail="Embedding model not initialized"
+        )
+    stats = {
+        "backend": settings.EMBEDDING_BACKEND,
+        "scheduler": app.state.embedding_scheduler.stats(),
+    }
+    if hasattr(app.state, "embedding_parity"):
+        stats["parity"] = app.state.embedding_parity
+    if hasattr(app.state, "embedding_cache"):
+        stats["cache"] = app.state.embedding_cache.stats()
+    if isinstance(app.state.embedding_model, RemoteEmbeddingModel):
+        stats["server"] = await asyncio.to_thread(
+            app.state.embedding_model.server_info
+        )
+    return stats
+
+
 if __name__ == "__main__":
     root()
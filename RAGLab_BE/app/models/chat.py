@@ -0,0 +1,19 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .search import SearchFilters
+
+
+class ChatMessage(BaseModel):
+    role: Literal["user", "assistant"]
+    content: str
+
+
+class ChatRequest(BaseModel):
+    """A chat turn answered with retrieval-augmented generation."""
+
+    query: str = Field(..., min_length=1)
+    history: List[ChatMessage] = []
+    top_k: Optional[int] = Field(None, ge=1, le=50)
+    filters: Optional[SearchFilters] = None
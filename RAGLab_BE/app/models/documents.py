@@ -1,5 +1,16 @@
 from fastapi import UploadFile
 
+SUPPORTED_CONTENT_TYPES: set[str] = {
+    "text/plain",
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def is_supported_type(content_type: str) -> bool:
+    """Check whether documents of ``content_type`` can be ingested."""
+    return content_type in SUPPORTED_CONTENT_TYPES
+
 
 def validate_document(file: UploadFile) -> bool:
     """Validate if the file type is supported.
@@ -10,9 +21,4 @@ def validate_document(file: UploadFile) -> bool:
     Returns:
         bool: True if file type is supported, False otherwise
     """
-    supported_types: set[str] = [
-        "text/plain",
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    ]
-    return file.content_type in supported_types
+    return is_supported_type(file.content_type)
@@ -0,0 +1,40 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of an ingestion job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobStage(str, Enum):
+    """Last pipeline stage an ingestion job completed."""
+
+    PENDING = "pending"
+    EXTRACTED = "extracted"
+    CHUNKED = "chunked"
+    EMBEDDED = "embedded"
+    STORED = "stored"
+
+
+class Job(BaseModel):
+    """An ingestion job as persisted in the job store."""
+
+    id: str
+    filename: str
+    file_path: str
+    status: JobStatus
+    stage: JobStage
+    attempts: int
+    error: Optional[str] = None
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    content_hash: Optional[str] = None
+    created_at: str
+    updated_at: str
@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from ..core.config import settings
+
+
+class SearchFilters(BaseModel):
+    """Metadata filters applied to vector search."""
+
+    filename: Optional[str] = None
+    file_type: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, str]:
+        return self.model_dump(exclude_none=True)
+
+
+class SearchRequest(BaseModel):
+    """A single semantic search query."""
+
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=100)
+    offset: int = Field(0, ge=0, le=settings.SEARCH_MAX_OFFSET)
+    filters: Optional[SearchFilters] = None
+
+
+class BatchSearchRequest(BaseModel):
+    """Several queries searched with one embedding call and one search."""
+
+    queries: List[str] = Field(..., min_length=1, max_length=256)
+    top_k: int = Field(5, ge=1, le=100)
+    offset: int = Field(0, ge=0, le=settings.SEARCH_MAX_OFFSET)
+    filters: Optional[SearchFilters] = None
+
+
+class SearchResult(BaseModel):
+    """A retrieved chunk.
+
+    ``score_type`` says what ``score`` is: ``dense`` is the vector store's
+    similarity (cosine by default), ``bm25`` a lexical score from the
+    keyword fast path and ``rrf`` a reciprocal rank fusion of both.
+    Scores are only comparable between results of the same type.
+    """
+
+    id: str
+    score: float
+    score_type: Literal["dense", "bm25", "rrf"]
+    text: str
+    metadata: Dict[str, Any]
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    timings_ms: Dict[str, float]
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[List[SearchResult]]
+    timings_ms: Dict[str, float]
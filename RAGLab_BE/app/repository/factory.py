@@ -0,0 +1,16 @@
+from ..core.config import settings
+from .interfaces import VectorStore
+
+
+def create_vector_store(backend: str = None) -> VectorStore:
+    """Create the vector store backend selected in settings."""
+    backend = backend or settings.VECTOR_STORE_BACKEND
+    if backend == "milvus":
+        from .milvus import MilvusRepository
+
+        return MilvusRepository()
+    if backend == "local":
+        from .local import LocalVectorStore
+
+        return LocalVectorStore()
+    raise ValueError(f"Unsupported vector store backend: {backend}")
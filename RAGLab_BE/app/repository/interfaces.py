@@ -0,0 +1,82 @@
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..services.doc_processing.interfaces import ProcessedDocument
+
+# Metadata fields every backend can filter on.
+FILTERABLE_FIELDS = ("filename", "file_type")
+
+
+@dataclass
+class SearchHit:
+    """A single vector search result."""
+
+    id: str
+    score: float
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def chunk_id(filename: str, text: str) -> str:
+    """Primary key of a chunk: its document plus a hash of its content.
+
+    Content-derived ids stay the same when a revision inserts or removes
+    text elsewhere in the document, which is what lets re-ingestion diff
+    chunk sets instead of rewriting them.
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+    return f"{filename}:{digest}"
+
+
+def chunk_ids(document: ProcessedDocument) -> List[str]:
+    """Primary keys for the chunks of a processed document batch."""
+    filename = document.metadata["filename"]
+    return [chunk_id(filename, text) for text in document.texts]
+
+
+class VectorStore(ABC):
+    """Base class for vector store backends."""
+
+    @abstractmethod
+    async def initialize(self):
+        """Create the collection and its index if they do not exist."""
+        pass
+
+    @abstractmethod
+    async def insert_many(self, document: ProcessedDocument) -> int:
+        """Insert a columnar batch of chunks, returning the rows written."""
+        pass
+
+    @abstractmethod
+    async def flush(self):
+        """Make previously inserted rows durable and searchable."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        vectors: np.ndarray,
+        top_k: int = 5,
+        filters: Dict[str, Any] = None,
+    ) -> List[List[SearchHit]]:
+        """Return the top-k hits for each query vector."""
+        pass
+
+    @abstractmethod
+    async def delete(self, ids: List[str]):
+        """Delete chunks by primary key."""
+        pass
+
+    async def close(self):
+        """Release connections and other resources."""
+        pass
+
+    def __str__(self):
+        return f"{self.__class__.__name__} Vector Store"
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}VectorStore"
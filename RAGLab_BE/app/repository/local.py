@@ -0,0 +1,748 @@
+import asyncio
+import fcntl
+import json
+import os
+import shutil
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+from ..services.doc_processing.interfaces import ProcessedDocument
+from .interfaces import FILTERABLE_FIELDS, SearchHit, VectorStore, chunk_ids
+
+logger = SingletonLogger.get_logger()
+
+# Rows scored per matrix multiply in exact mode; bounds the score buffer.
+SEARCH_BLOCK_ROWS = 65_536
+# Rows of codes scored per block in exact mode before shortlisting.
+CODE_BLOCK_ROWS = 4_096
+# Int8 codes are widened to float32 this many rows at a time, into one
+# buffer small enough to stay in cache for the matrix multiply.
+WIDEN_BLOCK_ROWS = 256
+
+QUANTIZATION_KINDS = ("none", "int8", "binary")
+
+# Set bits of every byte value, for numpy versions without bitwise_count.
+_POPCOUNT = np.unpackbits(
+    np.arange(256, dtype=np.uint8)[:, None], axis=1
+).sum(axis=1, dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores along the last axis, best first."""
+    if scores.shape[-1] > k:
+        idx = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        idx = np.broadcast_to(
+            np.arange(scores.shape[-1]), scores.shape
+        ).copy()
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=-1), axis=-1)
+    return np.take_along_axis(idx, order, axis=-1)
+
+
+def _binarize(vectors: np.ndarray) -> np.ndarray:
+    """Sign bits of each row, packed into uint64 words."""
+    bits = np.packbits(np.atleast_2d(vectors) > 0, axis=1)
+    pad = -bits.shape[1] % 8
+    if pad:
+        bits = np.pad(bits, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+def _hamming(codes: np.ndarray, bits: np.ndarray) -> np.ndarray:
+    """Bits differing between each row of ``codes`` and ``bits``."""
+    diff = np.bitwise_xor(codes, bits)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[diff.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def _int8_params(vectors: np.ndarray):
+    """Per-dimension step and offset mapping the value range onto int8."""
+    if not len(vectors):
+        zeros = np.zeros(vectors.shape[1], dtype=np.float32)
+        return zeros + 1e-12, zeros
+    low, high = vectors.min(axis=0), vectors.max(axis=0)
+    scale = np.maximum((high - low) / 255, 1e-12).astype(np.float32)
+    return scale, (low + 128 * scale).astype(np.float32)
+
+
+def _quantize_int8(
+    vectors: np.ndarray, scale: np.ndarray, offset: np.ndarray
+) -> np.ndarray:
+    codes = np.rint((vectors - offset) / scale)
+    return np.clip(codes, -128, 127).astype(np.int8)
+
+
+def _int8_scores(
+    scaled: np.ndarray, codes: np.ndarray, bias: np.ndarray
+) -> np.ndarray:
+    """``scaled @ codes.T + bias``, widening the codes block by block so
+    no float32 copy of all rows is ever built."""
+    scores = np.empty((len(scaled), len(codes)), dtype=np.float32)
+    buffer = np.empty((WIDEN_BLOCK_ROWS, codes.shape[1]), dtype=np.float32)
+    for start in range(0, len(codes), WIDEN_BLOCK_ROWS):
+        block = codes[start : start + WIDEN_BLOCK_ROWS]
+        widened = buffer[: len(block)]
+        np.copyto(widened, block, casting="unsafe")
+        np.matmul(
+            scaled, widened.T, out=scores[:, start : start + len(block)]
+        )
+    scores += bias[:, None]
+    return scores
+
+
+def _kmeans(
+    vectors: np.ndarray,
+    n_lists: int,
+    iterations: int = 10,
+    sample_size: int = 65_536,
+    seed: int = 0,
+):
+    """Spherical k-means; returns unit centroids and a list per vector."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[
+        np.sort(
+            rng.choice(
+                len(vectors), min(sample_size, len(vectors)), replace=False
+            )
+        )
+    ]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+        block = vectors[start : start + SEARCH_BLOCK_ROWS]
+        assign[start : start + len(block)] = np.argmax(
+            block @ centroids.T, axis=1
+        )
+    return centroids, assign
+
+
+class _StringColumn:
+    """Strings stored as one UTF-8 blob plus byte offsets, read lazily."""
+
+    def __init__(self, path: Path, name: str):
+        self._offsets = np.load(path / f"{name}.idx.npy", mmap_mode="r")
+        if self._offsets[-1]:
+            self._blob = np.memmap(path / f"{name}.bin", mode="r")
+        else:
+            self._blob = np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        return self._blob[start:stop].tobytes().decode("utf-8")
+
+    @staticmethod
+    def write(path: Path, name: str, strings: Sequence[str]):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        (path / f"{name}.bin").write_bytes(b"".join(encoded))
+        np.save(path / f"{name}.idx.npy", offsets)
+
+
+class _Segment:
+    """An immutable block of rows, on disk (memory-mapped) or in memory.
+
+    IVF segments store their rows grouped by inverted list, with
+    ``list_offsets`` giving each list's row range.
+
+    Quantized segments also hold ``codes``: int8 values with a per-
+    dimension ``code_scale`` and ``code_offset``, or sign bits packed into
+    uint64 words. ``vectors`` is None when the float32 rows were dropped.
+    """
+
+    def __init__(
+        self,
+        vectors: Optional[np.ndarray],
+        ids: Sequence[str],
+        texts: Sequence[str],
+        doc_index: np.ndarray,
+        chunk_index: np.ndarray,
+        docs: List[Dict[str, Any]],
+        deleted: np.ndarray = None,
+        centroids: np.ndarray = None,
+        list_offsets: np.ndarray = None,
+        path: Path = None,
+        quantization: str = "none",
+        dim: int = None,
+        codes: np.ndarray = None,
+        code_scale: np.ndarray = None,
+        code_offset: np.ndarray = None,
+    ):
+        self.vectors = vectors
+        self.ids = ids
+        self.texts = texts
+        self.doc_index = doc_index
+        self.chunk_index = chunk_index
+        self.docs = docs
+        self.deleted = (
+            deleted
+            if deleted is not None
+            else np.zeros(len(ids), dtype=bool)
+        )
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.path = path
+        self.quantization = quantization
+        self.dim = dim or vectors.shape[1]
+        self.codes = codes
+        self.code_scale = code_scale
+        self.code_offset = code_offset
+        self._rows: Dict[str, int] = None
+
+    @classmethod
+    def from_document(cls, document: ProcessedDocument) -> "_Segment":
+        n = len(document)
+        return cls(
+            vectors=_normalize(document.embeddings),
+            ids=chunk_ids(document),
+            texts=document.texts,
+            doc_index=np.zeros(n, dtype=np.int32),
+            chunk_index=document.chunk_indices,
+            docs=[document.metadata],
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "_Segment":
+        def optional(name):
+            file = path / f"{name}.npy"
+            return np.load(file) if file.exists() else None
+
+        def mapped(name):
+            file = path / f"{name}.npy"
+            return np.load(file, mmap_mode="r") if file.exists() else None
+
+        quantization = {"kind": "none", "dim": None}
+        if (path / "quantization.json").exists():
+            quantization = json.loads(
+                (path / "quantization.json").read_text()
+            )
+        return cls(
+            vectors=mapped("vectors"),
+            ids=_StringColumn(path, "ids"),
+            texts=_StringColumn(path, "texts"),
+            doc_index=np.load(path / "doc_index.npy", mmap_mode="r"),
+            chunk_index=np.load(path / "chunk_index.npy", mmap_mode="r"),
+            docs=json.loads((path / "docs.json").read_text()),
+            deleted=optional("deleted"),
+            centroids=optional("centroids"),
+            list_offsets=optional("list_offsets"),
+            path=path,
+            quantization=quantization["kind"],
+            dim=quantization["dim"],
+            codes=mapped("codes"),
+            code_scale=optional("code_scale"),
+            code_offset=optional("code_offset"),
+        )
+
+    @staticmethod
+    def merge(segments: List["_Segment"]) -> Dict[str, Any]:
+        """Columns of the live rows of several segments, concatenated."""
+        columns = {
+            "vectors": [],
+            "ids": [],
+            "texts": [],
+            "doc_index": [],
+            "chunk_index": [],
+            "docs": [],
+        }
+        # Batches of one document share identical metadata; keep one copy.
+        doc_positions: Dict[str, int] = {}
+        for segment in segments:
+            remap = np.empty(len(segment.docs), dtype=np.int32)
+            for i, doc in enumerate(segment.docs):
+                key = json.dumps(doc, sort_keys=True)
+                if key not in doc_positions:
+                    doc_positions[key] = len(columns["docs"])
+                    columns["docs"].append(doc)
+                remap[i] = doc_positions[key]
+
+            live = np.flatnonzero(~segment.deleted)
+            columns["vectors"].append(segment.float_vectors(live))
+            columns["ids"].extend(segment.ids[i] for i in live)
+            columns["texts"].extend(segment.texts[i] for i in live)
+            columns["doc_index"].append(remap[segment.doc_index[live]])
+            columns["chunk_index"].append(
+                np.asarray(segment.chunk_index[live])
+            )
+        for name in ("vectors", "doc_index", "chunk_index"):
+            columns[name] = np.concatenate(columns[name])
+        return columns
+
+    @staticmethod
+    def write(
+        path: Path,
+        columns: Dict[str, Any],
+        ivf: bool,
+        quantization: str = "none",
+        keep_float: bool = True,
+    ):
+        """Write columns as a segment directory, clustering it for IVF and
+        adding the codes of ``quantization``."""
+        path.mkdir(parents=True)
+        vectors = columns["vectors"]
+        n = len(vectors)
+        order = None
+        if ivf and n >= settings.LOCAL_IVF_MIN_ROWS:
+            n_lists = max(1, int(np.sqrt(n)))
+            centroids, assign = _kmeans(vectors, n_lists)
+            order = np.argsort(assign, kind="stable")
+            list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(assign, minlength=n_lists), out=list_offsets[1:]
+            )
+            np.save(path / "centroids.npy", centroids)
+            np.save(path / "list_offsets.npy", list_offsets)
+
+        def ordered(values):
+            if order is None:
+                return values
+            if isinstance(values, np.ndarray):
+                return values[order]
+            return [values[i] for i in order]
+
+        vectors = ordered(vectors).astype(np.float32)
+        if quantization == "none" or keep_float:
+            np.save(path / "vectors.npy", vectors)
+        if quantization == "int8":
+            scale, offset = _int8_params(vectors)
+            np.save(path / "code_scale.npy", scale)
+            np.save(path / "code_offset.npy", offset)
+            np.save(path / "codes.npy", _quantize_int8(vectors, scale, offset))
+        elif quantization == "binary":
+            np.save(path / "codes.npy", _binarize(vectors))
+        if quantization != "none":
+            (path / "quantization.json").write_text(
+                json.dumps({"kind": quantization, "dim": vectors.shape[1]})
+            )
+        np.save(path / "doc_index.npy", ordered(columns["doc_index"]))
+        np.save(path / "chunk_index.npy", ordered(columns["chunk_index"]))
+        _StringColumn.write(path, "ids", ordered(columns["ids"]))
+        _StringColumn.write(path, "texts", ordered(columns["texts"]))
+        (path / "docs.json").write_text(json.dumps(columns["docs"]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def rescored(self) -> bool:
+        """Whether first-pass candidates are rescored on float vectors."""
+        return self.codes is not None and self.vectors is not None
+
+    def float_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Float rows, reconstructed from the codes if none are stored."""
+        if self.vectors is not None:
+            return np.asarray(self.vectors[rows])
+        codes = np.asarray(self.codes[rows])
+        if self.quantization == "int8":
+            return _normalize(codes * self.code_scale + self.code_offset)
+        bits = np.unpackbits(codes.view(np.uint8), axis=1, count=self.dim)
+        return (bits.astype(np.float32) * 2 - 1) / np.sqrt(self.dim)
+
+    def first_pass(self, queries: np.ndarray, rows) -> np.ndarray:
+        """
+        Scores of ``rows`` for each query, estimated from the codes.
+
+        Int8 codes give an asymmetric dot product with the float query;
+        binary codes give the cosine implied by the Hamming distance.
+        Segments without codes are scored exactly.
+
+        Args:
+            queries: Unit query vectors of shape (n_queries, dim)
+            rows: Row slice or indices
+
+        Returns:
+            np.ndarray: Scores of shape (n_queries, n_rows)
+        """
+        if self.codes is None:
+            return queries @ self.vectors[rows].T
+        codes = self.codes[rows]
+        if self.quantization == "int8":
+            return _int8_scores(
+                queries * self.code_scale,
+                codes,
+                queries @ self.code_offset,
+            )
+        distances = np.stack(
+            [_hamming(codes, bits) for bits in _binarize(queries)]
+        )
+        return np.cos(np.pi * distances / self.dim).astype(np.float32)
+
+    def shortlist(
+        self,
+        query: np.ndarray,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        top_k: int,
+    ) -> List[Tuple[float, int]]:
+        """Best ``(score, row)`` pairs among first-pass candidates, with
+        exact scores if the segment is rescored."""
+        keep = scores > -np.inf
+        rows, scores = rows[keep], scores[keep]
+        if self.rescored and len(rows):
+            rows = np.sort(rows)  # sequential reads from the mapped file
+            scores = np.asarray(self.vectors[rows]) @ query
+            top = _top_k(scores, top_k)
+            rows, scores = rows[top], scores[top]
+        return list(zip(scores, rows))
+
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {self.ids[i]: i for i in range(len(self))}
+        return self._rows.get(chunk_id)
+
+    def save_deleted(self):
+        if self.path is not None:
+            np.save(self.path / "deleted.npy", self.deleted)
+
+    def allowed(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Mask of rows that are live and match the filters, or None."""
+        mask = ~self.deleted if self.deleted.any() else None
+        if filters:
+            docs = [
+                i
+                for i, doc in enumerate(self.docs)
+                if all(doc.get(key) == value for key, value in filters.items())
+            ]
+            matches = np.isin(self.doc_index, docs)
+            mask = matches if mask is None else mask & matches
+        return mask
+
+    def probe(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        """Rows of the ``n_probe`` inverted lists closest to the query."""
+        lists = _top_k(self.centroids @ query, n_probe)
+        return np.concatenate(
+            [
+                np.arange(self.list_offsets[i], self.list_offsets[i + 1])
+                for i in lists
+            ]
+        )
+
+    def hit(self, row: int, score: float) -> SearchHit:
+        return SearchHit(
+            id=self.ids[row],
+            score=float(score),
+            text=self.texts[row],
+            metadata={
+                **self.docs[self.doc_index[row]],
+                "chunk_index": int(self.chunk_index[row]),
+            },
+        )
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store persisted as memory-mapped segments.
+
+    Inserts are buffered in memory and written as an immutable segment on
+    ``flush``. Segment files are opened with ``mmap`` so startup only reads
+    the manifest and small per-segment metadata. Search is either exact
+    (blocked matrix multiply plus ``argpartition``) or IVF, which scans only
+    the ``n_probe`` closest clusters of each segment.
+
+    With ``quantization``, flushed segments also store int8 or 1-bit codes
+    (a quarter or a thirty-second of the float32 size), and the first
+    pass scans those instead of the vectors. The best ``rescore_factor *
+    top_k`` candidates are then rescored on the float32 rows, of which
+    only those candidates are read from the mapped file. Without
+    ``keep_float`` the vectors are not written and the code scores are
+    final, which also saves the disk space at the cost of recall.
+
+    The store belongs to one process: others would neither see its
+    flushes nor coordinate compaction with it, so opening a directory
+    that another process holds fails. Use Milvus with several workers.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        mode: str = None,
+        n_probe: int = None,
+        max_segments: int = None,
+        quantization: str = None,
+        keep_float: bool = None,
+        rescore_factor: int = None,
+    ):
+        self.path = Path(path or settings.LOCAL_VECTOR_STORE_DIR)
+        self.mode = mode or settings.LOCAL_INDEX_MODE
+        if self.mode not in ("exact", "ivf"):
+            raise ValueError(f"Unsupported local index mode: {self.mode}")
+        self.quantization = quantization or settings.LOCAL_QUANTIZATION
+        if self.quantization not in QUANTIZATION_KINDS:
+            raise ValueError(
+                f"Unsupported local quantization: {self.quantization}"
+            )
+        self.keep_float = (
+            settings.LOCAL_KEEP_FLOAT if keep_float is None else keep_float
+        )
+        self.rescore_factor = (
+            rescore_factor or settings.LOCAL_RESCORE_FACTOR
+        )
+        self.n_probe = n_probe or settings.LOCAL_IVF_NPROBE
+        self.max_segments = max_segments or settings.LOCAL_MAX_SEGMENTS
+        self._segments: List[_Segment] = []
+        self._pending: List[_Segment] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._next_segment = 0
+        self._owner_lock = None
+
+    @property
+    def _manifest(self) -> Path:
+        return self.path / "manifest.json"
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(fn, *args, **kwargs))
+
+    def _acquire(self):
+        """Take the directory's exclusive lock, held until ``close``."""
+        lock_file = open(self.path / "store.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"Local vector store at {self.path} is open in another "
+                "process; run a single worker or use the Milvus backend"
+            )
+        self._owner_lock = lock_file
+
+    def _load(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._acquire()
+        if self._manifest.exists():
+            manifest = json.loads(self._manifest.read_text())
+            self._segments = [
+                _Segment.load(self.path / name)
+                for name in manifest["segments"]
+            ]
+            self._next_segment = manifest["next_segment"]
+        logger.info(
+            f"Opened local vector store at {self.path} with "
+            f"{len(self)} rows in {len(self._segments)} segments"
+        )
+
+    def _write_manifest(self, segments: List[_Segment]):
+        tmp = self._manifest.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "segments": [segment.path.name for segment in segments],
+                    "next_segment": self._next_segment,
+                }
+            )
+        )
+        os.replace(tmp, self._manifest)
+
+    def __len__(self) -> int:
+        return sum(
+            int((~segment.deleted).sum())
+            for segment in self._segments + self._pending
+        )
+
+    async def initialize(self):
+        await self._run(self._load)
+
+    async def insert_many(self, document: ProcessedDocument) -> int:
+        if len(document) == 0:
+            return 0
+        segment = _Segment.from_document(document)
+        with self._lock:
+            self._pending.append(segment)
+        return len(document)
+
+    def _new_segment(self, segments: List[_Segment]) -> Optional[_Segment]:
+        """Merge the live rows of ``segments`` into a new segment, or None
+        if all of them were deleted."""
+        columns = _Segment.merge(segments)
+        if not len(columns["ids"]):
+            return None
+        path = self.path / f"segment-{self._next_segment:06d}"
+        self._next_segment += 1
+        _Segment.write(
+            path,
+            columns,
+            ivf=self.mode == "ivf",
+            quantization=self.quantization,
+            keep_float=self.keep_float,
+        )
+        return _Segment.load(path)
+
+    def _flush(self):
+        with self._flush_lock:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        # A copy: inserts made while the segment is written stay pending.
+        with self._lock:
+            pending = list(self._pending)
+        if not pending:
+            return
+        segment = self._new_segment(pending)
+        segments = self._segments + ([segment] if segment is not None else [])
+        stale = []
+        if len(segments) > self.max_segments:
+            logger.info("Compacting %d local segments", len(segments))
+            stale = segments
+            segment = self._new_segment(segments)
+            segments = [segment] if segment is not None else []
+        self._write_manifest(segments)
+        with self._lock:
+            self._segments = segments
+            flushed = {id(segment) for segment in pending}
+            self._pending = [
+                segment
+                for segment in self._pending
+                if id(segment) not in flushed
+            ]
+        for segment in stale:
+            shutil.rmtree(segment.path, ignore_errors=True)
+
+    async def flush(self):
+        await self._run(self._flush)
+
+    def _search(
+        self, queries: np.ndarray, top_k: int, filters: Dict[str, Any]
+    ) -> List[List[SearchHit]]:
+        for key in filters or {}:
+            if key not in FILTERABLE_FIELDS:
+                raise ValueError(f"Cannot filter on field: {key}")
+        queries = _normalize(np.atleast_2d(queries))
+        with self._lock:
+            segments = self._segments + self._pending
+
+        # Per query: candidate (score, segment, row) triples from every
+        # segment, merged at the end.
+        candidates = [[] for _ in range(len(queries))]
+        for seg_id, segment in enumerate(segments):
+            allowed = segment.allowed(filters)
+            n_first = top_k * (self.rescore_factor if segment.rescored else 1)
+            if self.mode == "ivf" and segment.centroids is not None:
+                for q, query in enumerate(queries):
+                    rows = segment.probe(query, self.n_probe)
+                    if allowed is not None:
+                        rows = rows[allowed[rows]]
+                    scores = segment.first_pass(query[None, :], rows)[0]
+                    top = _top_k(scores, n_first)
+                    candidates[q].extend(
+                        (score, seg_id, row)
+                        for score, row in segment.shortlist(
+                            query, rows[top], scores[top], top_k
+                        )
+                    )
+                continue
+
+            # First-pass top rows of every block, shortlisted per segment
+            # so rescoring reads ``n_first`` rows per query, not per block.
+            block_rows = (
+                SEARCH_BLOCK_ROWS if segment.codes is None else CODE_BLOCK_ROWS
+            )
+            first_rows = [[] for _ in range(len(queries))]
+            first_scores = [[] for _ in range(len(queries))]
+            for start in range(0, len(segment), block_rows):
+                stop = min(start + block_rows, len(segment))
+                scores = segment.first_pass(queries, slice(start, stop))
+                if allowed is not None:
+                    scores[:, ~allowed[start:stop]] = -np.inf
+                top = _top_k(scores, n_first)
+                for q in range(len(queries)):
+                    first_rows[q].append(start + top[q])
+                    first_scores[q].append(scores[q, top[q]])
+            for q, query in enumerate(queries):
+                if not first_rows[q]:
+                    continue
+                rows = np.concatenate(first_rows[q])
+                scores = np.concatenate(first_scores[q])
+                top = _top_k(scores, n_first)
+                candidates[q].extend(
+                    (score, seg_id, row)
+                    for score, row in segment.shortlist(
+                        query, rows[top], scores[top], top_k
+                    )
+                )
+
+        results = []
+        for query_candidates in candidates:
+            query_candidates.sort(key=lambda c: c[0], reverse=True)
+            results.append(
+                [
+                    segments[seg_id].hit(row, score)
+                    for score, seg_id, row in query_candidates[:top_k]
+                    if score > -np.inf
+                ]
+            )
+        return results
+
+    async def search(
+        self,
+        vectors: np.ndarray,
+        top_k: int = 5,
+        filters: Dict[str, Any] = None,
+    ) -> List[List[SearchHit]]:
+        return await self._run(self._search, vectors, top_k, filters)
+
+    def _delete(self, ids: List[str]):
+        # Not while a flush merges segments, or the tombstones set on its
+        # inputs would be lost when the merged segment replaces them.
+        with self._flush_lock:
+            self._delete_rows(ids)
+
+    def _delete_rows(self, ids: List[str]):
+        with self._lock:
+            segments = self._segments + self._pending
+        for segment in segments:
+            changed = False
+            for chunk_id in ids:
+                row = segment.row_of(chunk_id)
+                if row is not None and not segment.deleted[row]:
+                    segment.deleted[row] = True
+                    changed = True
+            if changed:
+                segment.save_deleted()
+
+    async def delete(self, ids: List[str]):
+        if ids:
+            await self._run(self._delete, ids)
+
+    async def close(self):
+        await self.flush()
+        if self._owner_lock is not None:
+            self._owner_lock.close()
+            self._owner_lock = None
+
+    def __str__(self):
+        codes = (
+            f", {self.quantization} codes"
+            if self.quantization != "none"
+            else ""
+        )
+        return f"Local Vector Store at {self.path} ({self.mode} search{codes})"
+
+    def __repr__(self):
+        return (
+            f"LocalVectorStore(path={self.path}, mode={self.mode}, "
+            f"quantization={self.quantization})"
+        )
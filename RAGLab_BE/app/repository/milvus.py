@@ -0,0 +1,274 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Dict, List
+
+import numpy as np
+from pymilvus import (
+    Collection,
+    CollectionSchema,
+    DataType,
+    FieldSchema,
+    connections,
+    utility,
+)
+
+from ..core.config import MILVUS_CONFIG, settings
+from ..core.logging import SingletonLogger
+from ..services.doc_processing.interfaces import ProcessedDocument
+from .interfaces import FILTERABLE_FIELDS, SearchHit, VectorStore, chunk_ids
+
+logger = SingletonLogger.get_logger()
+
+OUTPUT_FIELDS = ["text", "filename", "file_type", "chunk_index", "metadata"]
+
+
+class MilvusConnectionPool:
+    """Fixed pool of reusable Milvus connections.
+
+    Each connection is a pymilvus alias with its own gRPC channel, so
+    several inserts or searches can be in flight at once without opening a
+    new connection per request.
+    """
+
+    def __init__(self, size: int = None):
+        self.size = size or settings.MILVUS_POOL_SIZE
+        self._aliases: asyncio.Queue = None
+
+    def open(self):
+        self._aliases = asyncio.Queue()
+        for i in range(self.size):
+            alias = f"raglab-{i}"
+            connections.connect(
+                alias=alias,
+                uri=MILVUS_CONFIG["URI"],
+                token=MILVUS_CONFIG["TOKEN"],
+                db_name=MILVUS_CONFIG["DB_NAME"],
+            )
+            self._aliases.put_nowait(alias)
+        logger.info(f"Opened {self.size} Milvus connections")
+
+    @asynccontextmanager
+    async def acquire(self):
+        alias = await self._aliases.get()
+        try:
+            yield alias
+        finally:
+            self._aliases.put_nowait(alias)
+
+    def close(self):
+        for i in range(self.size):
+            connections.disconnect(f"raglab-{i}")
+
+
+class MilvusRepository(VectorStore):
+    """Milvus-backed vector store.
+
+    Point ``MILVUS_URI`` at a local file such as ``./api_data/milvus.db``
+    to run against milvus-lite instead of the docker-compose stack.
+
+    Rows are upserted by chunk id, so a retried job never duplicates
+    them. They are searchable as soon as they are written, and Milvus
+    seals segments on its own; ``flush`` only forces a seal once every
+    ``MILVUS_FLUSH_INTERVAL`` seconds, since frequent flushes leave many
+    small segments behind.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = None,
+        dim: int = None,
+        insert_batch_size: int = None,
+        pool: MilvusConnectionPool = None,
+        flush_interval: float = None,
+    ):
+        self.collection_name = (
+            collection_name or MILVUS_CONFIG["COLLECTION_NAME"]
+        )
+        self.dim = dim or MILVUS_CONFIG["VECTOR_DIM"]
+        self.insert_batch_size = (
+            insert_batch_size or settings.MILVUS_INSERT_BATCH_SIZE
+        )
+        self.pool = pool or MilvusConnectionPool()
+        self.flush_interval = (
+            settings.MILVUS_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self._collections: Dict[str, Collection] = {}
+        self._last_flush = time.monotonic()
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(fn, *args, **kwargs))
+
+    def _collection(self, alias: str) -> Collection:
+        if alias not in self._collections:
+            self._collections[alias] = Collection(
+                self.collection_name, using=alias
+            )
+        return self._collections[alias]
+
+    def _schema(self) -> CollectionSchema:
+        return CollectionSchema(
+            fields=[
+                FieldSchema(
+                    "id", DataType.VARCHAR, is_primary=True, max_length=1024
+                ),
+                FieldSchema("embedding", DataType.FLOAT_VECTOR, dim=self.dim),
+                FieldSchema("text", DataType.VARCHAR, max_length=65535),
+                FieldSchema("filename", DataType.VARCHAR, max_length=512),
+                FieldSchema("file_type", DataType.VARCHAR, max_length=16),
+                FieldSchema("chunk_index", DataType.INT64),
+                FieldSchema("metadata", DataType.JSON),
+            ],
+            description="RAG Lab document chunks",
+        )
+
+    def _create_if_missing(self, alias: str):
+        if utility.has_collection(self.collection_name, using=alias):
+            collection = Collection(self.collection_name, using=alias)
+        else:
+            logger.info(f"Creating Milvus collection {self.collection_name}")
+            collection = Collection(
+                self.collection_name, schema=self._schema(), using=alias
+            )
+        if not collection.has_index():
+            logger.info(
+                f"Creating {settings.MILVUS_INDEX_TYPE} index on "
+                f"{self.collection_name}"
+            )
+            collection.create_index(
+                "embedding",
+                {
+                    "index_type": settings.MILVUS_INDEX_TYPE,
+                    "metric_type": settings.MILVUS_METRIC_TYPE,
+                    "params": settings.MILVUS_INDEX_PARAMS,
+                },
+            )
+        collection.load()
+
+    async def initialize(self):
+        self.pool.open()
+        async with self.pool.acquire() as alias:
+            await self._run(self._create_if_missing, alias)
+
+    async def _upsert_columns(self, columns: List[Any]):
+        async with self.pool.acquire() as alias:
+            await self._run(self._collection(alias).upsert, columns)
+
+    async def insert_many(self, document: ProcessedDocument) -> int:
+        """Upsert a batch column by column, split into bulk requests."""
+        n = len(document)
+        if n == 0:
+            return 0
+        ids = chunk_ids(document)
+        texts = document.texts
+        chunk_indices = document.chunk_indices
+        embeddings = np.asarray(document.embeddings, dtype=np.float32)
+        metadata = document.metadata
+        extra = {
+            key: value
+            for key, value in metadata.items()
+            if key not in FILTERABLE_FIELDS
+        }
+
+        requests = []
+        for start in range(0, n, self.insert_batch_size):
+            stop = min(start + self.insert_batch_size, n)
+            size = stop - start
+            requests.append(
+                self._upsert_columns(
+                    [
+                        ids[start:stop],
+                        list(embeddings[start:stop]),
+                        texts[start:stop],
+                        [metadata["filename"]] * size,
+                        [metadata["file_type"]] * size,
+                        chunk_indices[start:stop].tolist(),
+                        [extra] * size,
+                    ]
+                )
+            )
+        await asyncio.gather(*requests)
+        return n
+
+    async def flush(self):
+        """Seal segments if ``flush_interval`` passed since the last time;
+        a non-positive interval leaves sealing to Milvus entirely."""
+        now = time.monotonic()
+        if self.flush_interval <= 0:
+            return
+        if now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        async with self.pool.acquire() as alias:
+            await self._run(self._collection(alias).flush)
+
+    @staticmethod
+    def _filter_expr(filters: Dict[str, Any]) -> str:
+        clauses = []
+        for key, value in (filters or {}).items():
+            if key not in FILTERABLE_FIELDS:
+                raise ValueError(f"Cannot filter on field: {key}")
+            clauses.append(f"{key} == {json.dumps(value)}")
+        return " and ".join(clauses) or None
+
+    async def search(
+        self,
+        vectors: np.ndarray,
+        top_k: int = 5,
+        filters: Dict[str, Any] = None,
+    ) -> List[List[SearchHit]]:
+        async with self.pool.acquire() as alias:
+            results = await self._run(
+                self._collection(alias).search,
+                data=np.asarray(vectors, dtype=np.float32),
+                anns_field="embedding",
+                param={
+                    "metric_type": settings.MILVUS_METRIC_TYPE,
+                    "params": settings.MILVUS_SEARCH_PARAMS,
+                },
+                limit=top_k,
+                expr=self._filter_expr(filters),
+                output_fields=OUTPUT_FIELDS,
+            )
+        return [
+            [
+                SearchHit(
+                    id=hit.id,
+                    score=hit.distance,
+                    text=hit.entity.get("text"),
+                    metadata={
+                        **(hit.entity.get("metadata") or {}),
+                        "filename": hit.entity.get("filename"),
+                        "file_type": hit.entity.get("file_type"),
+                        "chunk_index": hit.entity.get("chunk_index"),
+                    },
+                )
+                for hit in hits
+            ]
+            for hits in results
+        ]
+
+    async def delete(self, ids: List[str]):
+        if not ids:
+            return
+        async with self.pool.acquire() as alias:
+            await self._run(
+                self._collection(alias).delete, f"id in {json.dumps(ids)}"
+            )
+
+    async def close(self):
+        self.pool.close()
+
+    def __str__(self):
+        return f"Milvus Repository for collection {self.collection_name}"
+
+    def __repr__(self):
+        return (
+            f"MilvusRepository(collection_name={self.collection_name}, "
+            f"dim={self.dim})"
+        )
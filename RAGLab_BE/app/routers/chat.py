@@ -0,0 +1,109 @@
+import json
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ..core.logging import SingletonLogger
+from ..models.chat import ChatRequest
+from ..services.chat import ChatService, get_chat_service
+
+router = APIRouter(prefix="/chat")
+logger = SingletonLogger.get_logger()
+
+
+def _payload(event: str, data):
+    if event == "sources":
+        return [result.model_dump() for result in data]
+    return data
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(_payload(event, data))}\n\n"
+
+
+def _chat_events(chat_service: ChatService, request: ChatRequest):
+    return chat_service.stream_answer(
+        request.query,
+        history=request.history,
+        top_k=request.top_k,
+        filters=request.filters.to_dict() if request.filters else None,
+    )
+
+
+@router.post("/")
+async def chat(
+    request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service),
+):
+    """Answer a query as a Server-Sent Events stream.
+
+    Emits one ``sources`` event, a ``token`` event per generated token and a
+    final ``done`` event carrying the latency metrics.
+    """
+    events = _chat_events(chat_service, request)
+    try:
+        # Pull the first event here so bad filters still return a 400.
+        first = await events.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def sse():
+        try:
+            yield _sse(*first)
+            async for event, data in events:
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"Chat stream failed: {str(e)}")
+            yield _sse("error", str(e))
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def chat_ws(websocket: WebSocket):
+    """Persistent chat session; each received request is answered in turn.
+
+    Messages sent back are ``{"type": <event>, "data": ...}`` objects.
+    """
+    chat_service = getattr(websocket.app.state, "chat_service", None)
+    if chat_service is None:
+        await websocket.close(code=1013, reason="Chat service not ready")
+        return
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                request = ChatRequest.model_validate_json(
+                    await websocket.receive_text()
+                )
+                async for event, data in _chat_events(chat_service, request):
+                    await websocket.send_json(
+                        {"type": event, "data": _payload(event, data)}
+                    )
+            except WebSocketDisconnect:
+                raise
+            except (ValidationError, ValueError) as e:
+                await websocket.send_json({"type": "error", "data": str(e)})
+            except Exception as e:
+                # A failed answer ends that request, not the session.
+                logger.error(f"Chat websocket request failed: {str(e)}")
+                await websocket.send_json({"type": "error", "data": str(e)})
+    except WebSocketDisconnect:
+        logger.debug("Chat websocket disconnected")
+
+
+@router.get("/stats")
+async def chat_stats(chat_service: ChatService = Depends(get_chat_service)):
+    """p50/p99 retrieval, time-to-first-token and total latency."""
+    return chat_service.stats.summary()
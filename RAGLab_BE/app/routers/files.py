@@ -1,19 +1,26 @@
+import asyncio
+import hashlib
 import os
+import uuid
+from typing import Any, Dict, List, Tuple
 
 from fastapi import (
     APIRouter,
     File,
     UploadFile,
     HTTPException,
-    BackgroundTasks,
     Depends,
+    Query,
+    Request,
 )
 
-from ..models.documents import validate_document
-from ..services.embedding import EmbeddingService, get_embedding_service
+from ..models.documents import is_supported_type, validate_document
+from ..models.jobs import Job, JobStatus
+from ..core.config import settings
 from ..core.logging import SingletonLogger
-from ..services.doc_processing.pipeline import DocumentProcessingPipeline
-from ..services.doc_processing.chunkers import TextChunker
+from ..services.jobs import JobQueue, get_job_queue
+from ..services.registry import DocumentRegistry, get_document_registry
+from ..services.uploads import MultipartUploadReceiver, ReceivedFile
 
 router = APIRouter(prefix="/documents")
 UPLOAD_DIR = "./api_data/file_locker/"
@@ -21,34 +28,246 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 logger = SingletonLogger.get_logger()
 
 
+def _save_upload(file: UploadFile, path: str) -> ReceivedFile:
+    """Write an upload to ``path``, hashing it and enforcing the size limit.
+
+    Blocking; run it in a worker thread.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as f:
+        while content := file.file.read(1024 * 1024):
+            size += len(content)
+            if size > settings.MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=(
+                        f"{file.filename} exceeds "
+                        f"{settings.MAX_UPLOAD_BYTES} bytes"
+                    ),
+                )
+            digest.update(content)
+            f.write(content)
+    return ReceivedFile(
+        filename=file.filename,
+        content_type=file.content_type,
+        path=path,
+        size=size,
+        content_hash=digest.hexdigest(),
+    )
+
+
+def _discard(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def _enqueue(
+    received: List[ReceivedFile],
+    job_queue: JobQueue,
+    registry: DocumentRegistry,
+) -> List[Dict[str, Any]]:
+    """
+    Deduplicate received uploads and queue the rest as one batch.
+
+    Identical bytes already ingested, queued for ingestion, or sent
+    earlier in the same request are linked instead of extracted and
+    embedded again.
+
+    Args:
+        received: Uploads stored at temporary paths
+        job_queue: Queue for the uploads that need processing
+        registry: Registry of ingested documents
+
+    Returns:
+        List[Dict[str, Any]]: One result per upload, in order
+    """
+    results: List[Dict[str, Any]] = []
+    to_queue: List[Tuple[int, str, str]] = []
+    queued: Dict[str, int] = {}
+    links: List[Tuple[int, int]] = []
+    for upload in received:
+        existing = await asyncio.to_thread(
+            registry.find_by_hash, upload.content_hash
+        )
+        active = None
+        if existing is None:
+            active = await asyncio.to_thread(
+                job_queue.store.find_active, upload.content_hash
+            )
+        if existing is not None:
+            canonical = existing["filename"]
+        elif active is not None:
+            canonical = active.filename
+        elif upload.content_hash in queued:
+            first = queued[upload.content_hash]
+            canonical = results[first]["document"]
+            links.append((len(results), first))
+        else:
+            canonical = None
+
+        if canonical is not None:
+            await asyncio.to_thread(_discard, upload.path)
+            if canonical != upload.filename:
+                # Whatever the name held before must not match searches
+                # alongside the chunks it now shares with ``canonical``.
+                await job_queue.pipeline.remove_document(upload.filename)
+                await asyncio.to_thread(
+                    registry.add_alias,
+                    upload.filename,
+                    canonical,
+                    upload.content_hash,
+                )
+            logger.info(
+                "Duplicate upload: %s of %s", upload.filename, canonical
+            )
+            results.append(
+                {
+                    "message": (
+                        f"{upload.filename} is identical to {canonical}; "
+                        "reusing its chunks."
+                    ),
+                    "job_id": active.id if active else None,
+                    "dedup": True,
+                    "document": canonical,
+                }
+            )
+            continue
+
+        # Per revision, so a new upload never replaces the file a running
+        # job for the same name is still reading.
+        fname = os.path.join(
+            UPLOAD_DIR, f"{upload.filename}.{upload.content_hash[:16]}"
+        )
+        await asyncio.to_thread(os.replace, upload.path, fname)
+        await asyncio.to_thread(registry.remove_alias, upload.filename)
+        logger.info("File saved: %s", upload.filename)
+        queued[upload.content_hash] = len(results)
+        to_queue.append((len(results), fname, upload.content_hash))
+        results.append(
+            {
+                "message": f"Started processing file: {upload.filename}.",
+                "job_id": None,
+                "dedup": False,
+                "document": upload.filename,
+            }
+        )
+
+    jobs = await job_queue.submit_many(
+        [(results[i]["document"], path, h) for i, path, h in to_queue]
+    )
+    for (i, _, _), job in zip(to_queue, jobs):
+        results[i]["job_id"] = job.id
+    for i, first in links:
+        results[i]["job_id"] = results[first]["job_id"]
+    return results
+
+
 @router.post("/upload/")
 async def file_upload(
-    background_task: BackgroundTasks,
     file: UploadFile = File(...),
-    embedding_service: EmbeddingService = Depends(get_embedding_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+    registry: DocumentRegistry = Depends(get_document_registry),
 ):
     if not validate_document(file):
         raise HTTPException(status_code=400, detail="Invalid document type")
+    # Only the final component, so the name cannot escape UPLOAD_DIR.
+    file.filename = os.path.basename(file.filename or "")
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Missing filename")
+    partial = os.path.join(
+        UPLOAD_DIR, f"{file.filename}.{uuid.uuid4().hex}.part"
+    )
     try:
-        fname = os.path.join(UPLOAD_DIR, file.filename)
+        # Hashed while written to disk, so checking for a duplicate costs
+        # no extra pass over the file.
+        upload = await asyncio.to_thread(_save_upload, file, partial)
+        return (await _enqueue([upload], job_queue, registry))[0]
+    except HTTPException:
+        await asyncio.to_thread(_discard, partial)
+        raise
+    except Exception as e:
+        await asyncio.to_thread(_discard, partial)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Create pipeline with sentence-based chunking
-        pipeline = DocumentProcessingPipeline(
-            embedding_service=embedding_service,
-            # vector_store=vector_store,
-            chunker=TextChunker(chunk_size=512, chunk_overlap=32),
-        )
-        logger.info(
-            f"Processing file: {file.filename}\n"
-            f"{pipeline.embedding_service}\n"
-            f"{pipeline.chunker}"
-        )
-        with open(fname, "wb") as f:
-            while content := file.file.read(1024 * 1024):
-                f.write(content)
-        logger.info(f"File saved: {file.filename}")
-        background_task.add_task(pipeline.process_file, fname, file.filename)
-        logger.info(f"Processing file: {file.filename}")
-        return {"message": f"Started processing file: {file.filename}."}
+
+@router.post(
+    "/upload/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "files": {
+                                "type": "array",
+                                "items": {
+                                    "type": "string",
+                                    "format": "binary",
+                                },
+                            }
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+async def batch_upload(
+    request: Request,
+    job_queue: JobQueue = Depends(get_job_queue),
+    registry: DocumentRegistry = Depends(get_document_registry),
+):
+    """Upload several documents in one request and queue them together.
+
+    The body is streamed to disk part by part as it arrives. Files of an
+    unsupported type are skipped and reported with an ``error``.
+    """
+    receiver = MultipartUploadReceiver(UPLOAD_DIR)
+    received = await receiver.receive(request)
+    try:
+        accepted, rejected = [], {}
+        for upload in received:
+            if is_supported_type(upload.content_type):
+                accepted.append(upload)
+            else:
+                await asyncio.to_thread(_discard, upload.path)
+                rejected[upload.path] = upload.filename
+        results = iter(await _enqueue(accepted, job_queue, registry))
     except Exception as e:
+        for upload in received:
+            await asyncio.to_thread(_discard, upload.path)
         raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "uploads": [
+            (
+                {
+                    "document": upload.filename,
+                    "error": "Invalid document type",
+                }
+                if upload.path in rejected
+                else next(results)
+            )
+            for upload in received
+        ]
+    }
+
+
+@router.get("/jobs/", response_model=List[Job])
+async def list_jobs(
+    status: JobStatus = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    return job_queue.store.list(status=status, limit=limit, offset=offset)
+
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
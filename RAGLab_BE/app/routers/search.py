@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..core.logging import SingletonLogger
+from ..models.search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchRequest,
+    SearchResponse,
+)
+from ..services.search import SearchService, get_search_service
+
+router = APIRouter(prefix="/search")
+logger = SingletonLogger.get_logger()
+
+
+@router.post("/", response_model=SearchResponse)
+async def search(
+    request: SearchRequest,
+    search_service: SearchService = Depends(get_search_service),
+):
+    try:
+        results, timings = await search_service.search(
+            request.query,
+            top_k=request.top_k,
+            filters=request.filters.to_dict() if request.filters else None,
+            offset=request.offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SearchResponse(results=results, timings_ms=timings)
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def batch_search(
+    request: BatchSearchRequest,
+    search_service: SearchService = Depends(get_search_service),
+):
+    try:
+        results, timings = await search_service.search_many(
+            request.queries,
+            top_k=request.top_k,
+            filters=request.filters.to_dict() if request.filters else None,
+            offset=request.offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return BatchSearchResponse(results=results, timings_ms=timings)
+
+
+@router.get("/stats")
+async def search_stats(
+    search_service: SearchService = Depends(get_search_service),
+):
+    """p50/p99 latency per stage over the recent query window."""
+    return search_service.stats.summary()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from fastapi import HTTPException, Request
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+from ..core.metrics import CHAT_STAGE_SECONDS
+from ..models.chat import ChatMessage
+from ..models.search import SearchResult
+from .llm import LLMClient
+from .search import LatencyStats, SearchService
+
+logger = SingletonLogger.get_logger()
+
+CHAT_STAGES = ("retrieval", "ttft", "total")
+
+SYSTEM_PROMPT = (
+    "You are RAG Lab's assistant. Answer the question using only the "
+    "numbered context passages. Cite passages as [n]. If the context does "
+    "not contain the answer, say so."
+)
+
+ChatEvent = Tuple[str, Any]
+
+
+class ChatService:
+    """Retrieval-augmented chat that streams tokens as they are generated.
+
+    Query embedding and retrieval start immediately and run while the rest
+    of the prompt is assembled; the first LLM token is forwarded as soon as
+    it arrives. Time to first token is tracked alongside retrieval and total
+    latency.
+    """
+
+    def __init__(
+        self,
+        search_service: SearchService,
+        llm: LLMClient,
+        stats: LatencyStats = None,
+    ):
+        self.search_service = search_service
+        self.llm = llm
+        self.stats = stats or LatencyStats(
+            stages=CHAT_STAGES, histogram=CHAT_STAGE_SECONDS
+        )
+
+    @staticmethod
+    def _history_messages(
+        history: List[ChatMessage],
+    ) -> List[Dict[str, str]]:
+        recent = history[-settings.CHAT_HISTORY_TURNS * 2 :]
+        return [{"role": m.role, "content": m.content} for m in recent]
+
+    @staticmethod
+    def _context_message(
+        query: str, results: List[SearchResult]
+    ) -> Dict[str, str]:
+        passages = "\n\n".join(
+            f"[{i}] ({r.metadata.get('filename')}) {r.text}"
+            for i, r in enumerate(results, start=1)
+        )
+        return {
+            "role": "user",
+            "content": f"Context:\n{passages}\n\nQuestion: {query}",
+        }
+
+    async def stream_answer(
+        self,
+        query: str,
+        history: List[ChatMessage] = None,
+        top_k: int = None,
+        filters: Dict[str, Any] = None,
+    ) -> AsyncIterator[ChatEvent]:
+        """
+        Answer a query, yielding ``(event, data)`` pairs.
+
+        Events are ``sources`` (retrieved chunks), ``token`` (text as the
+        LLM emits it) and ``done`` (latency metrics in ms).
+        """
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        retrieval = asyncio.create_task(
+            self.search_service.search(
+                query, top_k=top_k or settings.CHAT_TOP_K, filters=filters
+            )
+        )
+        try:
+            # Built while the query is being embedded and searched.
+            messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+            messages += self._history_messages(history or [])
+            with self.stats.measure("retrieval", timings):
+                results, search_timings = await retrieval
+        finally:
+            retrieval.cancel()
+        messages.append(self._context_message(query, results))
+        yield "sources", results
+
+        first_token = True
+        async for token in self.llm.stream(messages):
+            if first_token:
+                self.stats.record("ttft", time.perf_counter() - start, timings)
+                first_token = False
+            yield "token", token
+        self.stats.record("total", time.perf_counter() - start, timings)
+        yield "done", {**search_timings, **timings}
+
+    def __str__(self):
+        return f"Chat Service with {self.llm}"
+
+    def __repr__(self):
+        return f"ChatService(llm={self.llm!r})"
+
+
+async def get_chat_service(request: Request) -> ChatService:
+    """Dependency to get the chat service from app state."""
+    if not hasattr(request.app.state, "chat_service"):
+        raise HTTPException(
+            status_code=503, detail="Chat service not initialized"
+        )
+    return request.app.state.chat_service
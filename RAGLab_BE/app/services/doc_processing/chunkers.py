@@ -1,42 +1,276 @@
-from typing import List
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import numpy as np
 
 from ...core.logging import SingletonLogger
 
 logger = SingletonLogger.get_logger()
 
+# Approximate token length in characters, used to size streaming buffers.
+CHARS_PER_TOKEN = 4
+
+# Whitespace outside ASCII, as accepted by str.isspace.
+_UNICODE_SPACES = np.array(
+    [0x85, 0xA0, 0x1680, *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F]
+    + [0x205F, 0x3000],
+    dtype=np.uint32,
+)
+
+# Longer words (URLs, base64, ...) are cut into pieces so a single unit
+# never outgrows a chunk.
+_MAX_UNIT_CHARS = 64
+
+# Distinct words whose token counts are remembered between calls.
+_TOKEN_CACHE_SIZE = 500_000
+
+# Boundary strength: where a chunk may end, from most to least preferred.
+# Word boundaries (whitespace between units) have strength 1.
+_BOUNDARIES = (
+    (re.compile(r"\n[^\S\n]*\n\s*"), 4),  # paragraph
+    (re.compile(r"\n\s*"), 3),  # line
+    (re.compile(r"[.!?][\"')\]]*\s+"), 2),  # sentence
+)
+
 
 class TextChunker:
-    """Chunks text with overlapping windows."""
+    """Chunks text with overlapping windows measured in model tokens.
+
+    Text is cut into whitespace-separated words with one vectorized pass
+    over its code points. Each distinct word is tokenized once, in batched
+    calls, and its token count cached. Chunk lengths are therefore exact
+    model token counts for WordPiece tokenizers (BERT, MPNet), which never
+    merge tokens across whitespace, and close for others.
+
+    Chunks are then found by one scan over the words' running token count
+    and a precomputed boundary-strength array: each chunk ends at the
+    strongest boundary (paragraph, line, sentence, then word) in the second
+    half of a ``chunk_size``-token window, so no chunk exceeds the model's
+    input limit and nothing is split recursively.
+
+    Without a tokenizer, every word counts as one token.
+    """
 
     def __init__(
         self,
         chunk_size: int = 512,
         chunk_overlap: int = 32,
-        separator: str = " ",
+        tokenizer: Any = None,
     ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.separator = separator
+        self.tokenizer = tokenizer
+        self._token_counts: Dict[str, int] = {}
+
+    @classmethod
+    def for_model(cls, model, chunk_overlap: int = 32) -> "TextChunker":
+        """Chunker sized to a SentenceTransformer's input limit.
+
+        Args:
+            model: Loaded SentenceTransformer whose tokenizer is reused
+            chunk_overlap: Tokens shared by consecutive chunks
+
+        Returns:
+            TextChunker: Chunker whose chunks are never truncated
+        """
+        tokenizer = model.tokenizer
+        chunk_size = (
+            model.max_seq_length - tokenizer.num_special_tokens_to_add()
+        )
+        return cls(chunk_size, chunk_overlap, tokenizer=tokenizer)
+
+    @staticmethod
+    def _spans(text: str) -> np.ndarray:
+        """Character ``(start, end)`` of every word, shape ``(n, 2)``.
+
+        Whitespace is what ``str.isspace`` accepts, so the spans line up
+        one to one with ``text.split()``.
+        """
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        space = (
+            (codes == 32)
+            | ((codes >= 9) & (codes <= 13))
+            | ((codes >= 28) & (codes <= 31))
+            | ((codes >= 0x85) & np.isin(codes, _UNICODE_SPACES))
+        )
+        edges = np.diff(np.concatenate(([1], space, [1])).astype(np.int8))
+        starts = np.flatnonzero(edges == -1)
+        ends = np.flatnonzero(edges == 1)
+        return np.stack([starts, ends], axis=1).astype(np.int64)
+
+    def _count_tokens(self, words: List[str]) -> List[int]:
+        """Model tokens in each word, tokenizing unseen words in one batch."""
+        counts = self._token_counts
+        missing = list(set(words).difference(counts))
+        if missing:
+            if len(counts) + len(missing) > _TOKEN_CACHE_SIZE:
+                counts.clear()
+            encoded = self.tokenizer(
+                missing,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )
+            counts.update(
+                zip(missing, (len(ids) for ids in encoded["input_ids"]))
+            )
+        return list(map(counts.__getitem__, words))
+
+    def _units(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Spans of the units chunks are built from, and their token counts.
+
+        Units are words; words longer than a chunk allows (URLs, base64 and
+        the like) are cut into fixed-size pieces first.
+        """
+        spans = self._spans(text)
+        if self.tokenizer is None:
+            weights = np.ones(len(spans), dtype=np.int64)
+        else:
+            weights = np.array(
+                self._count_tokens(text.split()), dtype=np.int64
+            )
+        long = np.flatnonzero(spans[:, 1] - spans[:, 0] > _MAX_UNIT_CHARS)
+        if len(long) == 0:
+            return spans, weights
+
+        pieces, piece_weights = [], []
+        for i in long.tolist():
+            start, end = spans[i].tolist()
+            cuts = list(range(start, end, _MAX_UNIT_CHARS)) + [end]
+            pieces.append(np.column_stack([cuts[:-1], cuts[1:]]))
+            if self.tokenizer is None:
+                piece_weights.append(np.ones(len(cuts) - 1, np.int64))
+            else:
+                piece_weights.append(
+                    self._count_tokens(
+                        [text[a:b] for a, b in zip(cuts[:-1], cuts[1:])]
+                    )
+                )
+        keep = np.ones(len(spans), dtype=bool)
+        keep[long] = False
+        # Splice the pieces in where their words were.
+        owner = np.concatenate(
+            [np.flatnonzero(keep)]
+            + [np.full(len(p), i) for i, p in zip(long, pieces)]
+        )
+        order = np.argsort(owner, kind="stable")
+        spans = np.concatenate([spans[keep]] + pieces)[order]
+        weights = np.concatenate(
+            [weights[keep]]
+            + [np.asarray(w, dtype=np.int64) for w in piece_weights]
+        )[order]
+        return spans, weights
+
+    @staticmethod
+    def _strengths(text: str, spans: np.ndarray) -> np.ndarray:
+        """Boundary strength of ending a chunk before each unit."""
+        n = len(spans)
+        strength = np.zeros(n + 1, dtype=np.int8)
+        strength[n] = _BOUNDARIES[0][1]
+        strength[1:n][spans[1:, 0] > spans[:-1, 1]] = 1
+        unit_starts = spans[:, 0]
+        for pattern, level in _BOUNDARIES:
+            ends = [m.end() for m in pattern.finditer(text)]
+            if not ends:
+                continue
+            idx = np.searchsorted(unit_starts, ends)
+            # Only positions where a unit actually starts are boundaries.
+            idx = idx[(idx > 0) & (idx < n)]
+            np.maximum.at(strength, idx, level)
+        return strength
+
+    def split(self, text: str) -> List[str]:
+        """Split text into overlapping chunks of at most chunk_size tokens."""
+        return [text[start:end] for start, end in self.spans(text)]
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """Character ranges of the chunks ``split`` returns."""
+        units, weights = self._units(text)
+        n = len(units)
+        if n == 0:
+            return []
+        # tokens[i] is the token count of units[:i].
+        tokens = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(weights, out=tokens[1:])
+        strength = self._strengths(text, units)
+        size, overlap = self.chunk_size, self.chunk_overlap
+
+        # Scalar lookups are cheaper with bisect on a list than with numpy.
+        totals = tokens.tolist()
+        chunks = []
+        start = 0
+        while True:
+            # Furthest end that keeps the chunk within size tokens.
+            end = bisect_right(totals, totals[start] + size) - 1
+            if end >= n:
+                cut = n
+            elif end <= start:
+                cut = start + 1
+            else:
+                lo = bisect_left(totals, totals[start] + size // 2)
+                lo = min(max(lo, start + 1), end)
+                window = strength[lo : end + 1]
+                best = window.max()
+                if best == 0:
+                    cut = end
+                else:
+                    cut = lo + len(window) - 1
+                    cut -= int(np.argmax(window[::-1] == best))
+            chunks.append((int(units[start, 0]), int(units[cut - 1, 1])))
+            if cut == n:
+                return chunks
+
+            next_start = bisect_left(totals, totals[cut] - overlap)
+            next_start = max(next_start, start + 1)
+            if overlap:
+                # Start the overlap on a word, not inside one.
+                words = np.flatnonzero(strength[next_start:cut])
+                next_start = next_start + words[0] if len(words) else cut
+            start = int(next_start)
 
     async def chunk_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks."""
         logger.info(
-            f"Chunking text with size {self.chunk_size}\
-                and overlap {self.chunk_overlap}"
+            f"Chunking text with size {self.chunk_size} "
+            f"and overlap {self.chunk_overlap}"
         )
+        return self.split(text)
 
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            is_separator_regex=False,
-        )
+    async def chunk_stream(
+        self,
+        sections: AsyncIterator[str],
+        buffer_chunks: int = 16,
+        separator: str = "\n",
+    ) -> AsyncIterator[str]:
+        """Chunk a stream of text sections incrementally.
 
-        text_chunks = splitter.split_text(text)
+        Sections are buffered until roughly ``buffer_chunks`` chunks' worth
+        of text is available, then split. The last chunk of each split may
+        continue into the next section, so it is carried over and re-split
+        with the following text; this keeps overlap and chunk boundaries
+        consistent across page boundaries while holding only a bounded
+        amount of text in memory. Sections are joined with ``separator``,
+        the ``section_separator`` of the processor that produced them.
+        """
+        threshold = self.chunk_size * buffer_chunks * CHARS_PER_TOKEN
+        buffer = ""
+        async for section in sections:
+            buffer = f"{buffer}{separator}{section}" if buffer else section
+            if len(buffer) < threshold:
+                continue
+            spans = self.spans(buffer)
+            for start, end in spans[:-1]:
+                yield buffer[start:end]
+            # From the start of the last chunk, with the whitespace after
+            # it, which separates it from the next section.
+            buffer = buffer[spans[-1][0] :] if spans else ""
 
-        return text_chunks
+        if buffer:
+            for chunk in self.split(buffer):
+                yield chunk
 
     def __str__(self):
         return (
@@ -0,0 +1,161 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from multiprocessing.pool import Pool
+from typing import Any, Callable, Set
+
+from fastapi import Request
+
+from ...core.config import settings
+from ...core.logging import SingletonLogger
+
+logger = SingletonLogger.get_logger()
+
+
+class ExtractionExecutor:
+    """Executor layer for document extraction.
+
+    CPU-bound parsing runs in worker processes so it neither blocks the
+    event loop nor contends for the GIL; file I/O runs in a thread pool.
+    Every task is bounded by a timeout.
+
+    Each of the ``max_workers`` process slots runs one task at a time, so
+    a task's timeout starts when it starts running rather than while it
+    waits for a slot. A task that times out takes down only its own slot's
+    process, which is started again for the next task.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        io_workers: int = None,
+        timeout: float = None,
+    ):
+        self.max_workers = (
+            max_workers or settings.EXTRACTION_WORKERS or os.cpu_count()
+        )
+        self.io_workers = io_workers or settings.EXTRACTION_IO_WORKERS
+        self.timeout = timeout or settings.EXTRACTION_TIMEOUT
+        # Idle slots; None until a slot's process is first needed.
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.max_workers):
+            self._slots.put_nowait(None)
+        self._workers: Set[Pool] = set()
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.io_workers, thread_name_prefix="raglab-io"
+        )
+
+    def _new_worker(self) -> Pool:
+        # Spawn rather than fork: the parent holds torch threads and an
+        # event loop, neither of which survives a fork safely.
+        worker = multiprocessing.get_context("spawn").Pool(processes=1)
+        self._workers.add(worker)
+        return worker
+
+    def _stop_worker(self, worker: Pool):
+        """Kill a slot's process, abandoning the task it is running."""
+        self._workers.discard(worker)
+        worker.terminate()
+
+    @staticmethod
+    def _submit(worker: Pool, fn: Callable, args: tuple) -> asyncio.Future:
+        """Start ``fn(*args)`` in ``worker``; the future settles with its
+        outcome."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(method, value):
+            if not future.done():
+                method(value)
+
+        worker.apply_async(
+            fn,
+            args,
+            callback=lambda result: loop.call_soon_threadsafe(
+                settle, future.set_result, result
+            ),
+            error_callback=lambda error: loop.call_soon_threadsafe(
+                settle, future.set_exception, error
+            ),
+        )
+        return future
+
+    async def run_cpu(self, fn: Callable, *args: Any) -> Any:
+        """
+        Run a CPU-bound callable in a worker process.
+
+        Args:
+            fn: Picklable callable
+            *args: Picklable arguments
+
+        Returns:
+            Any: The callable's result
+
+        Raises:
+            asyncio.TimeoutError: If the task runs longer than the timeout
+        """
+        worker = await self._slots.get()
+        future = None
+        try:
+            if worker is None:
+                worker = self._new_worker()
+                # Not part of the task's time: a spawned process starts by
+                # importing the app.
+                await asyncio.wait_for(
+                    self._submit(worker, os.getpid, ()), self.timeout
+                )
+            future = self._submit(worker, fn, args)
+            return await asyncio.wait_for(
+                asyncio.shield(future), self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                "Extraction task %s timed out after %ss, restarting its "
+                "worker process",
+                fn.__qualname__,
+                self.timeout,
+            )
+            raise
+        finally:
+            # Still running after a timeout or cancellation: the process
+            # is not free for another task, so replace it.
+            if worker is not None and not (future and future.done()):
+                await asyncio.to_thread(self._stop_worker, worker)
+                worker = None
+            self._slots.put_nowait(worker)
+
+    async def run_io(self, fn: Callable, *args: Any) -> Any:
+        """Run a blocking I/O callable in the thread pool."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._thread_pool, partial(fn, *args))
+        return await asyncio.wait_for(future, self.timeout)
+
+    async def run(self, fn: Callable, *args: Any, io_bound: bool = False):
+        """Dispatch to the thread pool or the process pool."""
+        if io_bound:
+            return await self.run_io(fn, *args)
+        return await self.run_cpu(fn, *args)
+
+    def shutdown(self):
+        for worker in list(self._workers):
+            self._stop_worker(worker)
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+
+    def __str__(self):
+        return (
+            f"Extraction Executor with {self.max_workers} processes "
+            f"and {self.io_workers} I/O threads"
+        )
+
+    def __repr__(self):
+        return (
+            f"ExtractionExecutor(max_workers={self.max_workers}, "
+            f"io_workers={self.io_workers}, timeout={self.timeout})"
+        )
+
+
+async def get_extraction_executor(request: Request) -> ExtractionExecutor:
+    """Dependency to get the shared extraction executor from app state."""
+    return getattr(request.app.state, "extraction_executor", None)
@@ -1,11 +1,15 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, BinaryIO
+from typing import List, Dict, Any, AsyncIterator, Optional, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 
 from ...core.logging import SingletonLogger
 
+if TYPE_CHECKING:
+    from .executors import ExtractionExecutor
+
 logger = SingletonLogger.get_logger()
 
 
@@ -18,35 +22,178 @@ class DocumentType(Enum):
     MD = "md"
 
 
-@dataclass
 class DocumentChunk:
-    """Represents a chunk of text from a document."""
+    """View of a single chunk inside a ProcessedDocument.
 
-    embedding: np.ndarray
-    metadata: Dict[str, Any]
+    Holds only a reference to the document and a row number; the embedding
+    is a row view of the document's matrix and nothing is copied.
+    """
+
+    __slots__ = ("document", "index")
+
+    def __init__(self, document: "ProcessedDocument", index: int):
+        self.document = document
+        self.index = index
+
+    @property
+    def embedding(self) -> np.ndarray:
+        return self.document.embeddings[self.index]
+
+    @property
+    def text(self) -> str:
+        return self.document.text(self.index)
+
+    @property
+    def chunk_index(self) -> int:
+        return int(self.document.chunk_indices[self.index])
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Document metadata merged with this chunk's own fields."""
+        return {
+            **self.document.metadata,
+            "chunk": self.text,
+            "chunk_index": self.chunk_index,
+        }
+
+    def __repr__(self):
+        return f"DocumentChunk(index={self.chunk_index})"
 
 
 @dataclass
 class ProcessedDocument:
-    """Represents a fully processed document with chunks."""
+    """Columnar representation of a processed document, or a batch of it.
+
+    Embeddings live in one contiguous ``(n_chunks, dim)`` matrix, chunk
+    texts in one string addressed by ``offsets`` (``n_chunks + 1``
+    positions), and document-level metadata is stored once.
 
-    chunks: List[DocumentChunk]
-    # metadata: Dict[str, Any]
+    Chunks are numbered consecutively from ``first_chunk_index`` unless
+    ``indices`` holds explicit positions, as it does for the sparse
+    batches produced by incremental re-ingestion.
+    """
+
+    embeddings: np.ndarray
+    text_buffer: str
+    offsets: np.ndarray
+    metadata: Dict[str, Any]
+    first_chunk_index: int = 0
+    indices: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embeddings: np.ndarray,
+        metadata: Dict[str, Any],
+        first_chunk_index: int = 0,
+        dtype: str = "float32",
+        indices: List[int] = None,
+    ) -> "ProcessedDocument":
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return cls(
+            embeddings=np.ascontiguousarray(embeddings, dtype=dtype),
+            text_buffer="".join(texts),
+            offsets=offsets,
+            metadata=metadata,
+            first_chunk_index=first_chunk_index,
+            indices=(
+                np.asarray(indices, dtype=np.int64)
+                if indices is not None
+                else None
+            ),
+        )
+
+    @classmethod
+    def concat(
+        cls, batches: List["ProcessedDocument"], metadata: Dict[str, Any]
+    ) -> "ProcessedDocument":
+        """Join consecutive batches of one document into a single block."""
+        if not batches:
+            return cls.from_texts([], np.empty((0, 0)), metadata)
+        offsets = [batches[0].offsets]
+        for batch in batches[1:]:
+            offsets.append(batch.offsets[1:] + offsets[-1][-1])
+        return cls(
+            embeddings=np.concatenate([b.embeddings for b in batches]),
+            text_buffer="".join(b.text_buffer for b in batches),
+            offsets=np.concatenate(offsets),
+            metadata=metadata,
+            first_chunk_index=batches[0].first_chunk_index,
+            indices=(
+                np.concatenate([b.chunk_indices for b in batches])
+                if any(b.indices is not None for b in batches)
+                else None
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def chunk_indices(self) -> np.ndarray:
+        """Position of every chunk within the source document."""
+        if self.indices is not None:
+            return self.indices
+        return np.arange(
+            self.first_chunk_index,
+            self.first_chunk_index + len(self),
+            dtype=np.int64,
+        )
+
+    def text(self, index: int) -> str:
+        return self.text_buffer[self.offsets[index] : self.offsets[index + 1]]
+
+    @property
+    def texts(self) -> List[str]:
+        return [self.text(i) for i in range(len(self))]
+
+    @property
+    def chunks(self) -> List[DocumentChunk]:
+        return [DocumentChunk(self, i) for i in range(len(self))]
+
+    def __iter__(self):
+        return (DocumentChunk(self, i) for i in range(len(self)))
 
 
 class DocumentProcessor(ABC):
     """Base class for document processors."""
 
+    # Processors whose parsing mostly waits on disk run in the I/O thread
+    # pool; everything else goes to the process pool.
+    io_bound: bool = False
+    # Joins consecutive sections of ``stream_text``, as ``extract_text``
+    # joins them.
+    section_separator: str = "\n"
+
     @abstractmethod
     async def can_process(self, file_extension: str) -> bool:
         """Check if this processor can handle the file type."""
         pass
 
     @abstractmethod
-    async def extract_text(self, file: BinaryIO) -> str:
-        """Extract text from the document."""
+    def parse(self, file: str) -> str:
+        """Blocking text extraction, run inside an executor worker."""
         pass
 
+    async def extract_text(
+        self, file: str, executor: "ExtractionExecutor" = None
+    ) -> str:
+        """Extract text from the document without blocking the event loop."""
+        if executor is None:
+            return await asyncio.to_thread(self.parse, file)
+        return await executor.run(self.parse, file, io_bound=self.io_bound)
+
+    async def stream_text(
+        self, file: str, executor: "ExtractionExecutor" = None
+    ) -> AsyncIterator[str]:
+        """Yield the document's text section by section.
+
+        Formats that can only be parsed as a whole yield a single section.
+        """
+        yield await self.extract_text(file, executor)
+
     def __str__(self):
         return f"{self.__class__.__name__} Processor"
 
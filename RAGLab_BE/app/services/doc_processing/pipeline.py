@@ -1,14 +1,36 @@
-from typing import List, Dict, Any
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
 import os
+import time
 from datetime import datetime
 
 from ..embedding import EmbeddingService
-from .interfaces import ProcessedDocument, DocumentChunk
+from ..lexical import LexicalIndex
+from ..registry import DocumentRegistry
+from .executors import ExtractionExecutor
+from .interfaces import DocumentProcessor, ProcessedDocument
 from .processors import ProcessorFactory
 from .chunkers import TextChunker
-from ...core.logging import SingletonLogger
+from ...core.config import settings
+from ...core.logging import RateLimitedLogger, SingletonLogger
+from ...core.metrics import CHUNKS_EMBEDDED, DOCUMENT_CHUNKS, StageTimer
+from ...models.jobs import JobStage
+from ...repository.interfaces import VectorStore, chunk_id, chunk_ids
 
 logger = SingletonLogger.get_logger()
+# Per-batch progress, at most once per LOG_SAMPLE_INTERVAL.
+batch_logger = RateLimitedLogger(logger)
+
+ProgressCallback = Callable[..., Awaitable[None]]
 
 
 class DocumentProcessingPipeline:
@@ -17,40 +39,111 @@ class DocumentProcessingPipeline:
     def __init__(
         self,
         embedding_service: EmbeddingService,
-        # vector_store: MilvusRepository,
+        vector_store: VectorStore = None,
         chunker: TextChunker = None,
+        batch_size: int = None,
+        executor: ExtractionExecutor = None,
+        registry: DocumentRegistry = None,
+        lexical_index: LexicalIndex = None,
     ):
         self.embedding_service = embedding_service
-        # self.vector_store = vector_store
+        self.vector_store = vector_store
         self.chunker = chunker or TextChunker()
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.executor = executor
+        self.registry = registry
+        self.lexical_index = lexical_index
 
-    async def process_file(
-        self, file_path: str, filename: str, metadata: Dict[str, Any] = None
+    @staticmethod
+    async def _report(
+        progress: ProgressCallback, stage: Optional[JobStage], **counts: int
+    ):
+        if progress is not None:
+            await progress(stage, **counts)
+
+    async def _sections(
+        self,
+        processor: DocumentProcessor,
+        file_path: str,
+        progress: ProgressCallback,
+        timer: StageTimer,
+    ) -> AsyncIterator[str]:
+        if settings.INGEST_STREAMING:
+            sections = processor.stream_text(file_path, self.executor)
+            while True:
+                with timer.measure("extract"):
+                    section = await anext(sections, None)
+                if section is None:
+                    break
+                yield section
+        else:
+            with timer.measure("extract"):
+                text = await processor.extract_text(file_path, self.executor)
+            yield text
+        await self._report(progress, JobStage.EXTRACTED)
+
+    async def _embed_batch(
+        self,
+        chunks: List[str],
+        base_metadata: Dict[str, Any],
+        indices: List[int],
     ) -> ProcessedDocument:
+        embeddings = await self.embedding_service.get_embeddings(chunks)
+        return ProcessedDocument.from_texts(
+            chunks,
+            embeddings,
+            base_metadata,
+            first_chunk_index=indices[0],
+            dtype=settings.EMBEDDING_DTYPE,
+            indices=indices,
+        )
+
+    async def stream_file(
+        self,
+        file_path: str,
+        filename: str,
+        metadata: Dict[str, Any] = None,
+        progress: ProgressCallback = None,
+        known: Set[str] = None,
+        seen: Set[str] = None,
+        timer: StageTimer = None,
+    ) -> AsyncIterator[ProcessedDocument]:
         """
-        Process a file through the complete pipeline.
+        Stream a file through extraction, chunking and embedding.
+
+        Text is pulled from the processor section by section, chunked
+        incrementally and embedded in batches, so only one batch of chunks
+        and a bounded text buffer are alive at any time.
 
         Args:
-            file: File-like object
+            file_path: Path of the stored upload
             filename: Original filename
             metadata: Additional metadata
+            progress: Awaited with the completed stage (or None) and the
+                running chunk counts
+            known: Ids of chunks already stored for this file; they are
+                skipped instead of embedded
+            seen: Filled with the id of every chunk in the file. Chunks
+                repeated within the file share an id and are embedded once.
+            timer: Accumulates extract, chunk and embed time; time spent
+                by the consumer between batches is not counted
 
-        Returns:
-            ProcessedDocument: Processed document with chunks
+        Yields:
+            ProcessedDocument: Columnar batches of embedded chunks that
+                share the document metadata
         """
-        logger.info(f"getting file: {filename} extension")
         # Extract file extension
         file_extension = os.path.splitext(filename)[1][1:]
 
-        logger.info(
-            f"getting processor for file: {filename} "
-            f"with extension: {file_extension}"
+        logger.debug(
+            "getting processor for file: %s with extension: %s",
+            filename,
+            file_extension,
         )
         # Get appropriate processor
         processor = await ProcessorFactory.get_processor(file_extension)
 
         # Create base metadata
-        logger.info(f"creating base metadata for file: {filename}")
         base_metadata = {
             "filename": filename,
             "file_type": file_extension,
@@ -58,58 +151,218 @@ class DocumentProcessingPipeline:
             **(metadata or {}),
         }
 
-        # Extract text
-        logger.info(f"extracting text from file: {filename}")
-        text = await processor.extract_text(file_path)
-
-        # Create chunks
-        logger.info(f"creating chunks from text of file: {filename}")
-        chunks = await self.chunker.chunk_text(text)
-
-        # Process chunks
-        doc_chuks = []
-        # add vectors and chunks to metadata
         logger.info(
-            f"adding vectors and chunks to metadata for file: {filename}"
+            "extracting, chunking and embedding file: %s in batches of %d",
+            filename,
+            self.batch_size,
         )
-        for i, chunk in enumerate(chunks):
-            # Get embeddings for chunks
-            logger.info(f"getting embeddings for chunk no: {i}")
-            embedding = await self.embedding_service.get_embeddings(chunk)
-
-            doc_chunk = DocumentChunk(
-                embedding=embedding, metadata=base_metadata
+        timer = timer or StageTimer()
+        timer.skip()
+        sections = self._sections(processor, file_path, progress, timer)
+        seen = set() if seen is None else seen
+        batch: List[str] = []
+        indices: List[int] = []
+        n_chunks = n_embedded = 0
+        async for chunk in self.chunker.chunk_stream(
+            sections, separator=processor.section_separator
+        ):
+            position = n_chunks
+            n_chunks += 1
+            cid = chunk_id(filename, chunk)
+            if cid in seen:
+                continue
+            seen.add(cid)
+            if known and cid in known:
+                continue
+            batch.append(chunk)
+            indices.append(position)
+            if len(batch) < self.batch_size:
+                continue
+            timer.lap("chunk")
+            with timer.measure("embed"):
+                embedded = await self._embed_batch(
+                    batch, base_metadata, indices
+                )
+            yield embedded
+            timer.skip()
+            n_embedded += len(batch)
+            CHUNKS_EMBEDDED.inc(len(batch))
+            batch_logger.info(
+                "embedded %d of %d chunks of %s so far",
+                n_embedded,
+                n_chunks,
+                filename,
             )
-
-            doc_chunk.metadata.update({"chunk": chunk})
-            doc_chuks.append(doc_chunk)
-            logger.info(
-                f"Generated chunk No {i} "
-                f"with embedding: {len(embedding)} vector length"
+            batch, indices = [], []
+            await self._report(
+                progress,
+                None,
+                chunks_total=n_chunks,
+                chunks_embedded=n_embedded,
             )
+        timer.lap("chunk")
+        await self._report(progress, JobStage.CHUNKED)
 
+        if batch:
+            with timer.measure("embed"):
+                embedded = await self._embed_batch(
+                    batch, base_metadata, indices
+                )
+            yield embedded
+            n_embedded += len(batch)
+            CHUNKS_EMBEDDED.inc(len(batch))
+        DOCUMENT_CHUNKS.observe(n_chunks)
+        await self._report(
+            progress,
+            JobStage.EMBEDDED,
+            chunks_total=n_chunks,
+            chunks_embedded=n_embedded,
+        )
         logger.info(
-            f"finished processing file: {filename} "
-            f"with {len(doc_chuks)} chunks"
+            "finished processing file: %s with %d chunks, %d embedded",
+            filename,
+            n_chunks,
+            n_embedded,
         )
 
-        # TODO: Implement vector store
-        # Store in vector database
-
-        return ProcessedDocument(chunks=doc_chuks)
-
-    async def _process_and_store_chunks(self, chunks: List[DocumentChunk]):
-        """Process chunks and store in vector database."""
-        # Generate embeddings for all chunks
-        logger.info("getting embeddings for chunks")
-        texts = [chunk.text for chunk in chunks]
-        embeddings = await self.embedding_service.get_embeddings(texts)
-
-        logger.info("storing embeddings in vector database")
-        return {"embeddings": embeddings, "texts": texts}
-        # Store in vector database
-        # await self.vector_store.insert_many(
-        #     embeddings=embeddings,
-        #     metadatas=[chunk.metadata for chunk in chunks],
-        #     texts=texts,
-        # )
+    async def _store(self, batch: ProcessedDocument, timer: StageTimer):
+        start = time.perf_counter()
+        await self.vector_store.insert_many(batch)
+        timer.add("store", time.perf_counter() - start)
+        if self.lexical_index is not None:
+            start = time.perf_counter()
+            await asyncio.to_thread(self.lexical_index.add, batch)
+            timer.add("index", time.perf_counter() - start)
+        if self.registry is not None:
+            await asyncio.to_thread(
+                self.registry.add_chunks,
+                batch.metadata["filename"],
+                chunk_ids(batch),
+            )
+
+    async def process_file(
+        self,
+        file_path: str,
+        filename: str,
+        metadata: Dict[str, Any] = None,
+        progress: ProgressCallback = None,
+        collect: bool = True,
+        content_hash: str = None,
+    ) -> ProcessedDocument:
+        """
+        Process a file through the complete pipeline.
+
+        With a registry, re-ingesting a file only embeds and inserts the
+        chunks whose content is new, deletes the chunks that disappeared
+        and leaves the rest of the stored document untouched.
+
+        Args:
+            file_path: Path of the stored upload
+            filename: Original filename
+            metadata: Additional metadata
+            progress: Awaited with the completed stage (or None) and the
+                running chunk counts
+            collect: Keep every chunk for the returned document. Ingestion
+                jobs pass False so peak memory stays bounded.
+            content_hash: SHA-256 of the uploaded bytes, recorded in the
+                registry so later identical uploads can be deduplicated
+
+        Returns:
+            ProcessedDocument: Processed document with the chunks that
+                were embedded in this run
+        """
+        batches = []
+        document_metadata = metadata or {}
+        diffing = self.registry is not None and self.vector_store is not None
+        known: Set[str] = set()
+        seen: Set[str] = set()
+        timer = StageTimer()
+        if diffing:
+            known = await asyncio.to_thread(self.registry.chunk_ids, filename)
+        # At most one insert is in flight: it overlaps with embedding the
+        # next batch, so ingest is bounded by the model, not round-trips.
+        pending_insert = None
+        async for batch in self.stream_file(
+            file_path,
+            filename,
+            metadata,
+            progress,
+            known=known,
+            seen=seen,
+            timer=timer,
+        ):
+            document_metadata = batch.metadata
+            if self.vector_store is not None:
+                if pending_insert is not None:
+                    await pending_insert
+                pending_insert = asyncio.create_task(
+                    self._store(batch, timer)
+                )
+            if collect:
+                batches.append(batch)
+
+        if self.vector_store is not None:
+            if pending_insert is not None:
+                await pending_insert
+            if diffing:
+                removed = list(known - seen)
+                if removed:
+                    logger.info(
+                        "deleting %d stale chunks of %s",
+                        len(removed),
+                        filename,
+                    )
+                    await self.vector_store.delete(removed)
+                    if self.lexical_index is not None:
+                        await asyncio.to_thread(
+                            self.lexical_index.delete, removed
+                        )
+                    await asyncio.to_thread(
+                        self.registry.remove_chunks, filename, removed
+                    )
+            logger.debug("flushing vector store for file: %s", filename)
+            with timer.measure("store"):
+                await self.vector_store.flush()
+            if diffing:
+                logger.info(
+                    "%s: %d chunks unchanged, %d added, %d removed",
+                    filename,
+                    len(seen & known),
+                    len(seen - known),
+                    len(known - seen),
+                )
+                await asyncio.to_thread(
+                    self.registry.finalize,
+                    filename,
+                    os.path.splitext(filename)[1][1:],
+                    len(seen),
+                    content_hash,
+                )
+        await self._report(progress, JobStage.STORED)
+        timer.observe()
+        logger.info("%s stage seconds: %s", filename, timer.seconds)
+
+        return ProcessedDocument.concat(batches, document_metadata)
+
+    async def remove_document(self, filename: str):
+        """
+        Delete the chunks stored under ``filename`` and forget it.
+
+        Used when the name becomes an alias of another document, so its
+        earlier content stops matching searches.
+
+        Args:
+            filename: Name of the ingested document
+        """
+        if self.registry is None:
+            return
+        ids = list(
+            await asyncio.to_thread(self.registry.chunk_ids, filename)
+        )
+        if ids and self.vector_store is not None:
+            logger.info("deleting %d chunks of %s", len(ids), filename)
+            await self.vector_store.delete(ids)
+            await self.vector_store.flush()
+            if self.lexical_index is not None:
+                await asyncio.to_thread(self.lexical_index.delete, ids)
+        await asyncio.to_thread(self.registry.forget, filename)
@@ -1,8 +1,10 @@
-import PyPDF2
-import docx
-import markdown
+import asyncio
+from collections import deque
+from typing import AsyncIterator
 
+from .executors import ExtractionExecutor
 from .interfaces import DocumentProcessor, DocumentType
+from ...core.config import settings
 from ...core.logging import SingletonLogger
 
 logger = SingletonLogger.get_logger()
@@ -12,28 +14,114 @@ class PDFProcessor(DocumentProcessor):
     """Processor for PDF files."""
 
     async def can_process(self, file_extension: str) -> bool:
-        logger.info(f"Checking if PDF processor can handle {file_extension}")
+        logger.debug(
+            "Checking if PDF processor can handle %s", file_extension
+        )
         return file_extension.lower() == DocumentType.PDF.value
 
-    async def extract_text(self, file: str) -> str:
+    def page_count(self, file: str) -> int:
+        import PyPDF2
+
+        with open(file, "rb") as f:
+            return len(PyPDF2.PdfReader(f).pages)
+
+    def parse(self, file: str, start: int = 0, stop: int = None) -> str:
+        """Extract the text of pages ``start`` to ``stop`` (exclusive)."""
+        import PyPDF2
+
         with open(file, "rb") as f:
             pdf_reader = PyPDF2.PdfReader(f)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            stop = len(pdf_reader.pages) if stop is None else stop
+            pages = [
+                pdf_reader.pages[i].extract_text()
+                for i in range(start, min(stop, len(pdf_reader.pages)))
+            ]
+            return "\n".join(pages).strip()
+
+    async def stream_text(
+        self, file: str, executor: ExtractionExecutor = None
+    ) -> AsyncIterator[str]:
+        """Yield page ranges in order, extracting several in parallel.
+
+        At most one range per worker is in flight, so memory is bounded by
+        the window rather than the size of the document.
+        """
+        run = executor.run_cpu if executor is not None else asyncio.to_thread
+        window = executor.max_workers if executor is not None else 1
+        step = settings.PDF_PAGES_PER_TASK
+
+        n_pages = await run(self.page_count, file)
+        logger.info(
+            "Extracting %d pages of %s in ranges of %d", n_pages, file, step
+        )
+        pending = deque()
+        try:
+            for start in range(0, n_pages, step):
+                pending.append(
+                    asyncio.ensure_future(
+                        run(self.parse, file, start, start + step)
+                    )
+                )
+                if len(pending) >= window:
+                    if text := await pending.popleft():
+                        yield text
+            while pending:
+                if text := await pending.popleft():
+                    yield text
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def extract_text(
+        self, file: str, executor: ExtractionExecutor = None
+    ) -> str:
+        """Extract text, fanning page ranges of large PDFs out to workers."""
+        return "\n".join(
+            [section async for section in self.stream_text(file, executor)]
+        )
 
 
 class TXTProcessor(DocumentProcessor):
     """Processor for text files."""
 
+    io_bound = True
+    section_separator = ""
+
     async def can_process(self, file_extension: str) -> bool:
         return file_extension.lower() == DocumentType.TXT.value
 
-    async def extract_text(self, file: str) -> str:
+    def parse(self, file: str) -> str:
         with open(file, "r", encoding="utf-8") as f:
             return f.read().strip()
 
+    async def stream_text(
+        self, file: str, executor: ExtractionExecutor = None
+    ) -> AsyncIterator[str]:
+        """Yield the file in blocks of about ``TXT_BLOCK_CHARS`` characters.
+
+        Each block ends after its last whitespace and the partial word
+        that follows is carried into the next one. Blocks are joined
+        without a separator, so the chunks match those of the whole file
+        whatever the block size.
+
+        A carry longer than a block, as in minified or base64 data with no
+        whitespace, is not held back; the whole text is yielded instead,
+        so memory stays bounded by two blocks.
+        """
+        run = executor.run_io if executor is not None else asyncio.to_thread
+        block_chars = settings.TXT_BLOCK_CHARS
+        carry = ""
+        with open(file, "r", encoding="utf-8") as f:
+            while block := await run(f.read, block_chars):
+                text = carry + block
+                cut = max(text.rfind(c) for c in " \t\n")
+                if len(text) - (cut + 1) > block_chars:
+                    cut = len(text) - 1
+                carry = text[cut + 1 :]
+                yield text[: cut + 1]
+        if carry:
+            yield carry
+
 
 class DOCXProcessor(DocumentProcessor):
     """Processor for DOCX files."""
@@ -41,7 +129,9 @@ class DOCXProcessor(DocumentProcessor):
     async def can_process(self, file_extension: str) -> bool:
         return file_extension.lower() == DocumentType.DOCX.value
 
-    async def extract_text(self, file: str) -> str:
+    def parse(self, file: str) -> str:
+        import docx
+
         doc = docx.Document(file)
         return "\n".join([paragraph.text for paragraph in doc.paragraphs])
 
@@ -52,8 +142,11 @@ class MarkdownProcessor(DocumentProcessor):
     async def can_process(self, file_extension: str) -> bool:
         return file_extension.lower() == DocumentType.MD.value
 
-    async def extract_text(self, file: str) -> str:
-        md_text = file.read().decode("utf-8")
+    def parse(self, file: str) -> str:
+        import markdown
+
+        with open(file, "r", encoding="utf-8") as f:
+            md_text = f.read()
         html = markdown.markdown(md_text)
         # TODO: Need more robust HTML tag removal
         text = html.replace("<p>", "\n").replace("</p>", "\n")
@@ -73,9 +166,9 @@ class ProcessorFactory:
     @classmethod
     async def get_processor(cls, file_extension: str) -> DocumentProcessor:
         """Get appropriate processor for file type."""
-        logger.info(f"Getting processor for {file_extension}")
+        logger.debug("Getting processor for %s", file_extension)
         for processor in cls._processors.values():
             if await processor.can_process(file_extension):
-                logger.info(f"Found {processor} for {file_extension}")
+                logger.debug("Found %s for %s", processor, file_extension)
                 return processor
         raise ValueError(f"Unsupported file type: {file_extension}")
@@ -1,10 +1,23 @@
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING, List
+
 import numpy as np
-from typing import List
 
-from sentence_transformers import SentenceTransformer
 from fastapi import Depends, HTTPException, status, Request
 
+from ..core.config import settings
 from ..core.logging import SingletonLogger
+from ..core.metrics import (
+    EMBEDDING_CACHE,
+    EMBEDDING_REQUEST_TEXTS,
+    EMBEDDING_SECONDS,
+)
+from .embedding_cache import EmbeddingCache
+from .embedding_scheduler import EmbeddingScheduler
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = SingletonLogger.get_logger()
 
@@ -12,8 +25,56 @@ logger = SingletonLogger.get_logger()
 class EmbeddingService:
     """Service for handling text embeddings using SentenceTransformer."""
 
-    def __init__(self, model: SentenceTransformer):
+    def __init__(
+        self,
+        model: "SentenceTransformer",
+        batch_size: int = None,
+        scheduler: EmbeddingScheduler = None,
+        cache: EmbeddingCache = None,
+    ):
         self.model = model
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.scheduler = scheduler
+        self.cache = cache
+
+    async def _encode(self, texts):
+        """Encode through the shared scheduler, or directly off-loop."""
+        with EMBEDDING_SECONDS.time():
+            if self.scheduler is not None:
+                if isinstance(texts, str):
+                    return (await self.scheduler.submit([texts]))[0]
+                return await self.scheduler.submit(texts)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                partial(
+                    self.model.encode,
+                    texts,
+                    batch_size=self.batch_size,
+                    convert_to_numpy=True,
+                ),
+            )
+
+    async def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """Serve cache hits and encode only the misses."""
+        EMBEDDING_REQUEST_TEXTS.observe(len(texts))
+        if self.cache is None or not texts:
+            return await self._encode(texts)
+
+        embeddings = await asyncio.to_thread(self.cache.get_many, texts)
+        missing = [i for i, hit in enumerate(embeddings) if hit is None]
+        EMBEDDING_CACHE.labels("hit").inc(len(texts) - len(missing))
+        EMBEDDING_CACHE.labels("miss").inc(len(missing))
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = await self._encode(missing_texts)
+            await asyncio.to_thread(
+                self.cache.put_many, missing_texts, fresh
+            )
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+        return np.stack(embeddings)
 
     async def get_embedding(self, text: str) -> np.ndarray:
         """
@@ -26,27 +87,27 @@ class EmbeddingService:
             numpy.ndarray: Text embedding vector
         """
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            embedding = (await self._encode_cached([text]))[0]
             return embedding
         except Exception as e:
-            logger.error(f"Error generating embedding: {str(e)}")
+            logger.error("Error generating embedding: %s", e)
             raise
 
-    async def get_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+    async def get_embeddings(self, texts: List[str]) -> np.ndarray:
         """
-        Generate embeddings for multiple texts.
+        Generate embeddings for multiple texts in a single batched call.
 
         Args:
             texts: List of input texts
 
         Returns:
-            List[numpy.ndarray]: List of embedding vectors
+            numpy.ndarray: Embedding matrix of shape (len(texts), dim)
         """
         try:
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
+            embeddings = await self._encode_cached(texts)
             return embeddings
         except Exception as e:
-            logger.error(f"Error generating embeddings batch: {str(e)}")
+            logger.error("Error generating embeddings batch: %s", e)
             raise
 
     def __str__(self):
@@ -56,7 +117,7 @@ class EmbeddingService:
         return f"Embedding Service(model={self.model})"
 
 
-async def get_embedding_model(request: Request) -> SentenceTransformer:
+async def get_embedding_model(request: Request) -> "SentenceTransformer":
     """Dependency to get the embedding model from app state."""
     if not hasattr(request.app.state, "embedding_model"):
         raise HTTPException(
@@ -65,14 +126,28 @@ async def get_embedding_model(request: Request) -> SentenceTransformer:
     return request.app.state.embedding_model
 
 
+async def get_embedding_scheduler(request: Request) -> EmbeddingScheduler:
+    """Dependency to get the shared embedding scheduler, if one is running."""
+    return getattr(request.app.state, "embedding_scheduler", None)
+
+
+async def get_embedding_cache(request: Request) -> EmbeddingCache:
+    """Dependency to get the shared embedding cache, if one is enabled."""
+    return getattr(request.app.state, "embedding_cache", None)
+
+
 def get_embedding_service(
-    model: SentenceTransformer = Depends(get_embedding_model),
+    model: "SentenceTransformer" = Depends(get_embedding_model),
+    scheduler: EmbeddingScheduler = Depends(get_embedding_scheduler),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
 ) -> EmbeddingService:
     """
     Dependency for getting the embedding service.
 
     Args:
         model: SentenceTransformer model instance
+        scheduler: Process-wide micro-batching scheduler
+        cache: Content-addressed embedding cache
 
     Returns:
         EmbeddingService: Initialized embedding service
@@ -81,7 +156,7 @@ def get_embedding_service(
         HTTPException: If model initialization fails
     """
     try:
-        return EmbeddingService(model)
+        return EmbeddingService(model, scheduler=scheduler, cache=cache)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
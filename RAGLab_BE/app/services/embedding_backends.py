@@ -0,0 +1,233 @@
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = SingletonLogger.get_logger()
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Short, varied texts used to compare a backend's output with fp32.
+PARITY_TEXTS = [
+    "How do I replace the pump seal?",
+    "Torque the housing bolts to 45 Nm in a star pattern.",
+    "Warning: depressurize the system before opening any valve.",
+    "The bearing must be inspected every 2,000 operating hours.",
+    "Revision 3 of the maintenance manual supersedes revision 2.",
+    "What is the clearance tolerance for the impeller?",
+    "Lubricate moving parts with lithium grease only.",
+    "Calibration certificates are stored with the asset record.",
+    "Die Pumpe muss vor der Wartung abgeschaltet werden.",
+    "Operator training covers start-up, shutdown and alarms.",
+    "Table 4 lists spare part numbers by assembly.",
+    "If vibration exceeds 7 mm/s, stop the machine immediately.",
+]
+
+
+def _onnx_file(quantized: bool) -> str:
+    if quantized:
+        config = settings.EMBEDDING_ONNX_QUANTIZATION
+        return f"onnx/model_qint8_{config}.onnx"
+    return "onnx/model.onnx"
+
+
+def model_source() -> str:
+    """Local model directory if one is configured, else the hub id."""
+    return settings.EMBEDDING_MODEL_PATH or settings.MODEL_NAME
+
+
+def _set_torch_threads(threads: int):
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _load_onnx(source: str, quantized: bool, threads: int):
+    from sentence_transformers import SentenceTransformer
+
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise RuntimeError(
+            "ONNX embedding backends need the 'onnx' extra: "
+            "pip install 'sentence-transformers[onnx]'"
+        ) from e
+
+    session_options = onnxruntime.SessionOptions()
+    if threads:
+        session_options.intra_op_num_threads = threads
+    return SentenceTransformer(
+        source,
+        device="cpu",
+        backend="onnx",
+        model_kwargs={
+            "file_name": _onnx_file(quantized),
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options,
+        },
+    )
+
+
+def quantize_torch(model: "SentenceTransformer") -> "SentenceTransformer":
+    """Swap the model's Linear layers for dynamically int8-quantized ones."""
+    import torch
+
+    for module in model:
+        if hasattr(module, "auto_model"):
+            module.auto_model = torch.quantization.quantize_dynamic(
+                module.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    return model
+
+
+def load_embedding_model(
+    backend: str = None, threads: int = None, source: str = None
+) -> "SentenceTransformer":
+    """
+    Load the configured embedding model on the selected CPU backend.
+
+    ``torch`` is the plain fp32 model. ``torch-int8`` quantizes its Linear
+    layers after loading. ``onnx`` and ``onnx-int8`` load an exported ONNX
+    graph (see ``export_onnx``) from ``EMBEDDING_MODEL_PATH`` or the model
+    repository. All four return a SentenceTransformer, so EmbeddingService
+    and the scheduler use them unchanged.
+
+    Args:
+        backend: One of EMBEDDING_BACKENDS; defaults to settings
+        threads: Intra-op thread count; 0 keeps the library default
+        source: Hub id or path to load; defaults to ``model_source()``
+
+    Returns:
+        SentenceTransformer: Model ready for ``encode``
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    threads = settings.EMBEDDING_THREADS if threads is None else threads
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+
+    source = source or model_source()
+    logger.info(f"Loading embedding model {source} ({backend})")
+    if backend.startswith("onnx"):
+        return _load_onnx(source, backend == "onnx-int8", threads)
+
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        _set_torch_threads(threads)
+    model = SentenceTransformer(source, device="cpu")
+    if backend == "torch-int8":
+        model = quantize_torch(model)
+    return model
+
+
+def model_cache_name(backend: str = None) -> str:
+    """Name embeddings are cached under.
+
+    Differs per numeric backend and per local model copy, so vectors from
+    one export are never served for another.
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    name = settings.MODEL_NAME
+    if settings.EMBEDDING_MODEL_PATH:
+        name = f"{name}#{os.path.abspath(settings.EMBEDDING_MODEL_PATH)}"
+    if backend == "onnx-int8":
+        backend = f"{backend}-{settings.EMBEDDING_ONNX_QUANTIZATION}"
+    if backend == "torch":
+        return name
+    return f"{name}@{backend}"
+
+
+def export_onnx(model_name: str = None, out_dir: str = None) -> str:
+    """
+    Export the model to ONNX, plus a dynamically int8-quantized copy.
+
+    Args:
+        model_name: Hugging Face id or path; defaults to MODEL_NAME
+        out_dir: Target directory; defaults to EMBEDDING_MODEL_PATH
+
+    Returns:
+        str: Directory to point ``EMBEDDING_MODEL_PATH`` at
+    """
+    from sentence_transformers import (
+        SentenceTransformer,
+        export_dynamic_quantized_onnx_model,
+    )
+
+    model_name = model_name or settings.MODEL_NAME
+    out_dir = out_dir or settings.EMBEDDING_MODEL_PATH
+    if not out_dir:
+        raise ValueError("No export directory given")
+    os.makedirs(out_dir, exist_ok=True)
+
+    logger.info(f"Exporting {model_name} to ONNX in {out_dir}")
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save_pretrained(out_dir)
+    export_dynamic_quantized_onnx_model(
+        model, settings.EMBEDDING_ONNX_QUANTIZATION, out_dir
+    )
+    return out_dir
+
+
+def parity_check(
+    reference: "SentenceTransformer",
+    candidate: "SentenceTransformer",
+    texts: List[str] = None,
+) -> Dict[str, float]:
+    """
+    Compare a candidate backend's embeddings with the fp32 reference.
+
+    Args:
+        reference: Plain fp32 model
+        candidate: Model on the backend being evaluated
+        texts: Texts to embed; defaults to PARITY_TEXTS
+
+    Returns:
+        Dict[str, float]: Mean and minimum cosine similarity, and the
+            largest cosine drift (1 - similarity)
+    """
+    texts = texts or PARITY_TEXTS
+    expected = reference.encode(texts, normalize_embeddings=True)
+    actual = candidate.encode(texts, normalize_embeddings=True)
+    cosine = np.sum(expected * actual, axis=1)
+    return {
+        "texts": len(texts),
+        "mean_cosine": round(float(cosine.mean()), 6),
+        "min_cosine": round(float(cosine.min()), 6),
+        "max_drift": round(float(1 - cosine.min()), 6),
+    }
+
+
+def reference_parity(
+    candidate: "SentenceTransformer",
+) -> Optional[Dict[str, float]]:
+    """
+    Run ``parity_check`` against the fp32 model from the hub.
+
+    The reference is loaded from ``MODEL_NAME``, since a local
+    ``EMBEDDING_MODEL_PATH`` may hold only an ONNX export. A failure is
+    logged and never stops the service from starting.
+
+    Args:
+        candidate: Model on the configured backend
+
+    Returns:
+        Optional[Dict[str, float]]: The parity report, or None if the
+            check could not run
+    """
+    try:
+        reference = load_embedding_model("torch", source=settings.MODEL_NAME)
+        return parity_check(reference, candidate)
+    except Exception as e:
+        logger.warning(f"Embedding parity check failed: {str(e)}")
+        return None
+
+
+def warm_up(model: "SentenceTransformer", batch_size: int = 8):
+    """Run a first encode so lazy initialisation happens before traffic."""
+    model.encode(PARITY_TEXTS[:batch_size], batch_size=batch_size)
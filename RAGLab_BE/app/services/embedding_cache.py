@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+
+logger = SingletonLogger.get_logger()
+
+KEY_SIZE = hashlib.sha256().digest_size
+
+
+class DiskEmbeddingTier:
+    """Persistent tier: a memory-mapped float32 matrix plus a hash index.
+
+    ``vectors.f32`` holds one embedding per row and grows by doubling.
+    ``index.bin`` is an append-only list of key digests whose position is
+    the row number, so it doubles as the commit log: a row only becomes
+    visible once its digest has been appended after the vector was flushed.
+    """
+
+    def __init__(self, path: str, model_name: str, initial_rows: int = 1024):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.initial_rows = initial_rows
+        self.dim: int = None
+        self._index: dict = {}
+        self._rows = 0  # rows written, including any duplicate digests
+        self._matrix: np.memmap = None
+        self._capacity = 0
+        self._open()
+
+    @property
+    def _meta_file(self) -> Path:
+        return self.path / "meta.json"
+
+    @property
+    def _vectors_file(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def _index_file(self) -> Path:
+        return self.path / "index.bin"
+
+    def _open(self):
+        if self._meta_file.exists():
+            meta = json.loads(self._meta_file.read_text())
+            if meta.get("model_name") != self.model_name:
+                logger.info(
+                    f"Embedding cache was built with {meta.get('model_name')}"
+                    f", invalidating for {self.model_name}"
+                )
+                shutil.rmtree(self.path)
+            else:
+                self.dim = meta["dim"]
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self.dim is None:
+            return
+
+        digests = self._index_file.read_bytes()
+        rows = len(digests) // KEY_SIZE
+        self._index = {
+            digests[i * KEY_SIZE : (i + 1) * KEY_SIZE]: i for i in range(rows)
+        }
+        self._rows = rows
+        self._map(os.path.getsize(self._vectors_file) // (self.dim * 4))
+        logger.info(f"Loaded {rows} cached embeddings from {self.path}")
+
+    def _map(self, capacity: int):
+        self._matrix = np.memmap(
+            self._vectors_file,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.dim),
+        )
+        self._capacity = capacity
+
+    def _initialize(self, dim: int):
+        self.dim = dim
+        self._meta_file.write_text(
+            json.dumps({"model_name": self.model_name, "dim": dim})
+        )
+        self._index_file.write_bytes(b"")
+        with open(self._vectors_file, "wb") as f:
+            f.truncate(self.initial_rows * dim * 4)
+        self._map(self.initial_rows)
+
+    def _grow(self, needed: int):
+        capacity = max(self._capacity * 2, needed)
+        self._matrix.flush()
+        self._matrix = None
+        with open(self._vectors_file, "r+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._map(capacity)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self._index.get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def put_many(self, keys: List[bytes], embeddings: np.ndarray):
+        if self.dim is None:
+            self._initialize(embeddings.shape[1])
+        # Keyed, so a text repeated within the batch takes a single row.
+        new = list(
+            {
+                key: embedding
+                for key, embedding in zip(keys, embeddings)
+                if key not in self._index
+            }.items()
+        )
+        if not new:
+            return
+        start = self._rows
+        if start + len(new) > self._capacity:
+            self._grow(start + len(new))
+
+        for offset, (_, embedding) in enumerate(new):
+            self._matrix[start + offset] = embedding
+        self._matrix.flush()
+        with open(self._index_file, "ab") as f:
+            f.write(b"".join(key for key, _ in new))
+        for offset, (key, _) in enumerate(new):
+            self._index[key] = start + offset
+        self._rows += len(new)
+
+    def close(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with a memory LRU and a disk tier.
+
+    Keys are ``sha256(model name, text)``, so a chunk that reappears in a
+    revised upload is served from the cache instead of being re-encoded.
+    Lookups and inserts do disk I/O and are meant to run off the event
+    loop; a lock serializes them.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_memory_items: int = None,
+        cache_dir: str = None,
+    ):
+        self.model_name = model_name
+        self.max_memory_items = (
+            max_memory_items or settings.EMBEDDING_CACHE_MEMORY_ITEMS
+        )
+        if cache_dir is None:
+            cache_dir = settings.EMBEDDING_CACHE_DIR
+        self.disk = (
+            DiskEmbeddingTier(cache_dir, model_name) if cache_dir else None
+        )
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefix = model_name.encode("utf-8") + b"\0"
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(self._prefix + text.encode("utf-8")).digest()
+
+    def _remember(self, key: bytes, embedding: np.ndarray):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: List of input texts
+
+        Returns:
+            List[Optional[numpy.ndarray]]: Embedding per text, None on a miss
+        """
+        with self._lock:
+            return [self._get(self.key(text)) for text in texts]
+
+    def _get(self, key: bytes) -> Optional[np.ndarray]:
+        embedding = self._memory.get(key)
+        if embedding is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+        elif self.disk is not None and (
+            embedding := self.disk.get(key)
+        ) is not None:
+            self._remember(key, embedding)
+            self.hits += 1
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+        return embedding
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """Store freshly computed embeddings in both tiers."""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            for key, embedding in zip(keys, embeddings):
+                self._remember(key, embedding)
+            if self.disk is not None:
+                self.disk.put_many(
+                    keys, np.asarray(embeddings, dtype=np.float32)
+                )
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "disk_items": len(self.disk) if self.disk is not None else 0,
+        }
+
+    def close(self):
+        if self.disk is not None:
+            with self._lock:
+                self.disk.close()
+
+    def __str__(self):
+        return f"Embedding Cache for model: {self.model_name}"
+
+    def __repr__(self):
+        return (
+            f"EmbeddingCache(model_name={self.model_name}, "
+            f"max_memory_items={self.max_memory_items})"
+        )
@@ -0,0 +1,224 @@
+import asyncio
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+from ..core.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_QUEUE_DEPTH
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = SingletonLogger.get_logger()
+
+
+@dataclass
+class _Request:
+    """Texts submitted by one caller and the future that resolves them."""
+
+    future: asyncio.Future
+    results: list
+    remaining: int
+
+
+@dataclass(order=True)
+class _Item:
+    """A single pending text, ordered by length for bucketing."""
+
+    length: int
+    index: int = field(compare=False)
+    text: str = field(compare=False)
+    request: _Request = field(compare=False)
+
+
+class EmbeddingScheduler:
+    """Process-wide micro-batcher in front of the shared embedding model.
+
+    Every caller submits its texts to one queue. A single worker drains the
+    queue into micro-batches of at most ``max_batch_size`` texts, waiting no
+    longer than ``max_wait_ms`` for a batch to fill, so concurrent uploads
+    and queries share forward passes instead of competing for the model.
+    """
+
+    def __init__(
+        self,
+        model: "SentenceTransformer",
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+        window_batches: int = None,
+    ):
+        self.model = model
+        self.max_batch_size = max_batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_wait = (
+            max_wait_ms
+            if max_wait_ms is not None
+            else settings.EMBEDDING_MAX_WAIT_MS
+        ) / 1000
+        self.window_batches = (
+            window_batches or settings.EMBEDDING_SCHEDULER_WINDOW
+        )
+        self._queue: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+        # Items taken off the queue and not yet delivered.
+        self._window: List[_Item] = []
+        self._batches = 0
+        self._items = 0
+        self._requests = 0
+
+    async def start(self):
+        """Start the background batching worker."""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Embedding scheduler started with max batch "
+            f"{self.max_batch_size} and max wait {self.max_wait * 1000}ms"
+        )
+
+    async def stop(self):
+        """Stop the worker and fail any texts not embedded yet, whether
+        still queued or in the window being embedded."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        pending, self._window = self._window, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for item in pending:
+            if not item.request.future.done():
+                item.request.future.set_exception(
+                    RuntimeError("Embedding scheduler stopped")
+                )
+        logger.info("Embedding scheduler stopped")
+
+    def submit(self, texts: List[str]) -> asyncio.Future:
+        """
+        Queue texts for embedding.
+
+        Args:
+            texts: List of input texts
+
+        Returns:
+            asyncio.Future: Resolves to an array of shape (len(texts), dim)
+        """
+        if self._worker is None:
+            raise RuntimeError("Embedding scheduler is not running")
+        future = asyncio.get_running_loop().create_future()
+        if not texts:
+            dim = self.model.get_sentence_embedding_dimension()
+            future.set_result(np.empty((0, dim), dtype=np.float32))
+            return future
+
+        request = _Request(
+            future=future, results=[None] * len(texts), remaining=len(texts)
+        )
+        for i, text in enumerate(texts):
+            self._queue.put_nowait(_Item(len(text), i, text, request))
+        self._requests += 1
+        EMBEDDING_QUEUE_DEPTH.set(self._queue.qsize())
+        return future
+
+    async def _collect(self) -> List[_Item]:
+        """Wait for one item, then gather more until full or timed out."""
+        loop = asyncio.get_running_loop()
+        items = self._window = [await self._queue.get()]
+        limit = self.max_batch_size * self.window_batches
+        deadline = loop.time() + self.max_wait
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        EMBEDDING_QUEUE_DEPTH.set(self._queue.qsize())
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            # Sorting the window by length keeps each micro-batch's texts
+            # similar in size, which cuts padding in the forward pass.
+            items.sort()
+            for start in range(0, len(items), self.max_batch_size):
+                batch = items[start : start + self.max_batch_size]
+                try:
+                    embeddings = await loop.run_in_executor(
+                        None,
+                        partial(
+                            self.model.encode,
+                            [item.text for item in batch],
+                            batch_size=len(batch),
+                            convert_to_numpy=True,
+                        ),
+                    )
+                except Exception as e:
+                    logger.error("Error in embedding micro-batch: %s", e)
+                    for item in batch:
+                        if not item.request.future.done():
+                            item.request.future.set_exception(e)
+                    continue
+
+                self._batches += 1
+                self._items += len(batch)
+                EMBEDDING_BATCH_SIZE.observe(len(batch))
+                for item, embedding in zip(batch, embeddings):
+                    self._deliver(item, embedding)
+            self._window = []
+
+    @staticmethod
+    def _deliver(item: _Item, embedding: np.ndarray):
+        request = item.request
+        if request.future.done():
+            return
+        request.results[item.index] = embedding
+        request.remaining -= 1
+        if request.remaining == 0:
+            request.future.set_result(np.stack(request.results))
+
+    def stats(self) -> dict:
+        """Queue depth and batch-fill statistics."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "requests": self._requests,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": (
+                self._items / self._batches if self._batches else 0.0
+            ),
+            "avg_batch_fill": (
+                self._items / (self._batches * self.max_batch_size)
+                if self._batches
+                else 0.0
+            ),
+        }
+
+    def __str__(self):
+        return (
+            f"Embedding Scheduler with max batch {self.max_batch_size} "
+            f"and max wait {self.max_wait * 1000}ms"
+        )
+
+    def __repr__(self):
+        return (
+            f"EmbeddingScheduler(max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000})"
+        )
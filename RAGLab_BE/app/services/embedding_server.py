@@ -0,0 +1,351 @@
+import asyncio
+import copy
+import json
+import os
+import queue
+import signal
+import socket
+import struct
+import time
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+from .embedding import EmbeddingService
+from .embedding_backends import (
+    model_source,
+    load_embedding_model,
+    model_cache_name,
+    warm_up,
+)
+from .embedding_cache import EmbeddingCache
+from .embedding_scheduler import EmbeddingScheduler
+
+logger = SingletonLogger.get_logger()
+
+# Every message is a JSON header followed by an optional binary payload,
+# preceded by their two lengths.
+_FRAME = struct.Struct(">II")
+
+
+def _frame(meta: dict, payload: bytes = b"") -> bytes:
+    header = json.dumps(meta).encode("utf-8")
+    return _FRAME.pack(len(header), len(payload)) + header + payload
+
+
+class EmbeddingServer:
+    """Local embedding sidecar shared by every HTTP worker.
+
+    The model is loaded once, here, instead of once per uvicorn worker.
+    Workers connect over a Unix socket and send lists of texts; requests
+    from all of them go through one EmbeddingScheduler, so concurrent
+    workers share forward passes, and through one embedding cache.
+    Requests sent with ``"cache": false``, such as search queries, skip
+    that cache so they never fill the persistent chunk cache.
+    """
+
+    def __init__(
+        self,
+        service: EmbeddingService,
+        info: dict,
+        socket_path: str = None,
+    ):
+        self.service = service
+        self.uncached = EmbeddingService(
+            service.model, scheduler=service.scheduler
+        )
+        self.info = info
+        self.socket_path = socket_path or settings.EMBEDDING_SERVER_SOCKET
+        self._server: asyncio.AbstractServer = None
+        self._writers = set()
+        self._requests = 0
+        self._texts = 0
+
+    async def start(self):
+        """Listen on the Unix socket, replacing a stale one."""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.socket_path
+        )
+        logger.info(f"Embedding server listening on {self.socket_path}")
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        # Workers keep their connections open; close them so that
+        # wait_closed does not wait for the workers to go away.
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        logger.info("Embedding server stopped")
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    sizes = await reader.readexactly(_FRAME.size)
+                except asyncio.IncompleteReadError:
+                    return
+                header_size, payload_size = _FRAME.unpack(sizes)
+                meta = json.loads(await reader.readexactly(header_size))
+                await reader.readexactly(payload_size)
+                writer.write(await self._respond(meta))
+                await writer.drain()
+        except Exception as e:
+            logger.error(f"Embedding server connection failed: {str(e)}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, meta: dict) -> bytes:
+        op = meta.get("op")
+        if op == "info":
+            return _frame({**self.info, "stats": self.stats()})
+        if op != "encode":
+            return _frame({"error": f"Unknown operation: {op}"})
+        try:
+            texts = meta["texts"]
+            service = (
+                self.service if meta.get("cache", True) else self.uncached
+            )
+            embeddings = await service.get_embeddings(texts)
+        except Exception as e:
+            return _frame({"error": str(e)})
+        self._requests += 1
+        self._texts += len(texts)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        return _frame({"shape": embeddings.shape}, embeddings.tobytes())
+
+    def stats(self) -> dict:
+        stats = {
+            "requests": self._requests,
+            "texts": self._texts,
+            "scheduler": self.service.scheduler.stats(),
+        }
+        if self.service.cache is not None:
+            stats["cache"] = self.service.cache.stats()
+        return stats
+
+    def __str__(self):
+        return f"Embedding Server on {self.socket_path}"
+
+    def __repr__(self):
+        return f"EmbeddingServer(socket_path={self.socket_path})"
+
+
+class RemoteEmbeddingModel:
+    """Stand-in for a SentenceTransformer that encodes in the server.
+
+    Provides the parts of the model the app uses: ``encode``,
+    ``get_sentence_embedding_dimension``, ``max_seq_length`` and the
+    tokenizer, which is loaded locally since chunking needs it per token.
+    ``encode`` blocks, like the model's, and is thread-safe: each call
+    borrows one of up to ``connections`` pooled sockets. Without
+    ``cache`` the server does not cache what this model encodes.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = None,
+        connections: int = None,
+        timeout: float = None,
+        cache: bool = True,
+    ):
+        self.socket_path = socket_path or settings.EMBEDDING_SERVER_SOCKET
+        self.connections = (
+            connections or settings.EMBEDDING_SERVER_CONNECTIONS
+        )
+        self.timeout = timeout or settings.EMBEDDING_SERVER_TIMEOUT
+        self.cache = cache
+        self._pool: queue.LifoQueue = queue.LifoQueue()
+        self._info: dict = None
+        self._tokenizer = None
+
+    def connect(self, wait: float = None) -> dict:
+        """
+        Fetch the server's model info, waiting for it to come up.
+
+        Args:
+            wait: Seconds to keep retrying; defaults to the timeout
+
+        Returns:
+            dict: Model name, backend, dimension and sequence length
+        """
+        wait = self.timeout if wait is None else wait
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                self._info = self.server_info()
+                break
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(
+                        f"Embedding server at {self.socket_path} "
+                        f"unavailable: {str(e)}"
+                    ) from e
+                logger.info("Waiting for the embedding server...")
+                time.sleep(1)
+        logger.info(f"Connected to {self}: {self._info}")
+        return self._info
+
+    def _connection(self) -> socket.socket:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            return conn
+
+    @staticmethod
+    def _read(conn: socket.socket, size: int) -> bytearray:
+        data = bytearray(size)
+        view = memoryview(data)
+        while view:
+            n = conn.recv_into(view)
+            if n == 0:
+                raise ConnectionError("Embedding server closed connection")
+            view = view[n:]
+        return data
+
+    def _exchange(
+        self, conn: socket.socket, request: bytes
+    ) -> Tuple[dict, bytearray]:
+        try:
+            conn.sendall(request)
+            header_size, payload_size = _FRAME.unpack(
+                self._read(conn, _FRAME.size)
+            )
+            response = json.loads(self._read(conn, header_size))
+            return response, self._read(conn, payload_size)
+        except BaseException:
+            conn.close()
+            raise
+
+    def _call(self, meta: dict) -> Tuple[dict, bytearray]:
+        request = _frame(meta)
+        conn = self._connection()
+        try:
+            response, payload = self._exchange(conn, request)
+        except ConnectionError:
+            # A pooled connection may predate a server restart; retry once
+            # on a fresh one.
+            self.close()
+            conn = self._connection()
+            response, payload = self._exchange(conn, request)
+        if self._pool.qsize() < self.connections:
+            self._pool.put(conn)
+        else:
+            conn.close()
+        if "error" in response:
+            raise RuntimeError(f"Embedding server: {response['error']}")
+        return response, payload
+
+    def uncached(self) -> "RemoteEmbeddingModel":
+        """A view of this model, sharing its connections, whose texts the
+        server does not cache."""
+        view = copy.copy(self)
+        view.cache = False
+        return view
+
+    def server_info(self) -> dict:
+        """Model info and current statistics of the server."""
+        return self._call({"op": "info"})[0]
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        normalize_embeddings: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """Embed texts in the server; other ``encode`` options are ignored
+        since the server batches across all workers itself."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        response, payload = self._call(
+            {"op": "encode", "texts": texts, "cache": self.cache}
+        )
+        embeddings = np.frombuffer(payload, dtype=np.float32).reshape(
+            response["shape"]
+        )
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._info["dim"]
+
+    @property
+    def max_seq_length(self) -> int:
+        return self._info["max_seq_length"]
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+
+            self._tokenizer = AutoTokenizer.from_pretrained(model_source())
+        return self._tokenizer
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def __str__(self):
+        return f"Remote Embedding Model at {self.socket_path}"
+
+    def __repr__(self):
+        return (
+            f"RemoteEmbeddingModel(socket_path={self.socket_path}, "
+            f"connections={self.connections}, cache={self.cache})"
+        )
+
+
+async def serve():
+    """Load the model once and serve it until SIGTERM or SIGINT."""
+    model = await asyncio.to_thread(load_embedding_model)
+    await asyncio.to_thread(warm_up, model)
+    scheduler = EmbeddingScheduler(model)
+    await scheduler.start()
+    cache = (
+        EmbeddingCache(model_cache_name())
+        if settings.EMBEDDING_CACHE_ENABLED
+        else None
+    )
+    server = EmbeddingServer(
+        EmbeddingService(model, scheduler=scheduler, cache=cache),
+        info={
+            "model_name": model_cache_name(),
+            "backend": settings.EMBEDDING_BACKEND,
+            "dim": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+        },
+    )
+    await server.start()
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopped.set)
+    await stopped.wait()
+
+    await server.stop()
+    await scheduler.stop()
+    if cache is not None:
+        cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,424 @@
+import asyncio
+import fcntl
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger, log_context
+from ..core.metrics import INGEST_JOBS, JOBS_IN_FLIGHT, JOBS_QUEUED
+from ..models.jobs import Job, JobStage, JobStatus
+from .doc_processing.pipeline import DocumentProcessingPipeline
+
+logger = SingletonLogger.get_logger()
+
+
+def _remove_upload(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    chunks_total INTEGER NOT NULL DEFAULT 0,
+    chunks_embedded INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    content_hash TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before);
+CREATE INDEX IF NOT EXISTS jobs_filename ON jobs (filename, status);
+"""
+
+# Columns added after the first release, for databases created before them.
+_MIGRATIONS = {"content_hash": "ALTER TABLE jobs ADD COLUMN content_hash TEXT"}
+
+_JOB_COLUMNS = ", ".join(Job.model_fields)
+
+
+class JobStore:
+    """SQLite-backed persistence for ingestion jobs."""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.JOBS_DB_PATH
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {
+            row["name"]
+            for row in self._conn.execute("PRAGMA table_info(jobs)")
+        }
+        for column, statement in _MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(statement)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_content_hash "
+            "ON jobs (content_hash)"
+        )
+        self._runner_lock = None
+
+    def create(
+        self, filename: str, file_path: str, content_hash: str = None
+    ) -> Job:
+        return self.create_many([(filename, file_path, content_hash)])[0]
+
+    def create_many(
+        self, uploads: List[Tuple[str, str, Optional[str]]]
+    ) -> List[Job]:
+        """Queue ``(filename, file_path, content_hash)`` uploads at once."""
+        now = datetime.utcnow().isoformat()
+        job_ids = [uuid.uuid4().hex for _ in uploads]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO jobs (id, filename, file_path, status, stage, "
+                "content_hash, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        job_id,
+                        filename,
+                        file_path,
+                        JobStatus.QUEUED.value,
+                        JobStage.PENDING.value,
+                        content_hash,
+                        now,
+                        now,
+                    )
+                    for job_id, (filename, file_path, content_hash) in zip(
+                        job_ids, uploads
+                    )
+                ],
+            )
+        return [self.get(job_id) for job_id in job_ids]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job(**row) if row else None
+
+    def find_active(self, content_hash: str) -> Optional[Job]:
+        """Return a queued or running job for the same file content."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE content_hash = ? "
+                "AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (
+                    content_hash,
+                    JobStatus.QUEUED.value,
+                    JobStatus.RUNNING.value,
+                ),
+            ).fetchone()
+        return Job(**row) if row else None
+
+    def list(
+        self, status: JobStatus = None, limit: int = 100, offset: int = 0
+    ) -> List[Job]:
+        query = f"SELECT {_JOB_COLUMNS} FROM jobs"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status.value,)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit, offset))
+            return [Job(**row) for row in rows.fetchall()]
+
+    def update(self, job_id: str, **fields):
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        values = [
+            value.value if isinstance(value, (JobStatus, JobStage)) else value
+            for value in fields.values()
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*values, job_id),
+            )
+
+    def claim_next(self) -> Optional[Job]:
+        """Atomically move the oldest runnable queued job to running.
+
+        A single UPDATE statement, so two processes sharing the database
+        can never claim the same job. Jobs for a filename that already
+        has a running job wait for it: revisions of one document diff
+        against its registered chunks and must not run concurrently.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ("
+                "SELECT id FROM jobs WHERE status = ? AND not_before <= ? "
+                "AND filename NOT IN ("
+                "SELECT filename FROM jobs WHERE status = ?) "
+                "ORDER BY created_at LIMIT 1) RETURNING id",
+                (
+                    JobStatus.RUNNING.value,
+                    datetime.utcnow().isoformat(),
+                    JobStatus.QUEUED.value,
+                    time.time(),
+                    JobStatus.RUNNING.value,
+                ),
+            ).fetchall()
+        if not rows:
+            return None
+        return self.get(rows[0]["id"])
+
+    def count(self, status: JobStatus) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (status.value,)
+            ).fetchone()[0]
+
+    def acquire_runner_lock(self) -> bool:
+        """
+        Try to become the one process that runs this store's jobs.
+
+        With several HTTP workers every one of them can queue jobs, but
+        only the holder of this lock runs them and requeues interrupted
+        ones. The lock is released when its process exits.
+
+        Returns:
+            bool: Whether this process holds the lock
+        """
+        if self._runner_lock is not None:
+            return True
+        lock_file = open(f"{self.db_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._runner_lock = lock_file
+        return True
+
+    def requeue_interrupted(self) -> int:
+        """Return jobs left running by a crashed process to the queue."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (
+                    JobStatus.QUEUED.value,
+                    datetime.utcnow().isoformat(),
+                    JobStatus.RUNNING.value,
+                ),
+            )
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        if self._runner_lock is not None:
+            self._runner_lock.close()
+            self._runner_lock = None
+
+
+class JobQueue:
+    """Durable ingestion queue with bounded concurrency and retries.
+
+    Each job owns the stored upload at its ``file_path``, which is
+    removed once the job has succeeded or finally failed.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        pipeline: DocumentProcessingPipeline,
+        workers: int = None,
+        max_attempts: int = None,
+        backoff: float = None,
+    ):
+        self.store = store
+        self.pipeline = pipeline
+        self.workers = workers or settings.INGEST_WORKERS
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.backoff = backoff or settings.JOB_RETRY_BACKOFF
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+
+    async def start(self):
+        """Start running jobs, once no other process is running them."""
+        self._tasks = [asyncio.create_task(self._lead())]
+
+    async def _lead(self):
+        """Wait for the store's runner lock, then resume interrupted jobs
+        and start the worker tasks."""
+        if not await asyncio.to_thread(self.store.acquire_runner_lock):
+            logger.info(
+                "Another process is running ingestion jobs; "
+                "queueing only until it stops"
+            )
+            while not await asyncio.to_thread(
+                self.store.acquire_runner_lock
+            ):
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+        resumed = await asyncio.to_thread(self.store.requeue_interrupted)
+        if resumed:
+            logger.info("Resuming %d interrupted ingestion jobs", resumed)
+        self._tasks.extend(
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        )
+        self._wakeup.set()
+        logger.info("Job queue started with %d workers", self.workers)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Jobs cancelled mid-run are still marked running and will be
+        # requeued by requeue_interrupted on the next start.
+        logger.info("Job queue stopped")
+
+    async def submit(
+        self, filename: str, file_path: str, content_hash: str = None
+    ) -> Job:
+        jobs = await self.submit_many([(filename, file_path, content_hash)])
+        return jobs[0]
+
+    async def submit_many(
+        self, uploads: List[Tuple[str, str, Optional[str]]]
+    ) -> List[Job]:
+        """Queue several uploads in one transaction."""
+        if not uploads:
+            return []
+        jobs = await asyncio.to_thread(self.store.create_many, uploads)
+        self._wakeup.set()
+        for job in jobs:
+            logger.info(
+                "Queued ingestion job %s for %s", job.id, job.filename
+            )
+        return jobs
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _claim(self) -> Optional[Job]:
+        job = self.store.claim_next()
+        JOBS_QUEUED.set(self.store.count(JobStatus.QUEUED))
+        return job
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.JOB_POLL_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._in_flight += 1
+            JOBS_IN_FLIGHT.inc()
+            try:
+                # Every record logged while the job runs, down to the
+                # pipeline and its insert tasks, carries these fields.
+                with log_context(job_id=job.id, filename=job.filename):
+                    await self._run(job)
+            finally:
+                self._in_flight -= 1
+                JOBS_IN_FLIGHT.dec()
+
+    async def _run(self, job: Job):
+        logger.info(
+            "Running ingestion job %s for %s (attempt %d/%d)",
+            job.id,
+            job.filename,
+            job.attempts,
+            self.max_attempts,
+        )
+
+        async def progress(stage: Optional[JobStage], **counts):
+            if stage is not None:
+                counts["stage"] = stage
+            await asyncio.to_thread(self.store.update, job.id, **counts)
+
+        try:
+            await self.pipeline.process_file(
+                job.file_path,
+                job.filename,
+                progress=progress,
+                collect=False,
+                content_hash=job.content_hash,
+            )
+        except Exception as e:
+            await self._fail(job, e)
+            return
+        await asyncio.to_thread(
+            self.store.update,
+            job.id,
+            status=JobStatus.SUCCEEDED,
+            error=None,
+        )
+        await asyncio.to_thread(_remove_upload, job.file_path)
+        INGEST_JOBS.labels("succeeded").inc()
+        logger.info("Ingestion job %s succeeded", job.id)
+
+    async def _fail(self, job: Job, error: Exception):
+        if job.attempts >= self.max_attempts:
+            logger.error("Ingestion job %s failed: %s", job.id, error)
+            INGEST_JOBS.labels("failed").inc()
+            await asyncio.to_thread(
+                self.store.update,
+                job.id,
+                status=JobStatus.FAILED,
+                error=str(error),
+            )
+            await asyncio.to_thread(_remove_upload, job.file_path)
+            return
+
+        delay = self.backoff * 2 ** (job.attempts - 1)
+        INGEST_JOBS.labels("retried").inc()
+        logger.warning(
+            "Ingestion job %s failed: %s, retrying in %ss",
+            job.id,
+            error,
+            delay,
+        )
+        await asyncio.to_thread(
+            self.store.update,
+            job.id,
+            status=JobStatus.QUEUED,
+            error=str(error),
+            not_before=time.time() + delay,
+        )
+
+    def __str__(self):
+        return f"Job Queue with {self.workers} workers"
+
+    def __repr__(self):
+        return (
+            f"JobQueue(workers={self.workers}, "
+            f"max_attempts={self.max_attempts}, backoff={self.backoff})"
+        )
+
+
+async def get_job_queue(request: Request) -> JobQueue:
+    """Dependency to get the ingestion job queue from app state."""
+    if not hasattr(request.app.state, "job_queue"):
+        raise HTTPException(status_code=503, detail="Job queue not running")
+    return request.app.state.job_queue
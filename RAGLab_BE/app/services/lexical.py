@@ -0,0 +1,476 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+from ..repository.interfaces import FILTERABLE_FIELDS, SearchHit, chunk_ids
+from .doc_processing.interfaces import ProcessedDocument
+
+logger = SingletonLogger.get_logger()
+
+# Words, and compounds such as part numbers (``AB-1234.5``) or paths,
+# which are indexed both whole and by their parts.
+_TOKEN = re.compile(r"\w+(?:[-./]\w+)*")
+_SEPARATORS = re.compile(r"[-./]")
+# A query term that looks like an identifier rather than prose.
+_IDENTIFIER = re.compile(r"^(?=.*\d)\w+(?:[-./]\w+)*$")
+
+_MAX_TF = 65_535
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    doc INTEGER PRIMARY KEY AUTOINCREMENT,
+    chunk_id TEXT NOT NULL UNIQUE,
+    filename TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    filename TEXT PRIMARY KEY,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tombstones (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc INTEGER NOT NULL
+);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased terms of ``text``; compounds also yield their parts."""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        terms.append(token)
+        if _SEPARATORS.search(token):
+            terms.extend(_SEPARATORS.split(token))
+    return terms
+
+
+def is_keyword_query(query: str) -> bool:
+    """
+    Whether a query is a lookup the lexical index answers on its own.
+
+    Quoted queries and queries that are a single identifier, such as a
+    part number, match on exact terms; embedding them adds latency
+    without improving the ranking. Any other wording around an
+    identifier carries meaning, so those queries stay hybrid.
+
+    Args:
+        query: Query text
+
+    Returns:
+        bool: Whether the embedding model can be skipped
+    """
+    query = query.strip()
+    if len(query) > 2 and query[0] == query[-1] == '"':
+        return True
+    return bool(_IDENTIFIER.match(query))
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[SearchHit]], top_k: int, k: int = None
+) -> List[SearchHit]:
+    """
+    Merge rankings by reciprocal rank fusion.
+
+    Every hit scores ``sum(1 / (k + rank))`` over the rankings it appears
+    in, so no score normalisation between BM25 and cosine is needed.
+
+    Args:
+        rankings: Hit lists, best first, identified by chunk id
+        top_k: Hits to return
+        k: Damping constant; larger values flatten the rank curve
+
+    Returns:
+        List[SearchHit]: Fused hits, best first, scored by fusion score
+    """
+    k = k or settings.RRF_K
+    scores: Dict[str, float] = {}
+    hits: Dict[str, SearchHit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            scores[hit.id] = scores.get(hit.id, 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit.id, hit)
+    best = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return [
+        SearchHit(
+            id=hit_id,
+            score=round(scores[hit_id], 6),
+            text=hits[hit_id].text,
+            metadata=hits[hit_id].metadata,
+        )
+        for hit_id in best
+    ]
+
+
+class _Postings:
+    """Doc ids and term frequencies of one term, in parallel arrays."""
+
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.tfs = array("H")
+
+
+class LexicalIndex:
+    """BM25 inverted index over chunk texts, kept next to the vectors.
+
+    Chunks are stored in SQLite; postings are held in memory as compact
+    arrays and updated as each batch of a document is indexed. Deleted
+    chunks are masked at query time and dropped from the postings once
+    they make up a quarter of them.
+
+    Several processes can share the database: the one running ingestion
+    writes to it, and the others replay new rows and tombstones before
+    searching whenever SQLite reports that another connection committed.
+    """
+
+    def __init__(
+        self, db_path: str = None, k1: float = None, b: float = None
+    ):
+        self.db_path = db_path or settings.LEXICAL_INDEX_PATH
+        self.k1 = k1 or settings.BM25_K1
+        self.b = settings.BM25_B if b is None else b
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._postings: Dict[str, _Postings] = {}
+        # Per doc id (SQLite rowid): length in terms, file and liveness.
+        self._lengths = array("I")
+        self._files = array("I")
+        self._deleted = bytearray()
+        self._filenames: List[str] = []
+        self._file_ids: Dict[str, int] = {}
+        self._file_types: List[str] = []
+        self._live = 0
+        self._dead = 0
+        self._total_length = 0
+        self._max_doc = 0
+        self._max_tombstone = 0
+        self._data_version = None
+
+    def _file_id(self, filename: str, file_type: str = None) -> int:
+        if filename not in self._file_ids:
+            self._file_ids[filename] = len(self._filenames)
+            self._filenames.append(filename)
+            self._file_types.append(file_type or "")
+        elif file_type:
+            self._file_types[self._file_ids[filename]] = file_type
+        return self._file_ids[filename]
+
+    def _index(self, doc: int, filename: str, text: str):
+        terms = Counter(tokenize(text))
+        grow = doc + 1 - len(self._lengths)
+        if grow > 0:
+            self._lengths.extend([0] * grow)
+            self._files.extend([0] * grow)
+            self._deleted.extend(b"\x01" * grow)
+        length = sum(terms.values())
+        self._lengths[doc] = length
+        self._files[doc] = self._file_id(filename)
+        self._deleted[doc] = 0
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.docs.append(doc)
+            postings.tfs.append(min(tf, _MAX_TF))
+        self._live += 1
+        self._total_length += length
+        self._max_doc = max(self._max_doc, doc)
+
+    def _unindex(self, doc: int):
+        if doc < len(self._deleted) and not self._deleted[doc]:
+            self._deleted[doc] = 1
+            self._live -= 1
+            self._dead += 1
+            self._total_length -= self._lengths[doc]
+
+    def _catch_up(self):
+        """Apply rows and tombstones committed by other processes."""
+        for filename, metadata in self._conn.execute(
+            "SELECT filename, metadata FROM documents"
+        ):
+            self._file_id(filename, json.loads(metadata).get("file_type"))
+        rows = self._conn.execute(
+            "SELECT doc, filename, text FROM chunks WHERE doc > ? "
+            "ORDER BY doc",
+            (self._max_doc,),
+        )
+        for doc, filename, text in rows:
+            self._index(doc, filename, text)
+        for seq, doc in self._conn.execute(
+            "SELECT seq, doc FROM tombstones WHERE seq > ? ORDER BY seq",
+            (self._max_tombstone,),
+        ):
+            self._unindex(doc)
+            self._max_tombstone = seq
+        self._data_version = self._conn.execute(
+            "PRAGMA data_version"
+        ).fetchone()[0]
+
+    def _refresh(self):
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._catch_up()
+
+    def load(self):
+        """Build the postings from the stored chunks; blocking."""
+        with self._lock:
+            self._catch_up()
+        logger.info(
+            f"Opened lexical index at {self.db_path} with {self._live} "
+            f"chunks and {len(self._postings)} terms"
+        )
+
+    def __len__(self) -> int:
+        return self._live
+
+    def add(self, document: ProcessedDocument) -> int:
+        """
+        Index a batch of a document's chunks; blocking.
+
+        Args:
+            document: Columnar batch sharing the document metadata
+
+        Returns:
+            int: Chunks indexed; chunks already present are skipped
+        """
+        if len(document) == 0:
+            return 0
+        filename = document.metadata["filename"]
+        ids = chunk_ids(document)
+        added = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Under the write lock, so no other process can commit
+                # rows between catching up and inserting.
+                self._refresh()
+                self._conn.execute(
+                    "INSERT INTO documents (filename, metadata) "
+                    "VALUES (?, ?) ON CONFLICT (filename) DO UPDATE SET "
+                    "metadata = excluded.metadata",
+                    (filename, json.dumps(document.metadata, default=str)),
+                )
+                self._file_id(filename, document.metadata.get("file_type"))
+                inserted = []
+                for cid, text, position in zip(
+                    ids, document.texts, document.chunk_indices
+                ):
+                    row = self._conn.execute(
+                        "INSERT INTO chunks "
+                        "(chunk_id, filename, chunk_index, text) "
+                        "VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (chunk_id) DO NOTHING RETURNING doc",
+                        (cid, filename, int(position), text),
+                    ).fetchone()
+                    if row is not None:
+                        inserted.append((row[0], text))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for doc, text in inserted:
+                self._index(doc, filename, text)
+                added += 1
+        return added
+
+    def delete(self, ids: List[str]):
+        """Remove chunks by id; blocking."""
+        if not ids:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                docs = []
+                for cid in ids:
+                    row = self._conn.execute(
+                        "DELETE FROM chunks WHERE chunk_id = ? RETURNING doc",
+                        (cid,),
+                    ).fetchone()
+                    if row is not None:
+                        docs.append(row[0])
+                for doc in docs:
+                    self._max_tombstone = self._conn.execute(
+                        "INSERT INTO tombstones (doc) VALUES (?) "
+                        "RETURNING seq",
+                        (doc,),
+                    ).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for doc in docs:
+                self._unindex(doc)
+            if self._dead > 1000 and self._dead * 3 > self._live:
+                self._compact()
+
+    def _compact(self):
+        """Drop deleted docs from every posting list."""
+        deleted = np.frombuffer(self._deleted, dtype=np.uint8).astype(bool)
+        for term in list(self._postings):
+            postings = self._postings[term]
+            # Copies, so no view pins the arrays against resizing.
+            docs = np.array(postings.docs, dtype=np.uint32)
+            keep = ~deleted[docs]
+            if keep.all():
+                continue
+            if not keep.any():
+                del self._postings[term]
+                continue
+            compacted = _Postings()
+            compacted.docs.frombytes(docs[keep].tobytes())
+            compacted.tfs.frombytes(
+                np.array(postings.tfs, dtype=np.uint16)[keep].tobytes()
+            )
+            self._postings[term] = compacted
+        self._dead = 0
+
+    def _allowed_files(
+        self, filters: Dict[str, Any]
+    ) -> Optional[np.ndarray]:
+        if not filters:
+            return None
+        for key in filters:
+            if key not in FILTERABLE_FIELDS:
+                raise ValueError(f"Cannot filter on field: {key}")
+        return np.array(
+            [
+                i
+                for i, name in enumerate(self._filenames)
+                if filters.get("filename", name) == name
+                and filters.get("file_type", self._file_types[i])
+                == self._file_types[i]
+            ],
+            dtype=np.uint32,
+        )
+
+    def _rank(
+        self, query: str, top_k: int, allowed: Optional[np.ndarray]
+    ) -> List[Tuple[int, float]]:
+        """BM25 top-k ``(doc, score)`` for one query, under the lock."""
+        terms = [t for t in set(tokenize(query)) if t in self._postings]
+        if not terms or not self._live:
+            return []
+        n = self._live
+        avg_length = self._total_length / n
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+        docs, weights = [], []
+        for term in terms:
+            postings = self._postings[term]
+            df = len(postings.docs)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            term_docs = np.frombuffer(postings.docs, dtype=np.uint32)
+            tf = np.frombuffer(postings.tfs, dtype=np.uint16).astype(
+                np.float32
+            )
+            norm = self.k1 * (
+                1 - self.b + self.b * lengths[term_docs] / avg_length
+            )
+            docs.append(term_docs.copy())
+            weights.append(idf * tf * (self.k1 + 1) / (tf + norm))
+            del term_docs
+        del lengths
+        docs = np.concatenate(docs)
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+
+        keep = np.frombuffer(self._deleted, dtype=np.uint8)[candidates] == 0
+        if allowed is not None:
+            files = np.frombuffer(self._files, dtype=np.uint32)
+            keep &= np.isin(files[candidates], allowed)
+            del files
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            candidates, scores = candidates[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+    def _hits(self, ranked: List[Tuple[int, float]]) -> List[SearchHit]:
+        if not ranked:
+            return []
+        rows = {
+            row[0]: row
+            for row in self._conn.execute(
+                "SELECT c.doc, c.chunk_id, c.chunk_index, c.text, d.metadata "
+                "FROM chunks c JOIN documents d USING (filename) "
+                f"WHERE c.doc IN ({', '.join('?' * len(ranked))})",
+                [doc for doc, _ in ranked],
+            )
+        }
+        hits = []
+        for doc, score in ranked:
+            if doc not in rows:
+                continue  # deleted by another process meanwhile
+            _, cid, position, text, metadata = rows[doc]
+            hits.append(
+                SearchHit(
+                    id=cid,
+                    score=round(score, 6),
+                    text=text,
+                    metadata={
+                        **json.loads(metadata),
+                        "chunk_index": position,
+                    },
+                )
+            )
+        return hits
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Dict[str, Any] = None,
+    ) -> List[List[SearchHit]]:
+        """
+        BM25 search for several queries; blocking.
+
+        Args:
+            queries: Query texts
+            top_k: Hits per query
+            filters: Metadata filters (filename, file_type)
+
+        Returns:
+            List[List[SearchHit]]: Hits per query, best first
+        """
+        with self._lock:
+            self._refresh()
+            allowed = self._allowed_files(filters)
+            ranked = [self._rank(query, top_k, allowed) for query in queries]
+            return [self._hits(r) for r in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "chunks": self._live,
+            "terms": len(self._postings),
+            "deleted_postings": self._dead,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __str__(self):
+        return f"Lexical Index at {self.db_path}"
+
+    def __repr__(self):
+        return (
+            f"LexicalIndex(db_path={self.db_path}, k1={self.k1}, b={self.b})"
+        )
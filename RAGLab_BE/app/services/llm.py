@@ -0,0 +1,111 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List
+
+import httpx
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+
+logger = SingletonLogger.get_logger()
+
+
+class LLMClient(ABC):
+    """Base class for streaming chat-completion clients."""
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Yield response tokens as soon as the model emits them."""
+        pass
+
+    async def close(self):
+        """Release network resources."""
+        pass
+
+    def __str__(self):
+        return f"{self.__class__.__name__} LLM Client"
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}LLMClient"
+
+
+class OpenAIClient(LLMClient):
+    """Streams chat completions from the OpenAI API.
+
+    One ``httpx.AsyncClient`` is kept for the life of the app, so requests
+    reuse warm keep-alive connections.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        base_url: str = None,
+    ):
+        self.model = model or settings.OPENAI_MODEL
+        api_key = api_key or settings.OPENAI_API_KEY
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.OPENAI_BASE_URL,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=10.0),
+        )
+
+    async def stream(
+        self, messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        payload = {"model": self.model, "messages": messages, "stream": True}
+        async with self._client.stream(
+            "POST", "/chat/completions", json=payload
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise RuntimeError(
+                    f"OpenAI request failed ({response.status_code}): "
+                    f"{body.decode(errors='replace')}"
+                )
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: ") :]
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if choices and (token := choices[0]["delta"].get("content")):
+                    yield token
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class StubLLMClient(LLMClient):
+    """Deterministic local generator used in tests and offline development.
+
+    Answers by listing how much context it received, one word at a time.
+    """
+
+    def __init__(self, token_delay: float = 0.0):
+        self.token_delay = token_delay
+
+    async def stream(
+        self, messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        question = messages[-1]["content"].rsplit("Question:", 1)[-1]
+        answer = (
+            f"(stub) Received {len(messages)} messages. "
+            f"You asked: {question.strip()}"
+        )
+        for word in answer.split(" "):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word + " "
+
+
+def create_llm_client(backend: str = None) -> LLMClient:
+    """Create the LLM client selected in settings."""
+    backend = backend or settings.LLM_BACKEND
+    if backend == "openai":
+        return OpenAIClient()
+    if backend == "stub":
+        return StubLLMClient()
+    raise ValueError(f"Unsupported LLM backend: {backend}")
@@ -0,0 +1,238 @@
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi import HTTPException, Request
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+
+logger = SingletonLogger.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    filename TEXT PRIMARY KEY,
+    file_type TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    content_hash TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_content_hash
+    ON documents (content_hash);
+CREATE TABLE IF NOT EXISTS chunks (
+    filename TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    PRIMARY KEY (filename, chunk_id)
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    filename TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL,
+    content_hash TEXT
+);
+"""
+
+# Columns added after the first release, for databases created before them.
+_MIGRATIONS = {
+    "content_hash": "ALTER TABLE aliases ADD COLUMN content_hash TEXT"
+}
+
+
+class DocumentRegistry:
+    """SQLite record of which chunks each ingested document has stored.
+
+    Chunk ids are content hashes, so comparing a new revision's ids with
+    the stored set tells the pipeline exactly which chunks to embed and
+    which to delete. Ids are registered as soon as their insert completes,
+    which also lets an interrupted ingestion resume without redoing work.
+
+    Documents also carry the hash of their uploaded bytes. An upload
+    whose bytes are already ingested under another name is recorded as
+    an alias of that document and shares its chunks. Aliases are bound
+    to those bytes: when the canonical document is re-ingested with
+    other content, its aliases move to another document with the old
+    bytes, or are dropped.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.REGISTRY_DB_PATH
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {
+            row["name"]
+            for row in self._conn.execute("PRAGMA table_info(aliases)")
+        }
+        for column, statement in _MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(statement)
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE filename = ?", (filename,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def find_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the ingested document with these exact bytes, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE content_hash = ? "
+                "ORDER BY updated_at LIMIT 1",
+                (content_hash,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def add_alias(
+        self, filename: str, canonical: str, content_hash: str = None
+    ):
+        """Serve ``filename`` from the chunks stored for ``canonical``
+        while it holds the bytes hashed ``content_hash``."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO aliases (filename, canonical, content_hash) "
+                "VALUES (?, ?, ?) ON CONFLICT (filename) DO UPDATE SET "
+                "canonical = excluded.canonical, "
+                "content_hash = excluded.content_hash",
+                (filename, canonical, content_hash),
+            )
+
+    def remove_alias(self, filename: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM aliases WHERE filename = ?", (filename,)
+            )
+
+    def resolve(self, filename: str) -> str:
+        """Name under which ``filename``'s chunks are stored.
+
+        An alias is only followed while its canonical document still
+        holds the bytes the alias was created for.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT a.canonical FROM aliases a "
+                "LEFT JOIN documents d ON d.filename = a.canonical "
+                "WHERE a.filename = ? AND (a.content_hash IS NULL "
+                "OR d.content_hash IS NULL "
+                "OR a.content_hash = d.content_hash)",
+                (filename,),
+            ).fetchone()
+        return row["canonical"] if row else filename
+
+    def chunk_ids(self, filename: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id FROM chunks WHERE filename = ?", (filename,)
+            ).fetchall()
+        return {row["chunk_id"] for row in rows}
+
+    def forget(self, filename: str):
+        """Drop the chunks and document record stored for ``filename``
+        and move or drop the aliases that point to it."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT content_hash FROM documents WHERE filename = ?",
+                (filename,),
+            ).fetchone()
+            self._conn.execute(
+                "DELETE FROM chunks WHERE filename = ?", (filename,)
+            )
+            self._conn.execute(
+                "DELETE FROM documents WHERE filename = ?", (filename,)
+            )
+            if row is not None:
+                self._rebind_aliases(filename, row["content_hash"])
+
+    def add_chunks(self, filename: str, chunk_ids: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (filename, chunk_id) "
+                "VALUES (?, ?)",
+                ((filename, chunk_id) for chunk_id in chunk_ids),
+            )
+
+    def remove_chunks(self, filename: str, chunk_ids: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE filename = ? AND chunk_id = ?",
+                ((filename, chunk_id) for chunk_id in chunk_ids),
+            )
+
+    def finalize(
+        self,
+        filename: str,
+        file_type: str,
+        chunk_count: int,
+        content_hash: str = None,
+    ):
+        """Record that ``filename`` is fully ingested."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT content_hash FROM documents WHERE filename = ?",
+                (filename,),
+            ).fetchone()
+            previous = row["content_hash"] if row else None
+            self._conn.execute(
+                "INSERT INTO documents (filename, file_type, chunk_count, "
+                "content_hash, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (filename) DO UPDATE SET "
+                "file_type = excluded.file_type, "
+                "chunk_count = excluded.chunk_count, "
+                "content_hash = excluded.content_hash, "
+                "updated_at = excluded.updated_at",
+                (
+                    filename,
+                    file_type,
+                    chunk_count,
+                    content_hash,
+                    datetime.utcnow().isoformat(),
+                ),
+            )
+            if previous is not None and previous != content_hash:
+                self._rebind_aliases(filename, previous)
+
+    def _rebind_aliases(self, filename: str, content_hash: str):
+        """Move aliases of ``filename``'s replaced bytes to another
+        document with those bytes, or drop them; in a transaction."""
+        row = self._conn.execute(
+            "SELECT filename FROM documents WHERE content_hash = ? "
+            "AND filename != ? ORDER BY updated_at LIMIT 1",
+            (content_hash, filename),
+        ).fetchone()
+        if row is None:
+            self._conn.execute(
+                "DELETE FROM aliases WHERE canonical = ? "
+                "AND (content_hash = ? OR content_hash IS NULL)",
+                (filename, content_hash),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE aliases SET canonical = ? WHERE canonical = ? "
+                "AND (content_hash = ? OR content_hash IS NULL)",
+                (row["filename"], filename, content_hash),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __str__(self):
+        return f"Document Registry at {self.db_path}"
+
+    def __repr__(self):
+        return f"DocumentRegistry(db_path={self.db_path})"
+
+
+async def get_document_registry(request: Request) -> DocumentRegistry:
+    """Dependency to get the document registry from app state."""
+    if not hasattr(request.app.state, "document_registry"):
+        raise HTTPException(
+            status_code=503, detail="Document registry not initialized"
+        )
+    return request.app.state.document_registry
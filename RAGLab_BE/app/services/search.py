@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi import HTTPException, Request
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+from ..core.metrics import SEARCH_STAGE_SECONDS
+from ..models.search import SearchResult
+from ..repository.interfaces import SearchHit, VectorStore
+from .embedding import EmbeddingService
+from .lexical import LexicalIndex, is_keyword_query, reciprocal_rank_fusion
+from .registry import DocumentRegistry
+
+logger = SingletonLogger.get_logger()
+
+SEARCH_STAGES = ("lexical", "embed", "search", "hydrate")
+
+
+class LatencyStats:
+    """Rolling per-stage latency samples with percentile summaries."""
+
+    def __init__(
+        self,
+        stages=SEARCH_STAGES,
+        window: int = None,
+        histogram=SEARCH_STAGE_SECONDS,
+    ):
+        window = window or settings.SEARCH_LATENCY_WINDOW
+        self._samples = {stage: deque(maxlen=window) for stage in stages}
+        # Prometheus histogram child per stage, also fed by record.
+        self._histograms = {
+            stage: histogram.labels(stage) for stage in stages
+        }
+
+    def record(self, stage: str, seconds: float, timings: Dict[str, float]):
+        """Record a sample and add it to ``timings`` in ms."""
+        self._samples[stage].append(seconds)
+        self._histograms[stage].observe(seconds)
+        timings[stage] = round(seconds * 1000, 3)
+
+    @contextmanager
+    def measure(self, stage: str, timings: Dict[str, float]):
+        """Time a block, recording it and adding it to ``timings`` in ms."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, timings)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for stage, samples in self._samples.items():
+            if not samples:
+                summary[stage] = {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0}
+                continue
+            p50, p99 = np.percentile(np.fromiter(samples, float), [50, 99])
+            summary[stage] = {
+                "count": len(samples),
+                "p50_ms": round(p50 * 1000, 3),
+                "p99_ms": round(p99 * 1000, 3),
+            }
+        return summary
+
+
+class SearchService:
+    """Embeds queries and runs top-k retrieval against the vector store.
+
+    ``embedding_service`` should carry a memory-only cache so repeated and
+    paginated queries skip the model entirely. With a ``registry``, a
+    filename filter naming a deduplicated upload is resolved to the
+    document whose chunks it shares.
+
+    With a ``lexical_index`` in hybrid mode, BM25 and vector hits are
+    merged by reciprocal rank fusion. Identifier lookups and quoted
+    queries that BM25 can answer skip the embedding model and the vector
+    store altogether.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        vector_store: VectorStore,
+        stats: LatencyStats = None,
+        registry: DocumentRegistry = None,
+        lexical_index: LexicalIndex = None,
+        mode: str = None,
+    ):
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.stats = stats or LatencyStats()
+        self.registry = registry
+        self.lexical_index = lexical_index
+        self.mode = mode or settings.SEARCH_MODE
+        if self.mode not in ("dense", "hybrid"):
+            raise ValueError(f"Unsupported search mode: {self.mode}")
+
+    @staticmethod
+    def _hydrate(hits: List[SearchHit], score_type: str) -> List[SearchResult]:
+        return [
+            SearchResult(
+                id=hit.id,
+                score=hit.score,
+                score_type=score_type,
+                text=hit.text,
+                metadata=hit.metadata,
+            )
+            for hit in hits
+        ]
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Dict[str, Any] = None,
+        offset: int = 0,
+    ):
+        """
+        Search several queries with one embedding call and one search.
+
+        Args:
+            queries: Query texts
+            top_k: Results per query
+            filters: Metadata filters (filename, file_type)
+            offset: Results to skip per query, for pagination
+
+        Returns:
+            Tuple of per-query results and per-stage timings in ms
+        """
+        timings: Dict[str, float] = {}
+        if self.registry is not None and filters and "filename" in filters:
+            filters = {
+                **filters,
+                "filename": await asyncio.to_thread(
+                    self.registry.resolve, filters["filename"]
+                ),
+            }
+        n = top_k + offset
+        hits: List[List[SearchHit]] = [[] for _ in queries]
+        score_types = ["dense"] * len(queries)
+        lexical = (
+            self.lexical_index
+            if self.mode == "hybrid" and self.lexical_index is not None
+            else None
+        )
+        if lexical is not None:
+            n = max(n, settings.HYBRID_CANDIDATES)
+            with self.stats.measure("lexical", timings):
+                hits = await asyncio.to_thread(
+                    lexical.search_many, queries, n, filters
+                )
+            score_types = ["bm25"] * len(queries)
+        dense = [
+            i
+            for i, query in enumerate(queries)
+            if lexical is None
+            or not (
+                settings.KEYWORD_FAST_PATH
+                and hits[i]
+                and is_keyword_query(query)
+            )
+        ]
+        if dense:
+            with self.stats.measure("embed", timings):
+                vectors = await self.embedding_service.get_embeddings(
+                    [queries[i] for i in dense]
+                )
+            with self.stats.measure("search", timings):
+                dense_hits = await self.vector_store.search(
+                    vectors, top_k=n, filters=filters
+                )
+            for i, vector_hits in zip(dense, dense_hits):
+                if lexical is not None:
+                    hits[i] = reciprocal_rank_fusion([vector_hits, hits[i]], n)
+                    score_types[i] = "rrf"
+                else:
+                    hits[i] = vector_hits
+        with self.stats.measure("hydrate", timings):
+            results = [
+                self._hydrate(h[offset : offset + top_k], score_type)
+                for h, score_type in zip(hits, score_types)
+            ]
+        return results, timings
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Dict[str, Any] = None,
+        offset: int = 0,
+    ):
+        """Search a single query; see ``search_many``."""
+        results, timings = await self.search_many(
+            [query], top_k=top_k, filters=filters, offset=offset
+        )
+        return results[0], timings
+
+    def __str__(self):
+        return f"Search Service over {self.vector_store}"
+
+    def __repr__(self):
+        return f"SearchService(vector_store={self.vector_store!r})"
+
+
+async def get_search_service(request: Request) -> SearchService:
+    """Dependency to get the search service from app state."""
+    if not hasattr(request.app.state, "search_service"):
+        raise HTTPException(
+            status_code=503, detail="Search service not initialized"
+        )
+    return request.app.state.search_service
@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from ..core.config import settings
+from ..core.logging import SingletonLogger
+
+logger = SingletonLogger.get_logger()
+
+
+@dataclass
+class ReceivedFile:
+    """A file part that has been written to disk."""
+
+    filename: str
+    content_type: str
+    path: str
+    size: int
+    content_hash: str
+
+
+class _Part:
+    """State of the file part currently being received."""
+
+    def __init__(self, filename: str, content_type: str, path: str):
+        self.filename = filename
+        self.content_type = content_type
+        self.path = path
+        self.file: Optional[BinaryIO] = None
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.pending: List[bytes] = []
+        self.pending_bytes = 0
+
+    def write_pending(self):
+        """Hash and write buffered data; runs in a worker thread."""
+        if self.file is None:
+            self.file = open(self.path, "wb")
+        for data in self.pending:
+            self.digest.update(data)
+            self.file.write(data)
+
+    def received(self) -> ReceivedFile:
+        return ReceivedFile(
+            filename=self.filename,
+            content_type=self.content_type,
+            path=self.path,
+            size=self.size,
+            content_hash=self.digest.hexdigest(),
+        )
+
+
+class MultipartUploadReceiver:
+    """Streams the file parts of a multipart request straight to disk.
+
+    The body is parsed as it arrives from the socket instead of being
+    spooled by the framework first. Each part goes to a temporary
+    ``.part`` file, and is hashed on the way, in writes of up to
+    ``write_size`` bytes made from a worker thread, so the event loop
+    never blocks on disk and memory per upload stays bounded. Size limits
+    are checked as bytes arrive, so oversized uploads are rejected without
+    being written out in full.
+    """
+
+    def __init__(
+        self,
+        upload_dir: str,
+        max_file_bytes: int = None,
+        max_request_bytes: int = None,
+        max_files: int = None,
+        write_size: int = 1024 * 1024,
+    ):
+        self.upload_dir = upload_dir
+        self.max_file_bytes = max_file_bytes or settings.MAX_UPLOAD_BYTES
+        self.max_request_bytes = (
+            max_request_bytes or settings.MAX_UPLOAD_REQUEST_BYTES
+        )
+        self.max_files = max_files or settings.MAX_UPLOAD_FILES
+        self.write_size = write_size
+
+    def _boundary(self, request: Request) -> bytes:
+        content_type, params = parse_options_header(
+            request.headers.get("content-type", "")
+        )
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(
+                status_code=400, detail="Expected multipart/form-data"
+            )
+        return params[b"boundary"]
+
+    def _check_content_length(self, request: Request):
+        length = request.headers.get("content-length")
+        if length is not None and int(length) > self.max_request_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request exceeds {self.max_request_bytes} bytes",
+            )
+
+    async def receive(self, request: Request) -> List[ReceivedFile]:
+        """
+        Receive every file part of ``request``.
+
+        Args:
+            request: Incoming multipart/form-data request
+
+        Returns:
+            List[ReceivedFile]: Files in the order they were sent, stored
+                at temporary paths the caller must move or remove
+
+        Raises:
+            HTTPException: 400 for a malformed body, 413 when a limit is
+                exceeded; files received so far are removed
+        """
+        self._check_content_length(request)
+        headers: dict = {}
+        header_field = bytearray()
+        header_value = bytearray()
+        events: List[tuple] = []
+
+        def on_header_field(data, start, end):
+            header_field.extend(data[start:end])
+
+        def on_header_value(data, start, end):
+            header_value.extend(data[start:end])
+
+        def on_header_end():
+            headers[bytes(header_field).lower()] = bytes(header_value)
+            header_field.clear()
+            header_value.clear()
+
+        def on_headers_finished():
+            events.append(("begin", dict(headers)))
+            headers.clear()
+
+        def on_part_data(data, start, end):
+            events.append(("data", bytes(data[start:end])))
+
+        def on_part_end():
+            events.append(("end", None))
+
+        parser = MultipartParser(
+            self._boundary(request),
+            {
+                "on_header_field": on_header_field,
+                "on_header_value": on_header_value,
+                "on_header_end": on_header_end,
+                "on_headers_finished": on_headers_finished,
+                "on_part_data": on_part_data,
+                "on_part_end": on_part_end,
+            },
+        )
+
+        received: List[ReceivedFile] = []
+        part: Optional[_Part] = None
+        total = 0
+        try:
+            async for chunk in request.stream():
+                total += len(chunk)
+                if total > self.max_request_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=(
+                            f"Request exceeds {self.max_request_bytes} bytes"
+                        ),
+                    )
+                try:
+                    parser.write(chunk)
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=400, detail=f"Malformed upload: {e}"
+                    )
+                for event, value in events:
+                    if event == "begin":
+                        part = self._begin(value, len(received))
+                    elif part is None:
+                        continue
+                    elif event == "data":
+                        await self._data(part, value)
+                    else:
+                        received.append(await self._end(part))
+                        part = None
+                events.clear()
+            parser.finalize()
+        except BaseException:
+            await asyncio.to_thread(self._discard, received, part)
+            raise
+        logger.info(
+            f"Received {len(received)} files ({total} bytes) by streaming"
+        )
+        return received
+
+    def _begin(self, headers: dict, n_received: int) -> Optional[_Part]:
+        _, disposition = parse_options_header(
+            headers.get(b"content-disposition", b"")
+        )
+        if b"filename" not in disposition:
+            # A plain form field; nothing to store.
+            return None
+        if n_received >= self.max_files:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {self.max_files} files per request",
+            )
+        filename = os.path.basename(disposition[b"filename"].decode())
+        if not filename:
+            raise HTTPException(status_code=400, detail="Missing filename")
+        path = os.path.join(
+            self.upload_dir, f"{filename}.{uuid.uuid4().hex}.part"
+        )
+        content_type = headers.get(b"content-type", b"").decode()
+        return _Part(filename, content_type, path)
+
+    async def _data(self, part: _Part, data: bytes):
+        part.size += len(data)
+        if part.size > self.max_file_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"{part.filename} exceeds {self.max_file_bytes} bytes"
+                ),
+            )
+        part.pending.append(data)
+        part.pending_bytes += len(data)
+        if part.pending_bytes >= self.write_size:
+            await self._flush(part)
+
+    async def _flush(self, part: _Part):
+        await asyncio.to_thread(part.write_pending)
+        part.pending = []
+        part.pending_bytes = 0
+
+    async def _end(self, part: _Part) -> ReceivedFile:
+        await self._flush(part)
+        await asyncio.to_thread(part.file.close)
+        return part.received()
+
+    @staticmethod
+    def _discard(received: List[ReceivedFile], part: Optional[_Part]):
+        paths = [f.path for f in received]
+        if part is not None:
+            if part.file is not None:
+                part.file.close()
+            paths.append(part.path)
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __str__(self):
+        return f"Multipart Upload Receiver into {self.upload_dir}"
+
+    def __repr__(self):
+        return (
+            f"MultipartUploadReceiver(upload_dir={self.upload_dir}, "
+            f"max_file_bytes={self.max_file_bytes}, "
+            f"max_files={self.max_files})"
+        )
@@ -0,0 +1,18 @@
+"""Defaults for the settings that have no value outside docker-compose.
+
+Benchmarks import the real ``app`` modules, whose ``Settings`` require the
+Milvus and OpenAI variables to be present even when they are not used.
+"""
+
+import os
+
+for _key, _value in {
+    "MILVUS_URI": "http://localhost:19530",
+    "MILVUS_TOKEN": "root:Milvus",
+    "MILVUS_DB_NAME": "default",
+    "MILVUS_COLLECTION_NAME": "benchmark",
+    "MILVUS_VECTOR_DIM": "768",
+    "OPENAI_API_KEY": "unused",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(_key, _value)
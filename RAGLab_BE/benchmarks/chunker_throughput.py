@@ -0,0 +1,160 @@
+"""Chunking throughput: langchain splitter vs the token-aware TextChunker.
+
+Chunks a synthetic corpus the way ingestion does (sections streamed in,
+buffered and split with the last chunk carried over) and reports MB/s.
+The "before" path rebuilds a ``RecursiveCharacterTextSplitter`` on every
+split and measures characters, as ``TextChunker`` used to.
+
+With ``--model``, the model's tokenizer is loaded and used both for the
+token-aware chunker and to count how many chunks of each path exceed the
+model's input limit and would be silently truncated when embedded.
+
+Usage:
+    python -m benchmarks.chunker_throughput --mb 20
+    python -m benchmarks.chunker_throughput --mb 20 \\
+        --model sentence-transformers/all-mpnet-base-v2
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from . import _env  # noqa: F401
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.services.doc_processing.chunkers import TextChunker
+
+VOCAB = (
+    "pump valve pressure manual revision torque bearing seal housing "
+    "inspection procedure warning maintenance assembly operator "
+    "clearance tolerance specification lubrication calibration"
+).split()
+
+
+def make_sections(mb: float, section_chars: int = 4000) -> list[str]:
+    """Pages of paragraphs of sentences, about ``mb`` megabytes in all."""
+    rng = random.Random(0)
+    target = int(mb * 1024 * 1024)
+    paragraphs, size = [], 0
+    while size < target:
+        sentences = [
+            " ".join(rng.choices(VOCAB, k=rng.randint(6, 24))).capitalize()
+            + rng.choice(".!?")
+            for _ in range(rng.randint(2, 8))
+        ]
+        paragraphs.append(" ".join(sentences))
+        size += len(paragraphs[-1]) + 2
+    text = "\n\n".join(paragraphs)
+    return [
+        text[i : i + section_chars]
+        for i in range(0, len(text), section_chars)
+    ]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def langchain_stream(sections, chunk_size, chunk_overlap):
+    """The previous chunker: a new splitter per call, sized in characters."""
+    threshold = chunk_size * 16
+    buffer = ""
+
+    def split(text):
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            is_separator_regex=False,
+        )
+        return splitter.split_text(text)
+
+    chunks = []
+    for section in sections:
+        buffer = f"{buffer}\n{section}" if buffer else section
+        if len(buffer) < threshold:
+            continue
+        split_chunks = split(buffer)
+        chunks.extend(split_chunks[:-1])
+        buffer = split_chunks[-1] if split_chunks else ""
+    if buffer:
+        chunks.extend(split(buffer))
+    return chunks
+
+
+async def chunker_stream(sections, chunker: TextChunker):
+    return [c async for c in chunker.chunk_stream(_aiter(sections))]
+
+
+def _over_limit(chunks, tokenizer, limit) -> int:
+    if tokenizer is None:
+        return -1
+    lengths = tokenizer(
+        chunks,
+        add_special_tokens=False,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )["input_ids"]
+    return sum(len(ids) > limit for ids in lengths)
+
+
+async def run(mb: float, model_name: str, overlap: int, repeat: int):
+    sections = make_sections(mb)
+    total_mb = sum(len(s) for s in sections) / 1024 / 1024
+    tokenizer, limit = None, 384
+    if model_name:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        limit = tokenizer.model_max_length
+        limit = min(limit, 512) - tokenizer.num_special_tokens_to_add()
+
+    paths = [
+        (
+            "langchain (before)",
+            lambda: langchain_stream(sections, 512, overlap),
+        ),
+        (
+            "token-aware (words)",
+            lambda: chunker_stream(sections, TextChunker(limit, overlap)),
+        ),
+    ]
+    if tokenizer is not None:
+        chunker = TextChunker(limit, overlap, tokenizer=tokenizer)
+        paths.append(
+            (
+                "token-aware (model)",
+                lambda: chunker_stream(sections, chunker),
+            )
+        )
+
+    print(f"corpus {total_mb:.1f} MiB, model limit {limit} tokens")
+    for label, make in paths:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            chunks = await make()
+            best = min(best, time.perf_counter() - start)
+        over = _over_limit(chunks, tokenizer, limit)
+        print(
+            f"{label:<22} {total_mb / best:>8.2f} MiB/s"
+            f"   {len(chunks):>7} chunks"
+            + (f"   {over:>6} over limit" if over >= 0 else "")
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=float, default=20)
+    parser.add_argument("--model", default="")
+    parser.add_argument("--overlap", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.mb, args.model, args.overlap, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Synthetic documents for the benchmarks.
+
+Text is built from a fixed vocabulary with a seeded generator, so every
+run produces identical files: paragraphs of sentences, grouped into
+pages. Writers produce TXT, DOCX (python-docx) and PDF. PDFs are written
+directly, one text-only page per group of lines, so no PDF library is
+needed to generate them and PyPDF2 can extract them again.
+
+Usage:
+    python -m benchmarks.corpus --out ./corpus --sizes 64K 1M 8M
+"""
+
+import argparse
+import os
+import random
+from typing import Dict, List
+
+VOCAB = (
+    "pump valve pressure manual revision torque bearing seal housing "
+    "inspection procedure warning maintenance assembly operator "
+    "clearance tolerance specification lubrication calibration impeller "
+    "shaft coupling gasket flange vibration temperature sensor alarm "
+    "shutdown startup filter cartridge replacement interval certificate"
+).split()
+
+SIZES = {"64K": 64 * 1024, "1M": 1024 * 1024, "8M": 8 * 1024 * 1024}
+
+FORMATS = ("txt", "docx", "pdf")
+
+# PDF page geometry: lines per page and characters per line.
+_PDF_LINES = 50
+_PDF_COLUMNS = 95
+
+
+def parse_size(size: str) -> int:
+    """``64K``, ``1M`` or a plain byte count."""
+    units = {"K": 1024, "M": 1024 * 1024, "G": 1024**3}
+    if size[-1].upper() in units:
+        return int(float(size[:-1]) * units[size[-1].upper()])
+    return int(size)
+
+
+def make_paragraphs(size: int, seed: int = 0) -> List[str]:
+    """Paragraphs of sentences totalling about ``size`` characters."""
+    rng = random.Random(seed)
+    paragraphs, total = [], 0
+    while total < size:
+        sentences = [
+            " ".join(rng.choices(VOCAB, k=rng.randint(6, 24))).capitalize()
+            + rng.choice(".!?")
+            for _ in range(rng.randint(2, 8))
+        ]
+        paragraphs.append(" ".join(sentences))
+        total += len(paragraphs[-1]) + 2
+    return paragraphs
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    return "\n\n".join(make_paragraphs(size, seed))
+
+
+def write_txt(path: str, paragraphs: List[str]):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(paragraphs))
+
+
+def write_docx(path: str, paragraphs: List[str]):
+    import docx
+
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def _wrap(paragraphs: List[str]) -> List[str]:
+    lines = []
+    for paragraph in paragraphs:
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + len(word) + 1 > _PDF_COLUMNS:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.extend([line, ""])
+    return lines
+
+
+def _escape(line: str) -> str:
+    return (
+        line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    )
+
+
+def write_pdf(path: str, paragraphs: List[str]):
+    """A minimal PDF 1.4: one Helvetica text stream per page."""
+    lines = _wrap(paragraphs)
+    pages = [
+        lines[i : i + _PDF_LINES] for i in range(0, len(lines), _PDF_LINES)
+    ]
+    # Objects: 1 catalog, 2 page tree, 3 font, then page and content
+    # stream pairs.
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in pages:
+        page_id = len(objects) + 1
+        kids.append(f"{page_id} 0 R")
+        body = ["BT /F1 10 Tf 12 TL 40 800 Td"]
+        body += [f"({_escape(line)}) '" for line in page]
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode()
+            + stream
+            + b"\nendstream"
+        )
+    objects[1] = (
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] "
+        f"/Count {len(pages)} >>".encode()
+    )
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, obj in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n".encode() + obj + b"\nendobj\n")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n".encode())
+        f.write(b"0000000000 65535 f \n")
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(
+            f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode()
+        )
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate(
+    out_dir: str, sizes: List[str], formats=FORMATS, seed: int = 0
+) -> Dict[str, Dict[str, str]]:
+    """
+    Write one document per format and size.
+
+    Args:
+        out_dir: Directory for the files
+        sizes: Size labels, such as ``64K`` or ``8M``, of the text
+        formats: Any of ``txt``, ``docx`` and ``pdf``
+        seed: Generator seed
+
+    Returns:
+        Dict[str, Dict[str, str]]: Path by size label, then by format
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    corpus = {}
+    for label in sizes:
+        paragraphs = make_paragraphs(parse_size(label), seed)
+        corpus[label] = {}
+        for fmt in formats:
+            path = os.path.join(out_dir, f"synthetic-{label}.{fmt}")
+            if not os.path.exists(path):
+                WRITERS[fmt](path, paragraphs)
+            corpus[label][fmt] = path
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", default="./corpus")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES))
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    corpus = generate(args.out, args.sizes, args.formats, args.seed)
+    for label, paths in corpus.items():
+        for fmt, path in paths.items():
+            print(f"{label:>4} {fmt:<5} {os.path.getsize(path):>12} {path}")
+
+
+if __name__ == "__main__":
+    main()
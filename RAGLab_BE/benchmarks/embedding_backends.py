@@ -0,0 +1,73 @@
+"""Encode throughput and fp32 parity of the CPU embedding backends.
+
+Loads the configured model on each backend in ``EMBEDDING_BACKENDS``,
+encodes the same chunks in batches and reports texts/second, then the
+cosine similarity of each backend's embeddings with the fp32 model's.
+
+The ONNX backends need an exported model; ``--export DIR`` writes one
+(plain and int8-quantized) and points ``EMBEDDING_MODEL_PATH`` at it.
+
+Usage:
+    python -m benchmarks.embedding_backends --export ./api_data/onnx
+    python -m benchmarks.embedding_backends --threads 4 --chunks 1000
+"""
+
+import argparse
+import time
+
+from . import _env  # noqa: F401
+
+from app.core.config import settings
+from app.services.embedding_backends import (
+    EMBEDDING_BACKENDS,
+    export_onnx,
+    load_embedding_model,
+    parity_check,
+)
+
+from .embedding_batching import make_chunks
+
+
+def run(backends, n_chunks: int, batch_size: int, threads: int):
+    chunks = make_chunks(n_chunks)
+    reference = load_embedding_model(
+        "torch", threads, source=settings.MODEL_NAME
+    )
+    print(f"{n_chunks} chunks, batch size {batch_size}, threads {threads}")
+    for backend in backends:
+        model = (
+            reference
+            if backend == "torch"
+            else load_embedding_model(backend, threads)
+        )
+        model.encode(chunks[:batch_size])  # warm-up
+        start = time.perf_counter()
+        model.encode(chunks, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        parity = parity_check(reference, model)
+        print(
+            f"{backend:<12} {n_chunks / elapsed:>9.1f} texts/s"
+            f"   mean cos {parity['mean_cosine']:.5f}"
+            f"   max drift {parity['max_drift']:.5f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--backends", nargs="+", default=list(EMBEDDING_BACKENDS)
+    )
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument(
+        "--export", default="", help="Export the model to ONNX here first"
+    )
+    args = parser.parse_args()
+    if args.export:
+        settings.EMBEDDING_MODEL_PATH = export_onnx(out_dir=args.export)
+    run(args.backends, args.chunks, args.batch_size, args.threads)
+
+
+if __name__ == "__main__":
+    main()
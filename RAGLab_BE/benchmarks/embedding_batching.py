@@ -0,0 +1,116 @@
+"""Per-chunk vs batched embedding throughput.
+
+Reproduces the old ``process_file`` loop (one ``encode`` call per chunk on
+the event loop) and the batched, executor-backed path, and reports
+chunks/second plus the worst event-loop stall observed while encoding.
+``--fake`` swaps the model for the suite's ``FakeEncoder`` so the script
+runs without torch or downloaded weights.
+
+Usage:
+    python -m benchmarks.embedding_batching --chunks 2000 --batch-sizes 16 32 64
+    python -m benchmarks.embedding_batching --fake
+"""
+
+import argparse
+import asyncio
+import time
+
+from . import _env  # noqa: F401
+
+from app.services.embedding import EmbeddingService
+
+
+def make_chunks(n: int, words: int = 90) -> list[str]:
+    vocab = (
+        "pump valve pressure manual revision torque bearing seal housing "
+        "inspection procedure warning maintenance assembly operator"
+    ).split()
+    return [
+        " ".join(vocab[(i * 7 + j) % len(vocab)] for j in range(words))
+        for i in range(n)
+    ]
+
+
+async def _heartbeat(stalls: list, interval: float = 0.01):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+async def _measure(coro_factory, interval: float = 0.01):
+    stalls = [0.0]
+    beat = asyncio.create_task(_heartbeat(stalls, interval))
+    # Let the heartbeat arm its timer first, and wake once more afterwards,
+    # or a loop blocked for the whole run would record no stall at all.
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(2 * interval)
+    beat.cancel()
+    return elapsed, max(stalls)
+
+
+def load_model(model_name: str, fake: bool):
+    if fake:
+        from .suite import FakeEncoder
+
+        return FakeEncoder()
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+async def run(model, n_chunks: int, batch_sizes: list[int]):
+    chunks = make_chunks(n_chunks)
+    model.encode(chunks[:8])  # warm-up
+
+    async def per_chunk():
+        for chunk in chunks:
+            model.encode(chunk, convert_to_numpy=True)
+
+    elapsed, stall = await _measure(per_chunk)
+    print(
+        f"{'per-chunk (before)':<24} {n_chunks / elapsed:>10.1f} chunks/s"
+        f"   max loop stall {stall * 1000:>8.1f} ms"
+    )
+
+    for batch_size in batch_sizes:
+        service = EmbeddingService(model, batch_size=batch_size)
+
+        async def batched():
+            for start in range(0, n_chunks, batch_size):
+                await service.get_embeddings(
+                    chunks[start : start + batch_size]
+                )
+
+        elapsed, stall = await _measure(batched)
+        label = f"batched bs={batch_size}"
+        print(
+            f"{label:<24} {n_chunks / elapsed:>10.1f} chunks/s"
+            f"   max loop stall {stall * 1000:>8.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model", default="sentence-transformers/all-mpnet-base-v2"
+    )
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[16, 32, 64]
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="use FakeEncoder instead of loading --model",
+    )
+    args = parser.parse_args()
+    model = load_model(args.model, args.fake)
+    asyncio.run(run(model, args.chunks, args.batch_sizes))
+
+
+if __name__ == "__main__":
+    main()
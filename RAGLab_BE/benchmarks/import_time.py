@@ -0,0 +1,96 @@
+"""Import-time report for ``app.main``.
+
+Imports the app in a fresh interpreter with ``-X importtime`` and prints
+the total, the slowest top-level packages (summing their modules' own
+import time) and any heavy package that was imported eagerly although
+the app only needs it once the model loads or a document is parsed.
+
+``--budget-ms`` makes the script exit non-zero when the total exceeds
+it, so a regression in startup time can fail CI.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 20 --budget-ms 1500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from . import _env  # noqa: F401
+
+# Packages that should only be imported on first use.
+HEAVY = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "onnxruntime",
+    "PyPDF2",
+    "docx",
+    "markdown",
+    "pymilvus",
+    "langchain",
+)
+
+
+def measure(module: str) -> list[tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` for every import, in order."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report(module: str, top: int) -> int:
+    rows = measure(module)
+    total_us = next(c for name, _, c in rows if name == module)
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"import {module}: {total_us / 1000:.0f} ms, {len(rows)} modules")
+    print(f"\n{'package':<28} {'ms':>8}")
+    for package, self_us in sorted(
+        by_package.items(), key=lambda item: -item[1]
+    )[:top]:
+        print(f"{package:<28} {self_us / 1000:>8.1f}")
+
+    eager = [p for p in HEAVY if p in by_package]
+    print(
+        "\nheavy packages imported eagerly: "
+        + (", ".join(eager) if eager else "none")
+    )
+    return total_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=0)
+    args = parser.parse_args()
+    total_us = report(args.module, args.top)
+    if args.budget_ms and total_us / 1000 > args.budget_ms:
+        raise SystemExit(
+            f"import took {total_us / 1000:.0f} ms, "
+            f"over the {args.budget_ms:.0f} ms budget"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Ingest throughput with logging disabled, synchronous and queued.
+
+Runs ``DocumentProcessingPipeline.process_file`` over a synthetic text
+document, without a vector store and with a zero-cost ``FakeEncoder``,
+so logging is a visible share of the work. Each mode reconfigures the
+app logger at DEBUG level, writing to a file in a temporary directory:
+
+* ``off``: logger disabled
+* ``sync``: file handler attached directly, as before the queue
+* ``queue``: records handed to a listener thread, text format
+* ``json``: the same with JSON lines
+
+``--chunk-logs`` adds that many records per chunk, as the ingest loop
+once emitted, to show the cost of per-chunk logging in each mode. The
+caller-side cost of a single record is reported as well.
+
+A local file on an idle disk rarely blocks, and on a single core the
+listener thread competes with ingestion for the CPU. ``--write-ms``
+makes every write block for that long, like a busy disk or a stdout
+pipe that is not read fast enough, which is where the queue pays off.
+
+Usage:
+    python -m benchmarks.logging_overhead --size 4M --chunk-logs 0 3
+    python -m benchmarks.logging_overhead --chunk-logs 3 --write-ms 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from typing import AsyncIterator
+
+from . import _env  # noqa: F401
+
+from app.core.logging import (
+    JsonFormatter,
+    SingletonLogger,
+    TextFormatter,
+    attach_queue,
+)
+from app.core.config import settings
+from app.services.doc_processing.chunkers import TextChunker
+from app.services.doc_processing.pipeline import DocumentProcessingPipeline
+from app.services.embedding import EmbeddingService
+
+from .corpus import make_text, parse_size
+from .suite import FakeEncoder
+
+MODES = ("off", "sync", "queue", "json")
+
+logger = SingletonLogger.get_logger()
+
+
+class _SlowFileHandler(RotatingFileHandler):
+    """Blocks for ``write_ms`` after every record it writes."""
+
+    write_ms = 0.0
+
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        if self.write_ms:
+            time.sleep(self.write_ms / 1000)
+
+
+class _LoggingChunker(TextChunker):
+    """Emits ``per_chunk`` records for every chunk it yields."""
+
+    per_chunk = 0
+
+    async def chunk_stream(
+        self,
+        sections: AsyncIterator[str],
+        buffer_chunks: int = 16,
+        separator: str = "\n",
+    ) -> AsyncIterator[str]:
+        n = 0
+        async for chunk in super().chunk_stream(
+            sections, buffer_chunks, separator
+        ):
+            for _ in range(self.per_chunk):
+                logger.info(
+                    "processing chunk %d with %d characters", n, len(chunk)
+                )
+            n += 1
+            yield chunk
+
+
+def configure(mode: str, log_dir: str, write_ms: float = 0.0):
+    """Point the app logger at a fresh file for ``mode``; returns the
+    queue listener, if any."""
+    SingletonLogger.shutdown()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(logging.DEBUG)
+    logger.disabled = mode == "off"
+    if mode == "off":
+        return None
+
+    handler = _SlowFileHandler(
+        os.path.join(log_dir, f"{mode}.log"),
+        maxBytes=10485760,
+        backupCount=5,
+    )
+    handler.write_ms = write_ms
+    if mode == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter(settings.LOG_FORMAT))
+    if mode == "sync":
+        logger.addHandler(handler)
+        return None
+    return attach_queue(logger, handler)
+
+
+def emit_cost_us(n: int = 20_000) -> float:
+    """Mean microseconds the caller spends per record."""
+    start = time.perf_counter()
+    for i in range(n):
+        logger.info("emitted record %d of %d", i, n)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def ingest(path: str, per_chunk: int, repeat: int) -> tuple:
+    model = FakeEncoder(call_ms=0, text_ms=0)
+    pipeline = DocumentProcessingPipeline(
+        embedding_service=EmbeddingService(model),
+        chunker=_LoggingChunker.for_model(model),
+    )
+    pipeline.chunker.per_chunk = per_chunk
+    best, chunks = float("inf"), 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        document = await pipeline.process_file(path, f"bench-{i}.txt")
+        best = min(best, time.perf_counter() - start)
+        chunks = len(document)
+    return best, chunks
+
+
+async def run(size: str, chunk_logs: list, repeat: int, write_ms: float):
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "document.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_text(parse_size(size)))
+        mib = os.path.getsize(path) / (1024 * 1024)
+
+        print(
+            f"{'mode':<6} {'logs/chunk':>10} {'chunks/s':>10} "
+            f"{'MiB/s':>8} {'vs off':>7} {'us/record':>10}"
+        )
+        for per_chunk in chunk_logs:
+            baseline = None
+            for mode in MODES:
+                listener = configure(mode, workdir, write_ms)
+                seconds, chunks = await ingest(path, per_chunk, repeat)
+                emit = emit_cost_us(2000 if write_ms else 20_000)
+                if listener is not None:
+                    listener.stop()  # write out what is still queued
+                baseline = baseline or seconds
+                print(
+                    f"{mode:<6} {per_chunk:>10} {chunks / seconds:>10.0f} "
+                    f"{mib / seconds:>8.2f} {baseline / seconds:>6.2f}x "
+                    f"{emit:>10.2f}"
+                )
+        configure("off", workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="4M")
+    parser.add_argument(
+        "--chunk-logs", nargs="+", type=int, default=[0, 3]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--write-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(
+        run(args.size, args.chunk_logs, args.repeat, args.write_ms)
+    )
+
+
+if __name__ == "__main__":
+    main()
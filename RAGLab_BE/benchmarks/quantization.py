@@ -0,0 +1,159 @@
+"""Recall against memory for the quantization settings of the local store.
+
+Builds the local vector store once per setting over the same corpus and
+reports, for each:
+
+* ``scan B/row``: bytes per row the first pass reads on every query,
+  which is what has to stay resident for search to be fast
+* ``disk B/row``: bytes per row of the segment files
+* queries/second, one query per call
+* recall@k against float32 search in the same ``--mode``
+
+Settings are float32 (``none``), int8 and binary codes rescored with
+each ``--factors`` value, and both codes without float32 vectors.
+
+Before measuring, every setting is checked to flush a batch whose rows
+were all deleted before it was written, and to keep flushing after it.
+
+The corpus is synthetic and clustered, with queries drawn near corpus
+rows, unless ``--vectors`` names an ``.npy`` file of real embeddings,
+e.g. the ``vectors.npy`` of a local store segment; its queries are then
+held-out rows of that file.
+
+Usage:
+    python -m benchmarks.quantization --rows 200000 --factors 4 16
+    python -m benchmarks.quantization --vectors segment/vectors.npy
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+from . import _env  # noqa: F401
+
+import numpy as np
+
+from app.repository.interfaces import chunk_ids
+from app.repository.local import LocalVectorStore
+from app.services.doc_processing.interfaces import ProcessedDocument
+
+from .vector_index import build, clustered_vectors, timed_search
+
+
+def corpus(args):
+    """Corpus rows and queries."""
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+        rng = np.random.default_rng(0)
+        held_out = np.zeros(len(vectors), dtype=bool)
+        held_out[rng.choice(len(vectors), args.queries, replace=False)] = True
+        return vectors[~held_out], vectors[held_out]
+    vectors = clustered_vectors(args.rows, args.dim, args.clusters)
+    rng = np.random.default_rng(1)
+    rows = rng.choice(len(vectors), args.queries, replace=False)
+    noise = rng.standard_normal((args.queries, vectors.shape[1]))
+    return vectors, vectors[rows] + 0.5 * noise.astype(np.float32)
+
+
+def sizes(store, rows: int):
+    """Bytes per row scanned by the first pass and stored on disk."""
+    scan = disk = 0
+    for segment in store._segments:
+        codes = segment.codes
+        scan += (codes if codes is not None else segment.vectors).nbytes
+        for name in os.listdir(segment.path):
+            disk += os.path.getsize(segment.path / name)
+    return scan / rows, disk / rows
+
+
+def settings_to_run(factors):
+    yield "float32", {"quantization": "none"}
+    for kind in ("int8", "binary"):
+        for factor in factors:
+            yield f"{kind} x{factor}", {
+                "quantization": kind,
+                "rescore_factor": factor,
+            }
+        yield f"{kind} only", {"quantization": kind, "keep_float": False}
+
+
+async def check_empty_flush(path: str, vectors: np.ndarray, **options):
+    """Flush a batch deleted before its flush, then one more batch."""
+    store = LocalVectorStore(path=path, **options)
+    await store.initialize()
+    for start in (0, 10):
+        document = ProcessedDocument.from_texts(
+            [str(i) for i in range(start, start + 10)],
+            vectors[start : start + 10],
+            {"filename": f"check-{start}.txt", "file_type": "txt"},
+        )
+        await store.insert_many(document)
+        if start == 0:
+            await store.delete(chunk_ids(document))
+        await store.flush()
+    if len(store) != 10 or len(store._segments) != 1:
+        raise RuntimeError(f"empty flush left {store!r} inconsistent")
+    shutil.rmtree(path)
+
+
+async def run(args):
+    vectors, queries = corpus(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options in settings_to_run(args.factors):
+            await check_empty_flush(
+                f"{tmp}/{label.replace(' ', '-')}", vectors, **options
+            )
+    print(
+        f"{len(vectors)} rows of dim {vectors.shape[1]}, "
+        f"{len(queries)} queries, top {args.top_k}, {args.mode} search\n"
+    )
+    print(
+        f"{'setting':<12} {'scan B/row':>10} {'disk B/row':>10} "
+        f"{'QPS':>9} {'recall@' + str(args.top_k):>10}"
+    )
+    truth = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options in settings_to_run(args.factors):
+            store, _ = await build(
+                f"{tmp}/{label.replace(' ', '-')}",
+                args.mode,
+                vectors,
+                args.nprobe,
+                **options,
+            )
+            found, elapsed = await timed_search(store, queries, args.top_k)
+            truth = truth or found
+            recall = np.mean(
+                [len(f & t) / len(t) for f, t in zip(found, truth)]
+            )
+            scan, disk = sizes(store, len(vectors))
+            # One store at a time, so the others do not evict its pages.
+            shutil.rmtree(store.path)
+            print(
+                f"{label:<12} {scan:>10.0f} {disk:>10.0f} "
+                f"{len(queries) / elapsed:>9.1f} {recall:>10.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--vectors", default="", help="Embeddings (.npy)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--factors", type=int, nargs="+", default=[2, 4, 8, 16, 32]
+    )
+    parser.add_argument("--mode", choices=("exact", "ivf"), default="exact")
+    parser.add_argument("--nprobe", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
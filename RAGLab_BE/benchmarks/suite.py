@@ -0,0 +1,503 @@
+"""Ingestion and retrieval micro-benchmarks with machine-readable output.
+
+Runs the real code paths over the synthetic corpus of
+``benchmarks.corpus``:
+
+* ``extract``: ``extract_text`` of the PDF, DOCX and TXT processors,
+  through the ExtractionExecutor the app uses
+* ``chunk``: ``TextChunker.chunk_text``
+* ``embed``: ``EmbeddingService`` one text per call, one batched call,
+  and concurrent single calls through the EmbeddingScheduler
+* ``pipeline``: ``DocumentProcessingPipeline.process_file`` end to end
+  into a local vector store with a document registry
+* ``search``: ``SearchService.search`` over the ingested chunks
+
+Each case reports throughput, latency percentiles over its iterations
+and the peak RSS of the process (and of extraction workers) so far.
+Results are written as JSON; ``--compare`` prints the change against an
+earlier results file and exits non-zero if a case regressed by more
+than ``--threshold`` percent.
+
+Embeddings come from ``FakeEncoder``, a deterministic stand-in whose
+cost per call and per text is simulated, unless ``--model`` names a
+real model to load.
+
+Usage:
+    python -m benchmarks.suite --out results.json
+    python -m benchmarks.suite --cases chunk embed --sizes 1M --repeat 10
+    python -m benchmarks.suite --out new.json --compare results.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Tuple
+
+from . import _env  # noqa: F401
+
+import numpy as np
+
+from app.core.config import settings
+from app.repository.local import LocalVectorStore
+from app.services.doc_processing.chunkers import TextChunker
+from app.services.doc_processing.executors import ExtractionExecutor
+from app.services.doc_processing.pipeline import DocumentProcessingPipeline
+from app.services.doc_processing.processors import ProcessorFactory
+from app.services.embedding import EmbeddingService
+from app.services.embedding_scheduler import EmbeddingScheduler
+from app.services.registry import DocumentRegistry
+from app.services.search import SearchService
+
+from .corpus import FORMATS, VOCAB, generate, make_text, parse_size
+
+CASES = ("extract", "chunk", "embed", "pipeline", "search")
+
+MiB = 1024 * 1024
+
+
+class _FakeTokenizer:
+    """About one token per four characters of a word, like WordPiece."""
+
+    def num_special_tokens_to_add(self) -> int:
+        return 2
+
+    def __call__(self, words: List[str], **kwargs) -> dict:
+        return {"input_ids": [[0] * -(-len(w) // 4) for w in words]}
+
+
+class FakeEncoder:
+    """Deterministic stand-in for a SentenceTransformer.
+
+    Every text maps to a fixed unit vector derived from its hash, so
+    results are reproducible. Each ``encode`` call sleeps ``call_ms`` plus
+    ``text_ms`` per text to model a forward pass' fixed and per-item cost,
+    which is what makes batching pay off.
+    """
+
+    max_seq_length = 384
+    tokenizer = _FakeTokenizer()
+
+    def __init__(
+        self, dim: int = 768, call_ms: float = 2.0, text_ms: float = 0.2
+    ):
+        self.dim = dim
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = hashlib.sha256(text.encode("utf-8")).digest()[:8]
+        rng = np.random.default_rng(int.from_bytes(seed, "little"))
+        vector = rng.standard_normal(self.dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def encode(self, sentences, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else sentences
+        time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        embeddings = np.stack([self._vector(t) for t in texts])
+        return embeddings[0] if single else embeddings
+
+    def __repr__(self):
+        return (
+            f"FakeEncoder(dim={self.dim}, call_ms={self.call_ms}, "
+            f"text_ms={self.text_ms})"
+        )
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _workers_peak_rss_mb(executor: ExtractionExecutor) -> float:
+    """Largest peak RSS among live extraction worker processes."""
+    peak = 0.0
+    pids = [
+        process.pid
+        for worker in list(executor._workers)
+        for process in worker._pool
+    ]
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peak = max(peak, int(line.split()[1]) / 1024)
+        except OSError:
+            continue
+    return peak
+
+
+def _summary(latencies: List[float]) -> dict:
+    ms = np.array(latencies) * 1000
+    return {
+        "mean": round(float(ms.mean()), 3),
+        "min": round(float(ms.min()), 3),
+        "p50": round(float(np.percentile(ms, 50)), 3),
+        "p95": round(float(np.percentile(ms, 95)), 3),
+        "p99": round(float(np.percentile(ms, 99)), 3),
+        "max": round(float(ms.max()), 3),
+    }
+
+
+class Runner:
+    """Times cases and collects their results."""
+
+    def __init__(self, repeat: int, warmup: int, executor):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.executor = executor
+        self.results: List[dict] = []
+
+    async def case(
+        self,
+        name: str,
+        run: Callable[[int], Awaitable[None]],
+        work: float,
+        unit: str,
+        **params,
+    ):
+        """
+        Time ``run`` and record the result.
+
+        Args:
+            name: Case name, unique within a results file
+            run: Called with the iteration number; warm-ups get negative
+                numbers
+            work: Units of work done by one call, such as MiB or texts
+            unit: Name of the unit of ``work``
+            **params: Parameters recorded with the result
+        """
+        for i in range(self.warmup):
+            await run(-1 - i)
+        latencies = []
+        for i in range(self.repeat):
+            start = time.perf_counter()
+            await run(i)
+            latencies.append(time.perf_counter() - start)
+        latency = _summary(latencies)
+        result = {
+            "name": name,
+            "params": params,
+            "iterations": self.repeat,
+            "throughput": round(work / (latency["p50"] / 1000), 3),
+            "unit": f"{unit}/s",
+            "latency_ms": latency,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+        if self.executor is not None:
+            result["workers_peak_rss_mb"] = round(
+                _workers_peak_rss_mb(self.executor), 1
+            )
+        self.results.append(result)
+        print(
+            f"{name:<30} {result['throughput']:>10.2f} {result['unit']:<8}"
+            f" p50 {latency['p50']:>9.2f} ms  p95 {latency['p95']:>9.2f} ms"
+            f"  rss {result['peak_rss_mb']:>7.1f} MiB"
+        )
+
+
+async def bench_extract(runner: Runner, corpus: dict, sizes, formats):
+    for label in sizes:
+        for fmt in formats:
+            processor = await ProcessorFactory.get_processor(fmt)
+            path = corpus[label][fmt]
+
+            async def run(_, processor=processor, path=path):
+                await processor.extract_text(path, runner.executor)
+
+            await runner.case(
+                f"extract/{fmt}/{label}",
+                run,
+                parse_size(label) / MiB,
+                "MiB",
+                format=fmt,
+                size=label,
+            )
+
+
+async def bench_chunk(runner: Runner, model, sizes):
+    chunker = TextChunker.for_model(model)
+    for label in sizes:
+        text = make_text(parse_size(label))
+
+        async def run(_, text=text):
+            await chunker.chunk_text(text)
+
+        await runner.case(
+            f"chunk/{label}",
+            run,
+            len(text) / MiB,
+            "MiB",
+            size=label,
+            chunk_size=chunker.chunk_size,
+        )
+
+
+async def bench_embed(runner: Runner, model, n_texts: int):
+    chunker = TextChunker.for_model(model)
+    texts = chunker.split(make_text(n_texts * 2000))[:n_texts]
+    service = EmbeddingService(model)
+
+    async def single(_):
+        for text in texts:
+            await service.get_embedding(text)
+
+    async def batched(_):
+        await service.get_embeddings(texts)
+
+    await runner.case(
+        "embed/single", single, len(texts), "texts", texts=len(texts)
+    )
+    await runner.case(
+        "embed/batched",
+        batched,
+        len(texts),
+        "texts",
+        texts=len(texts),
+        batch_size=service.batch_size,
+    )
+
+    scheduler = EmbeddingScheduler(model)
+    await scheduler.start()
+    scheduled = EmbeddingService(model, scheduler=scheduler)
+
+    async def concurrent(_):
+        await asyncio.gather(*(scheduled.get_embedding(t) for t in texts))
+
+    try:
+        await runner.case(
+            "embed/scheduled-concurrent",
+            concurrent,
+            len(texts),
+            "texts",
+            texts=len(texts),
+            max_batch_size=scheduler.max_batch_size,
+        )
+    finally:
+        await scheduler.stop()
+
+
+async def _ingest_stack(model, workdir: str, executor):
+    store = LocalVectorStore(path=os.path.join(workdir, "vectors"))
+    await store.initialize()
+    registry = DocumentRegistry(os.path.join(workdir, "registry.db"))
+    pipeline = DocumentProcessingPipeline(
+        embedding_service=EmbeddingService(model),
+        vector_store=store,
+        chunker=TextChunker.for_model(model),
+        executor=executor,
+        registry=registry,
+    )
+    return pipeline, store, registry
+
+
+async def bench_pipeline(
+    runner: Runner, model, corpus: dict, sizes, formats, workdir: str
+):
+    for label in sizes:
+        for fmt in formats:
+            case_dir = tempfile.mkdtemp(dir=workdir)
+            pipeline, store, registry = await _ingest_stack(
+                model, case_dir, runner.executor
+            )
+            path = corpus[label][fmt]
+
+            # A new filename per iteration, so nothing is skipped as
+            # already ingested.
+            async def run(i, pipeline=pipeline, path=path, fmt=fmt):
+                await pipeline.process_file(
+                    path, f"bench-{i}.{fmt}", collect=False
+                )
+
+            try:
+                await runner.case(
+                    f"pipeline/{fmt}/{label}",
+                    run,
+                    parse_size(label) / MiB,
+                    "MiB",
+                    format=fmt,
+                    size=label,
+                )
+            finally:
+                await store.close()
+                registry.close()
+
+
+async def bench_search(
+    runner: Runner, model, corpus: dict, size: str, workdir: str
+):
+    case_dir = tempfile.mkdtemp(dir=workdir)
+    pipeline, store, registry = await _ingest_stack(
+        model, case_dir, runner.executor
+    )
+    await pipeline.process_file(
+        corpus[size]["txt"], "corpus.txt", collect=False
+    )
+    service = SearchService(EmbeddingService(model), store)
+    queries = [
+        " ".join(VOCAB[(i * 7 + j) % len(VOCAB)] for j in range(4))
+        for i in range(50)
+    ]
+
+    async def run(_):
+        for query in queries:
+            await service.search(query, top_k=5)
+
+    chunks = await asyncio.to_thread(registry.chunk_ids, "corpus.txt")
+    try:
+        await runner.case(
+            f"search/{size}",
+            run,
+            len(queries),
+            "queries",
+            size=size,
+            queries=len(queries),
+            chunks=len(chunks),
+        )
+    finally:
+        await store.close()
+        registry.close()
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: List[dict], baseline_path: str, threshold: float):
+    """Print the change per case; True if any case regressed."""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressed = False
+    print(f"\ncompared with {baseline_path}")
+    for result in results:
+        old = baseline.get(result["name"])
+        if old is None:
+            continue
+        change = 100 * (result["throughput"] / old["throughput"] - 1)
+        p95 = 100 * (
+            result["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1
+        )
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{result['name']:<30} throughput {change:>+7.1f}%"
+            f"   p95 {p95:>+7.1f}%{flag}"
+        )
+    return regressed
+
+
+async def run(args) -> Tuple[List[dict], str]:
+    workdir = tempfile.mkdtemp(prefix="raglab-bench-")
+    corpus_dir = args.corpus or os.path.join(workdir, "corpus")
+    if args.model:
+        from app.services.embedding_backends import load_embedding_model
+
+        settings.MODEL_NAME = args.model
+        model = load_embedding_model()
+    else:
+        model = FakeEncoder(
+            call_ms=args.fake_call_ms, text_ms=args.fake_text_ms
+        )
+    executor = ExtractionExecutor() if args.executor == "process" else None
+    runner = Runner(args.repeat, args.warmup, executor)
+
+    formats = args.formats
+    needs_corpus = {"extract", "pipeline", "search"} & set(args.cases)
+    corpus = {}
+    if needs_corpus:
+        corpus = generate(
+            corpus_dir,
+            sorted(set(args.sizes) | {args.search_size}),
+            sorted(set(formats) | {"txt"}),
+        )
+    try:
+        if "extract" in args.cases:
+            await bench_extract(runner, corpus, args.sizes, formats)
+        if "chunk" in args.cases:
+            await bench_chunk(runner, model, args.sizes)
+        if "embed" in args.cases:
+            await bench_embed(runner, model, args.texts)
+        if "pipeline" in args.cases:
+            await bench_pipeline(
+                runner, model, corpus, args.sizes, formats, workdir
+            )
+        if "search" in args.cases:
+            await bench_search(
+                runner, model, corpus, args.search_size, workdir
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return runner.results, repr(model)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--cases", nargs="+", default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", default=["64K", "1M"])
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS))
+    parser.add_argument("--search-size", default="1M")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "--executor", choices=("process", "none"), default="process"
+    )
+    parser.add_argument("--model", default="", help="Real model to load")
+    parser.add_argument("--fake-call-ms", type=float, default=2.0)
+    parser.add_argument("--fake-text-ms", type=float, default=0.2)
+    parser.add_argument("--corpus", default="", help="Reuse this corpus dir")
+    parser.add_argument("--out", default="", help="Write results as JSON")
+    parser.add_argument("--compare", default="", help="Baseline JSON")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results, encoder = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "encoder": encoder,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.out}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Upload throughput for many concurrent large files.
+
+Sends the same set of files three ways and reports MB/s plus the worst
+event-loop stall observed by a heartbeat task running in the server's
+loop:
+
+* ``single``: one ``POST /documents/upload/`` per file, all concurrent
+* ``batch``: every file in one ``POST /documents/upload/batch``
+* ``batch xN``: N concurrent batch requests splitting the files
+
+By default the app runs in-process through ``httpx.ASGITransport`` with
+a job queue that is never started, so only receiving, hashing and
+writing uploads is measured. Pass ``--url`` to target a running server
+instead (the stall column is then not available).
+
+Usage:
+    python -m benchmarks.upload_throughput --files 16 --size-mb 32
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from . import _env  # noqa: F401
+
+import httpx
+from fastapi import FastAPI
+
+
+def make_files(n: int, size: int, round_id: int) -> list[tuple]:
+    # Random bytes with a unique prefix, so uploads are never deduplicated.
+    body = os.urandom(size)
+    return [
+        (
+            f"bench-{round_id}-{i}.pdf",
+            f"{round_id}:{i}:".encode() + body,
+            "application/pdf",
+        )
+        for i in range(n)
+    ]
+
+
+async def _heartbeat(stalls: list, interval: float = 0.01):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+def make_app(workdir: str) -> FastAPI:
+    os.chdir(workdir)
+    from app.routers import files
+    from app.services.jobs import JobQueue, JobStore
+    from app.services.registry import DocumentRegistry
+
+    app = FastAPI()
+    app.include_router(files.router)
+    app.state.job_queue = JobQueue(
+        JobStore(os.path.join(workdir, "jobs.db")), pipeline=None
+    )
+    app.state.document_registry = DocumentRegistry(
+        os.path.join(workdir, "registry.db")
+    )
+    return app
+
+
+async def _single(client: httpx.AsyncClient, files: list[tuple]):
+    responses = await asyncio.gather(
+        *(
+            client.post("/documents/upload/", files={"file": f})
+            for f in files
+        )
+    )
+    for response in responses:
+        response.raise_for_status()
+
+
+async def _batch(client: httpx.AsyncClient, files: list[tuple], parts: int):
+    size = -(-len(files) // parts)
+    groups = [files[i : i + size] for i in range(0, len(files), size)]
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/documents/upload/batch",
+                files=[("files", f) for f in group],
+            )
+            for group in groups
+        )
+    )
+    for response in responses:
+        response.raise_for_status()
+
+
+async def run(n_files: int, size_mb: int, concurrency: int, url: str):
+    size = size_mb * 1024 * 1024
+    workdir = tempfile.mkdtemp(prefix="raglab-upload-")
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=None)
+    else:
+        transport = httpx.ASGITransport(app=make_app(workdir))
+        client = httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        )
+
+    scenarios = [
+        ("single", lambda files: _single(client, files)),
+        ("batch", lambda files: _batch(client, files, 1)),
+        (
+            f"batch x{concurrency}",
+            lambda files: _batch(client, files, concurrency),
+        ),
+    ]
+    total_mb = n_files * size / 1024 / 1024
+    print(f"{n_files} files x {size_mb} MiB = {total_mb:.0f} MiB per run")
+    try:
+        for round_id, (label, send) in enumerate(scenarios):
+            files = make_files(n_files, size, round_id)
+            stalls = [0.0]
+            beat = asyncio.create_task(_heartbeat(stalls))
+            start = time.perf_counter()
+            await send(files)
+            elapsed = time.perf_counter() - start
+            beat.cancel()
+            stall = "n/a" if url else f"{max(stalls) * 1000:8.1f} ms"
+            print(
+                f"{label:<12} {total_mb / elapsed:>10.1f} MiB/s"
+                f"   {elapsed:>7.2f} s   max loop stall {stall}"
+            )
+    finally:
+        await client.aclose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--url", default="", help="Base URL of a running server"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.files, args.size_mb, args.concurrency, args.url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Recall and QPS of the local vector store, IVF versus exact search.
+
+Builds both modes over the same synthetic clustered corpus, then reports
+queries/second and recall@k of IVF relative to the exact results.
+
+Usage:
+    python -m benchmarks.vector_index --rows 200000 --queries 500 --nprobe 4 8 16
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from . import _env  # noqa: F401
+
+import numpy as np
+
+from app.repository.local import LocalVectorStore
+from app.services.doc_processing.interfaces import ProcessedDocument
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    noise = rng.standard_normal((n, dim)).astype(np.float32) * 0.6
+    return centers[labels] + noise
+
+
+async def build(path, mode, vectors, n_probe, batch_rows=10_000, **options):
+    store = LocalVectorStore(path=path, mode=mode, n_probe=n_probe, **options)
+    await store.initialize()
+    for start in range(0, len(vectors), batch_rows):
+        block = vectors[start : start + batch_rows]
+        await store.insert_many(
+            ProcessedDocument.from_texts(
+                [str(start + i) for i in range(len(block))],
+                block,
+                {"filename": "synthetic.txt", "file_type": "txt"},
+                first_chunk_index=start,
+            )
+        )
+    start = time.perf_counter()
+    await store.flush()
+    return store, time.perf_counter() - start
+
+
+async def timed_search(store, queries, top_k):
+    start = time.perf_counter()
+    results = [
+        (await store.search(query[None, :], top_k))[0] for query in queries
+    ]
+    elapsed = time.perf_counter() - start
+    return [{hit.id for hit in hits} for hits in results], elapsed
+
+
+async def run(args):
+    vectors = clustered_vectors(args.rows, args.dim, args.clusters)
+    queries = clustered_vectors(args.queries, args.dim, args.clusters, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exact, build_s = await build(f"{tmp}/exact", "exact", vectors, 1)
+        truth, elapsed = await timed_search(exact, queries, args.top_k)
+        print(
+            f"{'exact':<12} build {build_s:>7.2f}s  "
+            f"{args.queries / elapsed:>9.1f} QPS  recall@{args.top_k} 1.000"
+        )
+
+        start = time.perf_counter()
+        await exact.search(queries, args.top_k)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'exact batch':<12} {'':>15}  "
+            f"{args.queries / elapsed:>9.1f} QPS  (all queries in one call)"
+        )
+
+        for n_probe in args.nprobe:
+            ivf, build_s = await build(
+                f"{tmp}/ivf-{n_probe}", "ivf", vectors, n_probe
+            )
+            found, elapsed = await timed_search(ivf, queries, args.top_k)
+            recall = np.mean(
+                [len(f & t) / len(t) for f, t in zip(found, truth)]
+            )
+            label = f"ivf np={n_probe}"
+            print(
+                f"{label:<12} build {build_s:>7.2f}s  "
+                f"{args.queries / elapsed:>9.1f} QPS  "
+                f"recall@{args.top_k} {recall:.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
-from typing import Optional, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Hashable, Iterator, Optional, Any
+import io
+import json
 import requests
 import time
+import uuid
 
 import streamlit as st
+from requests.adapters import HTTPAdapter
 
 from config import settings
 
@@ -11,47 +17,334 @@ API_BASE_URL = settings.API_BASE_URL
 UPLOAD_API_URL = settings.UPLOAD_API_URL
 SEARCH_API_URL = settings.SEARCH_API_URL
 CHAT_API_URL = settings.CHAT_API_URL
+JOBS_API_URL = (
+    settings.JOBS_API_URL
+    or UPLOAD_API_URL.rstrip("/").rsplit("/", 1)[0] + "/jobs/"
+)
 
+# (connect, read) timeouts
+REQUEST_TIMEOUT = (5, settings.REQUEST_TIMEOUT)
+UPLOAD_TIMEOUT = (5, settings.UPLOAD_TIMEOUT)
+CHAT_TIMEOUT = (5, settings.CHAT_TIMEOUT)
 
-def chat_with_backend(query: str) -> Optional[str]:
+FINISHED_JOB_STATUSES = ("succeeded", "failed")
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
     """
-    Sends a chat query to the backend and returns the response.
+    HTTP session shared by every rerun and browser session.
+
+    Its connection pool keeps connections to the backend open, so
+    requests skip the TCP handshake, and holds enough of them for every
+    concurrent upload.
+
+    Returns:
+        requests.Session: The pooled session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=settings.UPLOAD_WORKERS + 4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class MultipartFileStream(io.RawIOBase):
+    """
+    A ``multipart/form-data`` body that reads the file as it is sent.
+
+    ``requests`` builds bodies passed as ``files=`` in memory, a second
+    copy of every file. This body has a known length, so it is sent
+    with a Content-Length, and is read block by block from the file.
+    """
+
+    def __init__(
+        self, file: BinaryIO, filename: str, content_type: str = None
+    ):
+        self.boundary = uuid.uuid4().hex
+        filename = filename.replace('"', "%22")
+        head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; '
+            f'filename="{filename}"\r\n'
+            f"Content-Type: {content_type or 'application/octet-stream'}"
+            "\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+        file.seek(0, io.SEEK_END)
+        self.len = len(head) + file.tell() + len(tail)
+        file.seek(0)
+        self._parts = [io.BytesIO(head), file, io.BytesIO(tail)]
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self.len
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._parts and size != 0:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries expire after ``ttl``."""
+
+    def __init__(self, ttl: float, max_items: int):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+def response_cache() -> TTLCache:
+    """The search and chat response cache of this browser session."""
+    if "response_cache" not in st.session_state:
+        st.session_state.response_cache = TTLCache(
+            settings.CACHE_TTL, settings.CACHE_MAX_ITEMS
+        )
+    return st.session_state.response_cache
+
+
+def _error_detail(response: requests.Response) -> str:
+    try:
+        detail = response.json()["detail"]
+    except (ValueError, KeyError):
+        detail = response.text
+    return f"{response.status_code} {detail}"
+
+
+def chat_with_backend(
+    query: str, history: list[dict]
+) -> Iterator[tuple[str, Any]]:
+    """
+    Sends a chat query to the backend and streams the answer.
+
+    The backend answers with Server-Sent Events over a pooled keep-alive
+    connection; events are yielded as soon as they arrive.
 
     Args:
         query (str): The user's chat query.
+        history (list[dict]): Earlier ``role``/``content`` messages.
+
+    Yields:
+        tuple[str, Any]: ``("sources", results)``, then one
+            ``("token", text)`` per generated token and a final
+            ``("done", timings)``, or ``("error", message)``.
+
+    Raises:
+        RuntimeError: If the backend rejects the query.
+    """
+    with get_http_session().post(
+        CHAT_API_URL,
+        json={"query": query, "history": history},
+        headers={"Accept": "text/event-stream"},
+        stream=True,
+        timeout=CHAT_TIMEOUT,
+    ) as response:
+        if response.status_code != 200:
+            raise RuntimeError(_error_detail(response))
+        response.encoding = "utf-8"
+        event, data = "message", []
+        # chunk_size=None hands over each chunk as it arrives instead of
+        # waiting for a full buffer.
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if not line:
+                if data:
+                    yield event, json.loads("\n".join(data))
+                event, data = "message", []
+            elif line.startswith("event:"):
+                event = line[len("event:") :].strip()
+            elif line.startswith("data:"):
+                data.append(line[len("data:") :].lstrip())
+
+
+def search_documents(query: str) -> list[dict]:
+    """
+    Searches the ingested documents, caching results for the session.
+
+    Args:
+        query (str): The search query.
 
     Returns:
-        Optional[str]: The response from the backend, or an error message.
+        list[dict]: The best matching chunks, with ``text``, ``score``
+            and ``metadata``.
+    """
+    key = ("search", query, settings.SEARCH_TOP_K)
+    results = response_cache().get(key)
+    if results is None:
+        response = get_http_session().post(
+            SEARCH_API_URL,
+            json={"query": query, "top_k": settings.SEARCH_TOP_K},
+            timeout=REQUEST_TIMEOUT,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(_error_detail(response))
+        results = response.json()["results"]
+        response_cache().put(key, results)
+    return results
 
-    Example:
-        >>> chat_with_backend("What is the capital of France?")
-        'The capital of France is Paris.'
+
+def upload_file(file: Any) -> dict:
     """
-    pass
+    Uploads one file to the backend; safe to call from worker threads.
+
+    Args:
+        file (Any): The uploaded file, a binary file-like object with
+            ``name`` and ``type``.
+
+    Returns:
+        dict: The backend's response, with the ingestion ``job_id``.
+
+    Raises:
+        RuntimeError: If the backend rejects the upload.
+    """
+    body = MultipartFileStream(file, file.name, file.type)
+    response = get_http_session().post(
+        UPLOAD_API_URL,
+        data=body,
+        headers={"Content-Type": body.content_type},
+        timeout=UPLOAD_TIMEOUT,
+    )
+    if response.status_code != 200:
+        raise RuntimeError(_error_detail(response))
+    return response.json()
 
 
-def upload_files(uploaded_files: Any) -> str:
+def fetch_job(job_id: str) -> Optional[dict]:
     """
-    Uploads a file to the backend for processing.
+    Fetches the status of an ingestion job.
 
     Args:
-        file (Any): The file object to upload.
+        job_id (str): The job id returned by the upload.
 
     Returns:
-        str: A message indicating the upload status or an error message.
+        Optional[dict]: The job, with its ``status``, ``stage`` and chunk
+            counts, or None if it could not be fetched this time.
+    """
+    try:
+        response = get_http_session().get(
+            f"{JOBS_API_URL}{job_id}", timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException:
+        return None
+
+
+def _job_progress(job: dict) -> str:
+    if job["status"] == "failed":
+        return job.get("error") or "failed"
+    if job["chunks_total"]:
+        return f"{job['chunks_embedded']}/{job['chunks_total']} chunks"
+    return job["stage"]
+
+
+def upload_files(uploaded_files: Any) -> None:
+    """
+    Uploads files to the backend and follows their ingestion.
+
+    Up to ``UPLOAD_WORKERS`` files are uploaded at once over pooled
+    connections. Every file's status is shown in a table that is then
+    kept up to date with its ingestion job until all jobs finish.
+
+    Args:
+        uploaded_files (Any): The file objects to upload.
     """
-    for file in uploaded_files:
-        try:
-            # Prepare the file to send
-            files = {"file": (file.name, file.getvalue(), file.type)}
-            response = requests.post(UPLOAD_API_URL, files=files)
-            message = response.json()["message"]
-            if response.status_code == 200:
-                st.success(f"Success:\n {message}")
+    rows = [
+        {"File": file.name, "Upload": "waiting", "Job": "", "Progress": ""}
+        for file in uploaded_files
+    ]
+    table = st.empty()
+    progress = st.progress(0.0, text="Uploading...")
+    jobs: dict[str, list[int]] = {}
+
+    with ThreadPoolExecutor(max_workers=settings.UPLOAD_WORKERS) as pool:
+        futures = {
+            pool.submit(upload_file, file): i
+            for i, file in enumerate(uploaded_files)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = rows[futures[future]]
+            try:
+                result = future.result()
+            except Exception as e:
+                row["Upload"] = "failed"
+                row["Progress"] = str(e)
             else:
-                st.error(f"Failed to upload: {file.name} - {response.text}")
-        except Exception as e:
-            st.error(f"An error occurred while uploading {file.name}: {e}")
+                row["Upload"] = "duplicate" if result["dedup"] else "sent"
+                row["Progress"] = result["message"]
+                if result["job_id"]:
+                    jobs.setdefault(result["job_id"], []).append(
+                        futures[future]
+                    )
+                    row["Job"] = "queued"
+                else:
+                    row["Job"] = "succeeded"
+            table.dataframe(rows, hide_index=True, use_container_width=True)
+            progress.progress(
+                done / len(rows), text=f"Uploaded {done}/{len(rows)} files"
+            )
+
+        # Duplicates of a file in the same drop share its job.
+        pending = set(jobs)
+        deadline = time.monotonic() + settings.JOB_POLL_TIMEOUT
+        while pending and time.monotonic() < deadline:
+            time.sleep(settings.JOB_POLL_INTERVAL)
+            job_ids = list(pending)
+            for job_id, job in zip(job_ids, pool.map(fetch_job, job_ids)):
+                if job is None:
+                    continue
+                for i in jobs[job_id]:
+                    rows[i]["Job"] = job["status"]
+                    rows[i]["Progress"] = _job_progress(job)
+            pending = {
+                job_id
+                for job_id in pending
+                if rows[jobs[job_id][0]]["Job"] not in FINISHED_JOB_STATUSES
+            }
+            table.dataframe(rows, hide_index=True, use_container_width=True)
+            finished = len(jobs) - len(pending)
+            progress.progress(
+                finished / len(jobs),
+                text=f"Processed {finished}/{len(jobs)} files",
+            )
+
+    failed = sum(row["Job"] in ("", "failed") for row in rows)
+    if failed:
+        st.error(f"{failed} of {len(rows)} files failed.")
+    elif pending:
+        st.warning("Some files are still being processed.")
+    else:
+        st.success(f"Processed {len(rows)} files.")
 
 
 def check_health_status() -> Optional[str]:
@@ -70,9 +363,10 @@ def check_server_status(url: str) -> tuple[bool, str, float]:
         return False, "Status Check Disabled", 0.0
 
     try:
-        start_time = time.time()
-        response = requests.get(url, timeout=5)
-        latency = (time.time() - start_time) * 1000  # Convert to milliseconds
+        start_time = time.perf_counter()
+        # The pooled session keeps the connection open between checks.
+        response = get_http_session().get(url, timeout=5)
+        latency = (time.perf_counter() - start_time) * 1000  # milliseconds
 
         if response.status_code == 200:
             return True, "Server Connected", latency
@@ -159,6 +453,13 @@ def set_model_configs():
 @st.dialog("How it works!")
 def instructions():
     st.write("Follow these instructions")
+    st.markdown(
+        "1. Upload PDF, TXT or DOCX files with **Upload Documents**.\n"
+        "2. Ask questions about them in the chat; answers stream in "
+        "with the passages they are based on.\n"
+        "3. Start a message with `/search` to only list the matching "
+        "passages."
+    )
 
 
 @st.dialog("Upload Your Documents")
@@ -172,10 +473,8 @@ def file_upload_dialog():
         submitted = st.form_submit_button("UPLOAD!")
 
         if submitted:
-            if files is not None:
-                with st.spinner("Uploading files..."):
-                    st.write("UPLOADED!")
-                    upload_files(files)
+            if files:
+                upload_files(files)
             else:
                 st.warning("Please select at least one file to upload.")
 
@@ -214,6 +513,137 @@ def sidebar():
             update_status()
 
 
+def render_sources(sources: Optional[list[dict]]) -> None:
+    """Show the chunks an answer is based on, collapsed."""
+    if not sources:
+        return
+    with st.expander(f"Sources ({len(sources)})"):
+        for source in sources:
+            filename = source["metadata"].get("filename", "unknown")
+            st.markdown(
+                f"**{filename}** ({source['score']:.3f})\n\n"
+                f"{source['text'][:500]}"
+            )
+
+
+def answer_chat(
+    prompt: str, history: list[dict]
+) -> tuple[str, list, bool]:
+    """
+    Streams the backend's answer into the current chat message.
+
+    An identical query with the same history is answered from the
+    session cache instead.
+
+    Args:
+        prompt (str): The user's chat query.
+        history (list[dict]): Earlier ``role``/``content`` messages.
+
+    Returns:
+        tuple[str, list, bool]: The answer, its sources and whether
+            answering failed.
+    """
+    key = (
+        "chat",
+        prompt,
+        tuple((message["role"], message["content"]) for message in history),
+    )
+    cached = response_cache().get(key)
+    if cached is not None:
+        st.markdown(cached[0])
+        render_sources(cached[1])
+        return (*cached, False)
+
+    sources, errors = [], []
+
+    def tokens() -> Iterator[str]:
+        for event, data in chat_with_backend(prompt, history):
+            if event == "sources":
+                sources.extend(data)
+            elif event == "token":
+                yield data
+            elif event == "error":
+                errors.append(data)
+
+    try:
+        content = st.write_stream(tokens())
+    except Exception as e:
+        content = ""
+        errors.append(str(e))
+    render_sources(sources)
+    if errors:
+        st.error(f"An error occurred while answering: {errors[0]}")
+        return content or f"Error: {errors[0]}", sources, True
+    response_cache().put(key, (content, sources))
+    return content, sources, False
+
+
+def answer_search(query: str) -> tuple[str, list, bool]:
+    """
+    Shows the chunks matching a ``/search`` query.
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        tuple[str, list, bool]: A summary line, the results and whether
+            the search failed.
+    """
+    try:
+        results = search_documents(query)
+    except Exception as e:
+        st.error(f"An error occurred while searching: {e}")
+        return f"Error: {e}", [], True
+    content = f"Found {len(results)} passages for *{query}*."
+    st.markdown(content)
+    render_sources(results)
+    return content, results, False
+
+
+def render_history() -> None:
+    """
+    Redraws the latest stored turns; stored answers are only redrawn,
+    never requested again.
+
+    Only the last ``CHAT_DISPLAY_TURNS`` turns are drawn on each rerun,
+    so a long conversation does not slow every interaction down; the
+    earlier ones are drawn once the user asks for them.
+    """
+    messages = st.session_state.messages
+    hidden = len(messages) - 2 * settings.CHAT_DISPLAY_TURNS
+    if hidden > 0 and not st.session_state.get("show_all_messages"):
+        if st.button(f"Show {hidden} earlier messages"):
+            st.session_state.show_all_messages = True
+        else:
+            messages = messages[hidden:]
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+            render_sources(message.get("sources"))
+
+
+def chat_history() -> list[dict]:
+    """
+    The latest turns to send to the backend as context.
+
+    Failed answers are error placeholders, not something the model said,
+    so they are left out together with the question they failed on.
+
+    Returns:
+        list[dict]: ``role``/``content`` messages, oldest first.
+    """
+    history = []
+    for message in st.session_state.messages:
+        if message.get("error"):
+            if history and history[-1]["role"] == "user":
+                history.pop()
+            continue
+        history.append(
+            {"role": message["role"], "content": message["content"]}
+        )
+    return history[-2 * settings.CHAT_HISTORY_TURNS :]
+
+
 def main():
     page_setup()
     sidebar()
@@ -222,37 +652,35 @@ def main():
         st.session_state.messages = []
 
     # Display chat messages from history on app rerun
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    render_history()
 
     # React to user input
-    if prompt := st.chat_input("What is up?"):
+    if prompt := st.chat_input("Ask about your documents, or /search"):
+        history = chat_history()
         # Display user message in chat message container
         with st.chat_message("user"):
             st.markdown(prompt)
         # Add user message to chat history
         st.session_state.messages.append({"role": "user", "content": prompt})
 
-        response = f"Echo: {prompt}"
         # Display assistant response in chat message container
         with st.chat_message("assistant"):
-            st.markdown(response)
+            if prompt.startswith("/search "):
+                response, sources, failed = answer_search(
+                    prompt[len("/search ") :]
+                )
+            else:
+                response, sources, failed = answer_chat(prompt, history)
         # Add assistant response to chat history
         st.session_state.messages.append(
-            {"role": "assistant", "content": response}
+            {
+                "role": "assistant",
+                "content": response,
+                "sources": sources,
+                "error": failed,
+            }
         )
 
-    async def ws_connection() -> None:
-        """
-        Establishes a WebSocket connection
-        and receives messages from the backend.
-
-        This function runs as an asynchronous task
-        and displays real-time messages from the backend.
-        """
-        pass
-
 
 if __name__ == "__main__":
     main()
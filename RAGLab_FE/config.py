@@ -8,6 +8,25 @@ class Settings(BaseSettings):
     UPLOAD_API_URL: str
     SEARCH_API_URL: str
     CHAT_API_URL: str
+    # Defaults to the jobs route next to UPLOAD_API_URL
+    JOBS_API_URL: str = ""
+
+    # HTTP client
+    REQUEST_TIMEOUT: float = 30.0
+    UPLOAD_TIMEOUT: float = 600.0
+    UPLOAD_WORKERS: int = 4  # files uploaded concurrently
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_POLL_TIMEOUT: float = 1800.0
+    CHAT_TIMEOUT: float = 120.0  # longest wait for the next token
+
+    # Chat and search
+    CHAT_HISTORY_TURNS: int = 3
+    # Turns redrawn on every rerun; earlier ones are shown on request
+    CHAT_DISPLAY_TURNS: int = 20
+    SEARCH_TOP_K: int = 5
+    # Identical queries within a browser session reuse earlier responses
+    CACHE_TTL: float = 300.0
+    CACHE_MAX_ITEMS: int = 128
 
 
 settings = Settings()